@@ -1,20 +1,18 @@
 from typing import Protocol
 
-from app.core.Interfaces.campaign_interface import BuyNGetN, Combo, Discount
+from app.core.classes.campaign_index import CampaignIndex
+from app.core.Interfaces.campaign_interface import BuyNGetN, Campaign, Combo, Discount
 from app.core.Interfaces.receipt_interface import ReceiptProduct
-from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
-from app.infra.in_memory_repositories.campaign_in_memory_repository import (
-    CampaignAndProducts,
-)
 
 
 class ICampaignDiscountCalculator(Protocol):
-    def calculate_price_for_campaign(
-        self,
-        receipt_id: str,
-        campaign_without_type_on_this_product: CampaignAndProducts,
-        receipt_product: ReceiptProduct,
-        receipt_repo: ReceiptRepositoryInterface,
+    def calculate_products_price(
+        self, receipt_products: list[ReceiptProduct], index: CampaignIndex
+    ) -> int:
+        pass
+
+    def apply_campaign(
+        self, campaign: Campaign, receipt_product: ReceiptProduct
     ) -> int:
         pass
 
@@ -29,11 +27,6 @@ class ICampaignDiscountCalculator(Protocol):
         pass
 
     def apply_combo_campaign(
-        self,
-        receipt_id: str,
-        receipt_product: ReceiptProduct,
-        campaign_without_type_on_this_product: CampaignAndProducts,
-        combo_data: Combo,
-        receipt_repo: ReceiptRepositoryInterface,
+        self, receipt_product: ReceiptProduct, combo_data: Combo
     ) -> int:
         pass
@@ -43,6 +43,13 @@ class Campaign:
     type: str
     data: CampaignData
 
+    def product_ids(self) -> list[str]:
+        if isinstance(self.data, Combo):
+            return self.data.products
+        if isinstance(self.data, (Discount, BuyNGetN)):
+            return [self.data.product_id]
+        return []
+
 
 class CampaignInterface(Protocol):
     def create_campaign(self, campaign_request: CampaignRequest) -> Campaign:
@@ -0,0 +1,14 @@
+from typing import Protocol
+
+from app.core.classes.campaign_index import CampaignIndex
+from app.core.Interfaces.campaign_interface import Campaign
+from app.core.Interfaces.repository import Repository
+
+
+class CampaignOperations(Protocol):
+    def index(self) -> CampaignIndex:
+        pass
+
+
+class CampaignRepositoryInterface(Repository[Campaign], CampaignOperations, Protocol):
+    pass
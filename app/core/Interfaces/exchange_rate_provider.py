@@ -0,0 +1,6 @@
+from typing import Dict, Protocol
+
+
+class ExchangeRateProvider(Protocol):
+    def fetch_rates(self, base_currency: str) -> Dict[str, float]:
+        pass
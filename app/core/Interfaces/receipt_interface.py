@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Protocol
+from typing import Optional, Protocol
 
 
 class ReceiptStatus(str, Enum):
@@ -8,7 +8,7 @@ class ReceiptStatus(str, Enum):
     CLOSED = "closed"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReceiptProduct:
     id: str
     quantity: int
@@ -16,7 +16,7 @@ class ReceiptProduct:
     total: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Receipt:
     id: str
     shift_id: str
@@ -25,6 +25,12 @@ class Receipt:
     status: str
     total: float
     discounted_total: float
+    # ISO 8601 UTC time the receipt was closed, None while it is open
+    closed_at: Optional[str] = None
+
+    def snapshot(self) -> "Receipt":
+        """Copy that shares the immutable lines but not the list holding them."""
+        return replace(self, products=list(self.products))
 
 
 @dataclass
@@ -49,6 +55,11 @@ class ReceiptInterface(Protocol):
     ) -> Receipt:
         pass
 
+    def add_products(
+        self, receipt_id: str, product_requests: list[AddProductRequest]
+    ) -> Receipt:
+        pass
+
     def read_receipt(self, receipt_id: str) -> Receipt:
         pass
 
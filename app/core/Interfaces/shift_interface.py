@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Protocol
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Protocol
 
 from app.core.Interfaces.receipt_interface import Receipt
 
 
-@dataclass
+@dataclass(slots=True)
 class Shift:
     shift_id: str
     receipts: list[Receipt]
@@ -29,9 +30,21 @@ class ClosedReceipt:
 class SalesReport:
     total_receipts: int
     total_revenue: Dict[str, float]
+    # one page of closed receipts, listed only when a page size is requested
     closed_receipts: list[ClosedReceipt]
 
 
+@dataclass
+class SalesBucket:
+    # UTC start of the hour or day
+    bucket: str
+    n_receipts: int
+    revenue: Dict[str, float]
+    # {"id", "quantity", "total"} per product; like receipt line totals, the
+    # total is undiscounted and in GEL tetri whatever the receipt currency
+    products: list[Dict[str, Any]]
+
+
 class ShiftInterface(Protocol):
     def create_shift(self) -> Shift:
         pass
@@ -45,7 +58,22 @@ class ShiftInterface(Protocol):
     def get_x_report(self, shift_id: str) -> Report:
         pass
 
-    def get_lifetime_sales_report(self) -> SalesReport:
+    def get_z_report(self, shift_id: str) -> Report:
+        pass
+
+    def get_lifetime_sales_report(
+        self, limit: Optional[int] = None, after_receipt_id: Optional[str] = None
+    ) -> SalesReport:
+        pass
+
+    def iter_closed_receipts(
+        self, after_receipt_id: Optional[str] = None
+    ) -> Iterator[ClosedReceipt]:
+        pass
+
+    def get_sales_timeseries(
+        self, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[SalesBucket]:
         pass
 
     def get_shift(self, shift_id: str) -> Shift:
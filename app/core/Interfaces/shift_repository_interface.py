@@ -1,8 +1,15 @@
-from typing import Protocol
+from datetime import datetime
+from typing import Iterator, Optional, Protocol
 
 from app.core.Interfaces.receipt_interface import Receipt
 from app.core.Interfaces.repository import Repository
-from app.core.Interfaces.shift_interface import Report, SalesReport, Shift
+from app.core.Interfaces.shift_interface import (
+    ClosedReceipt,
+    Report,
+    SalesBucket,
+    SalesReport,
+    Shift,
+)
 
 
 class ShiftOperations(Protocol):
@@ -12,8 +19,24 @@ class ShiftOperations(Protocol):
     def get_x_report(self, shift_id: str) -> Report:
         pass
 
-    def get_lifetime_sales_report(self) -> SalesReport:
+    def get_z_report(self, shift_id: str) -> Report:
         pass
 
+    def get_lifetime_sales_report(
+        self, limit: Optional[int] = None, after_receipt_id: Optional[str] = None
+    ) -> SalesReport:
+        pass
+
+    def iter_closed_receipts(
+        self, after_receipt_id: Optional[str] = None
+    ) -> Iterator[ClosedReceipt]:
+        pass
+
+    def get_sales_timeseries(
+        self, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[SalesBucket]:
+        pass
+
+
 class ShiftRepositoryInterface(Repository[Shift], ShiftOperations, Protocol):
     pass
\ No newline at end of file
@@ -1,13 +1,10 @@
+from app.core.classes.campaign_index import CampaignIndex
 from app.core.Interfaces.campaign_discount_calculator_interface import (
     ICampaignDiscountCalculator,
 )
-from app.core.Interfaces.campaign_interface import BuyNGetN, Combo, Discount
+from app.core.Interfaces.campaign_interface import BuyNGetN, Campaign, Combo, Discount
 from app.core.Interfaces.discount_handler import DiscountHandler
 from app.core.Interfaces.receipt_interface import ReceiptProduct
-from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
-from app.infra.in_memory_repositories.campaign_in_memory_repository import (
-    CampaignAndProducts,
-)
 
 
 class CampaignDiscountCalculator(ICampaignDiscountCalculator):
@@ -16,20 +13,34 @@ class CampaignDiscountCalculator(ICampaignDiscountCalculator):
     def __init__(self, discount_handler: DiscountHandler):
         self.discount_handler = discount_handler
 
-    def calculate_price_for_campaign(
-        self,
-        receipt_id: str,
-        campaign_without_type_on_this_product: CampaignAndProducts,
-        receipt_product: ReceiptProduct,
-        receipt_repo: ReceiptRepositoryInterface,
+    def calculate_products_price(
+        self, receipt_products: list[ReceiptProduct], index: CampaignIndex
     ) -> int:
-        campaign = receipt_repo.get_campaign_with_campaign_id(
-            campaign_without_type_on_this_product.campaign_id
+        receipt_products_mask = index.products_mask(
+            receipt_product.id for receipt_product in receipt_products
+        )
+        return sum(
+            self.calculate_best_price(receipt_product, index, receipt_products_mask)
+            for receipt_product in receipt_products
         )
 
-        if campaign is None:
-            return receipt_product.total
+    def calculate_best_price(
+        self,
+        receipt_product: ReceiptProduct,
+        index: CampaignIndex,
+        receipt_products_mask: int,
+    ) -> int:
+        best_price = receipt_product.total
+        for rule in index.rules_for(receipt_product.id):
+            if rule.applies_to(receipt_products_mask):
+                best_price = min(
+                    best_price, self.apply_campaign(rule.campaign, receipt_product)
+                )
+        return best_price
 
+    def apply_campaign(
+        self, campaign: Campaign, receipt_product: ReceiptProduct
+    ) -> int:
         if campaign.type == "discount" and isinstance(campaign.data, Discount):
             return self.apply_discount_campaign(receipt_product, campaign.data)
 
@@ -37,13 +48,7 @@ class CampaignDiscountCalculator(ICampaignDiscountCalculator):
             return self.apply_buy_n_get_n_campaign(receipt_product, campaign.data)
 
         if campaign.type == "combo" and isinstance(campaign.data, Combo):
-            return self.apply_combo_campaign(
-                receipt_id,
-                receipt_product,
-                campaign_without_type_on_this_product,
-                campaign.data,
-                receipt_repo,
-            )
+            return self.apply_combo_campaign(receipt_product, campaign.data)
 
         return receipt_product.total
 
@@ -65,22 +70,8 @@ class CampaignDiscountCalculator(ICampaignDiscountCalculator):
         return receipt_product.total - (receipt_product.price * amount_of_free_products)
 
     def apply_combo_campaign(
-        self,
-        receipt_id: str,
-        receipt_product: ReceiptProduct,
-        campaign_without_type_on_this_product: CampaignAndProducts,
-        combo_data: Combo,
-        receipt_repo: ReceiptRepositoryInterface,
+        self, receipt_product: ReceiptProduct, combo_data: Combo
     ) -> int:
-        other_products_in_combo = receipt_repo.get_other_products_with_same_campaign(
-            campaign_without_type_on_this_product.campaign_id
-        )
-        other_products_in_combo.remove(campaign_without_type_on_this_product.product_id)
-
-        for next_product_id in other_products_in_combo:
-            if receipt_repo.product_not_in_receipt(next_product_id, receipt_id):
-                return receipt_product.total  # Combo failed
-
         return self.discount_handler.calculate_discounted_price(
             receipt_product.total, combo_data.discount_percentage
         )
@@ -0,0 +1,93 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, Iterable
+
+from app.core.Interfaces.campaign_interface import Campaign, Combo, ReceiptDiscount
+
+
+@dataclass(frozen=True)
+class CampaignRule:
+    campaign: Campaign
+    required_products_mask: int = 0
+
+    def applies_to(self, receipt_products_mask: int) -> bool:
+        required = self.required_products_mask
+        return receipt_products_mask & required == required
+
+
+@dataclass(frozen=True)
+class CampaignIndex:
+    """
+    Immutable pricing snapshot of the campaign catalog.
+
+    Combo members get one bit each, so a combo applies when its member mask is a
+    subset of the receipt's mask. Receipt discount thresholds are kept sorted,
+    in receipt-total units, next to the best percentage reachable at or below
+    each of them, so the best tier for an amount is one binary search away.
+    """
+
+    rules_by_product: Dict[str, tuple[CampaignRule, ...]] = field(default_factory=dict)
+    product_bits: Dict[str, int] = field(default_factory=dict)
+    receipt_discount_thresholds: tuple[int, ...] = ()
+    best_receipt_discounts: tuple[int, ...] = ()
+
+    @classmethod
+    def build(
+        cls, campaigns: Iterable[Campaign], min_amount_unit: int = 1
+    ) -> "CampaignIndex":
+        """
+        ``min_amount_unit`` converts ReceiptDiscount.min_amount into the units
+        receipt totals are kept in.
+        """
+        rules_by_product: Dict[str, list[CampaignRule]] = {}
+        product_bits: Dict[str, int] = {}
+        tiers: list[tuple[int, int]] = []
+
+        for campaign in campaigns:
+            if isinstance(campaign.data, ReceiptDiscount):
+                tiers.append(
+                    (
+                        round(campaign.data.min_amount * min_amount_unit),
+                        campaign.data.discount_percentage,
+                    )
+                )
+                continue
+
+            required_mask = 0
+            if isinstance(campaign.data, Combo):
+                for product_id in campaign.data.products:
+                    bit = product_bits.setdefault(product_id, 1 << len(product_bits))
+                    required_mask |= bit
+
+            rule = CampaignRule(campaign, required_mask)
+            for product_id in campaign.product_ids():
+                rules_by_product.setdefault(product_id, []).append(rule)
+
+        tiers.sort()
+        return cls(
+            rules_by_product={
+                product_id: tuple(rules)
+                for product_id, rules in rules_by_product.items()
+            },
+            product_bits=product_bits,
+            receipt_discount_thresholds=tuple(threshold for threshold, _ in tiers),
+            best_receipt_discounts=tuple(
+                accumulate((percentage for _, percentage in tiers), max)
+            ),
+        )
+
+    def rules_for(self, product_id: str) -> tuple[CampaignRule, ...]:
+        return self.rules_by_product.get(product_id, ())
+
+    def products_mask(self, product_ids: Iterable[str]) -> int:
+        mask = 0
+        for product_id in product_ids:
+            mask |= self.product_bits.get(product_id, 0)
+        return mask
+
+    def receipt_discount_percentage(self, amount: float) -> int | None:
+        position = bisect_right(self.receipt_discount_thresholds, amount)
+        if position == 0:
+            return None
+        return self.best_receipt_discounts[position - 1]
@@ -0,0 +1,86 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.classes.exchange_rate_snapshot import save_rates_to_snapshot
+from app.core.classes.latency_histogram import LatencyHistogram
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT_SECONDS = 3.05
+READ_TIMEOUT_SECONDS = 5.0
+MAX_RETRIES = 2
+
+
+def create_session(max_retries: int = MAX_RETRIES) -> requests.Session:
+    """Keep-alive session that retries connection errors and 429/5xx replies."""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+class ExchangeRateApiProvider(ExchangeRateProvider):
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        snapshot_path: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: tuple[float, float] = (CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
+    ) -> None:
+        self.key = key or os.environ.get("EXCHANGE_RATE_API_KEY")
+        self.snapshot_path = snapshot_path
+        self.session = session if session is not None else create_session()
+        self.timeout = timeout
+        self.fetch_latency = LatencyHistogram()
+
+    def fetch_rates(self, base_currency: str) -> Dict[str, float]:
+        url = f"https://v6.exchangerate-api.com/v6/{self.key}/latest/{base_currency}"
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        finally:
+            self._record_latency(base_currency, time.perf_counter() - started)
+        data = response.json()
+
+        if data.get("result") == "success":
+            conversion_rates = {
+                currency: float(rate)
+                for currency, rate in data["conversion_rates"].items()
+            }
+            if self.snapshot_path:
+                save_rates_to_snapshot(
+                    self.snapshot_path, base_currency, conversion_rates
+                )
+            return conversion_rates
+        else:
+            raise ValueError(
+                f"Error fetching exchange rate data: {data.get('error-type')}"
+            )
+
+    def _record_latency(self, base_currency: str, seconds: float) -> None:
+        """Count the fetch and log the histogram so far, one line per fetch."""
+        self.fetch_latency.observe(seconds)
+        logger.info(
+            "Fetched %s rates in %.1f ms; mean %.1f ms over %d fetches: %s",
+            base_currency,
+            seconds * 1000,
+            self.fetch_latency.mean_ms(),
+            self.fetch_latency.count,
+            self.fetch_latency.snapshot(),
+        )
@@ -1,26 +1,164 @@
+import logging
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
 
-import requests
 from dotenv import load_dotenv
 
+from app.core.classes.exchange_rate_api_provider import ExchangeRateApiProvider
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = float(os.environ.get("EXCHANGE_RATE_TTL_SECONDS", 3600))
+DEFAULT_REFRESH_AHEAD_SECONDS = 300.0
+DEFAULT_REFRESH_INTERVAL_SECONDS = 60.0
+DEFAULT_BASE_CURRENCIES = ("GEL",)
+
+
+@dataclass
+class RateTable:
+    conversion_rates: Dict[str, float]
+    fetched_at: float
+
+    def age(self, now: float) -> float:
+        return now - self.fetched_at
+
 
 class ExchangeRateService:
-    key = os.environ.get("EXCHANGE_RATE_API_KEY")
+    """
+    Serves conversion rates from per-base-currency tables held in memory.
+
+    A table older than ``ttl_seconds - refresh_ahead_seconds`` is re-fetched in
+    the background while the last good table keeps being served, so only the
+    very first lookup for a base currency ever waits on the provider.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[ExchangeRateProvider] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        refresh_ahead_seconds: float = DEFAULT_REFRESH_AHEAD_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider if provider is not None else ExchangeRateApiProvider()
+        self.ttl_seconds = ttl_seconds
+        # refreshing ahead by the whole TTL would make every lookup start a fetch
+        self.refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds / 2)
+        self.clock = clock
+        self._rate_tables: Dict[str, RateTable] = {}
+        self._lock = threading.Lock()
+        self._pending_refreshes: Dict[str, Future[Optional[RateTable]]] = {}
+        self._cold_fetches: Dict[str, Future[RateTable]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="exchange-rate-refresh"
+        )
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_refresher = threading.Event()
 
     def get_exchange_rate(self, from_currency: str, to_currency: str) -> float:
-        url = f"https://v6.exchangerate-api.com/v6/{self.key}/latest/{from_currency}"
-        response = requests.get(url)
-        data = response.json()
-
-        if data.get("result") == "success":
-            conversion_rate = data["conversion_rates"].get(to_currency)
-            if conversion_rate:
-                return float(conversion_rate)
-            else:
-                raise ValueError(f"Conversion rate for {to_currency} not found.")
+        conversion_rates = self.get_rate_table(from_currency).conversion_rates
+        conversion_rate = conversion_rates.get(to_currency)
+        if conversion_rate:
+            return float(conversion_rate)
         else:
-            raise ValueError(
-                f"Error fetching exchange rate data: {data.get('error-type')}"
+            raise ValueError(f"Conversion rate for {to_currency} not found.")
+
+    def get_rate_table(self, base_currency: str) -> RateTable:
+        table = self._rate_tables.get(base_currency)
+        if table is None:
+            return self._fetch_once(base_currency)
+        if self._is_due_for_refresh(table):
+            self.refresh_in_background(base_currency)
+        return table
+
+    def refresh(self, base_currency: str) -> RateTable:
+        table = RateTable(self.provider.fetch_rates(base_currency), self.clock())
+        with self._lock:
+            self._rate_tables[base_currency] = table
+        return table
+
+    def refresh_in_background(self, base_currency: str) -> Future[Optional[RateTable]]:
+        with self._lock:
+            pending = self._pending_refreshes.get(base_currency)
+            if pending is None or pending.done():
+                pending = self._executor.submit(self._refresh_quietly, base_currency)
+                self._pending_refreshes[base_currency] = pending
+            return pending
+
+    def start_background_refresh(
+        self,
+        base_currencies: Iterable[str] = DEFAULT_BASE_CURRENCIES,
+        interval_seconds: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+    ) -> None:
+        if self._refresher is not None:
+            return
+        self._stop_refresher.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            args=(tuple(base_currencies), interval_seconds),
+            name="exchange-rate-refresher",
+            daemon=True,
+        )
+        self._refresher.start()
+
+    def stop_background_refresh(self) -> None:
+        if self._refresher is None:
+            return
+        self._stop_refresher.set()
+        self._refresher.join()
+        self._refresher = None
+
+    def _refresh_loop(
+        self, base_currencies: tuple[str, ...], interval_seconds: float
+    ) -> None:
+        while not self._stop_refresher.is_set():
+            for base_currency in base_currencies:
+                table = self._rate_tables.get(base_currency)
+                if table is None or self._is_due_for_refresh(table):
+                    self._refresh_quietly(base_currency)
+            self._stop_refresher.wait(interval_seconds)
+
+    def _fetch_once(self, base_currency: str) -> RateTable:
+        """Coalesce concurrent cold lookups of one base into a single fetch."""
+        with self._lock:
+            table = self._rate_tables.get(base_currency)
+            if table is not None:
+                return table
+            cold_fetch = self._cold_fetches.get(base_currency)
+            is_leader = cold_fetch is None
+            if cold_fetch is None:
+                cold_fetch = Future()
+                self._cold_fetches[base_currency] = cold_fetch
+
+        if not is_leader:
+            return cold_fetch.result()
+
+        try:
+            table = self.refresh(base_currency)
+            cold_fetch.set_result(table)
+            return table
+        except Exception as error:
+            cold_fetch.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._cold_fetches[base_currency]
+
+    def _refresh_quietly(self, base_currency: str) -> Optional[RateTable]:
+        try:
+            return self.refresh(base_currency)
+        except Exception:
+            logger.warning(
+                "Keeping stale %s rates, refresh failed", base_currency, exc_info=True
             )
+            return None
+
+    def _is_due_for_refresh(self, table: RateTable) -> bool:
+        age = table.age(self.clock())
+        return age >= self.ttl_seconds - self.refresh_ahead_seconds
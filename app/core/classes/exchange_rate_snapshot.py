@@ -0,0 +1,85 @@
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict
+
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
+
+RateSnapshot = Dict[str, Dict[str, float]]
+
+
+def load_rate_snapshot(path: str) -> RateSnapshot:
+    """Read a {base: {currency: rate}} snapshot from a JSON or SQLite file."""
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"Exchange rate snapshot {path} does not exist")
+    if Path(path).suffix == ".json":
+        with open(path) as snapshot_file:
+            data = json.load(snapshot_file)
+        return {
+            base: {currency: float(rate) for currency, rate in rates.items()}
+            for base, rates in data.items()
+        }
+
+    snapshot: RateSnapshot = {}
+    with closing(sqlite3.connect(path)) as connection:
+        rows = connection.execute(
+            "SELECT base_currency, currency, rate FROM exchange_rates"
+        ).fetchall()
+    for base_currency, currency, rate in rows:
+        snapshot.setdefault(base_currency, {})[currency] = float(rate)
+    return snapshot
+
+
+def save_rates_to_snapshot(
+    path: str, base_currency: str, conversion_rates: Dict[str, float]
+) -> None:
+    """Store one base currency's table, keeping the other bases in the file."""
+    if Path(path).suffix == ".json":
+        snapshot = load_rate_snapshot(path) if Path(path).exists() else {}
+        snapshot[base_currency] = conversion_rates
+        with open(path, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file, indent=2, sort_keys=True)
+        return
+
+    with closing(sqlite3.connect(path)) as connection, connection:
+        _create_snapshot_table(connection)
+        connection.execute(
+            "DELETE FROM exchange_rates WHERE base_currency = ?", (base_currency,)
+        )
+        connection.executemany(
+            "INSERT INTO exchange_rates (base_currency, currency, rate) "
+            "VALUES (?, ?, ?)",
+            [
+                (base_currency, currency, rate)
+                for currency, rate in conversion_rates.items()
+            ],
+        )
+
+
+def _create_snapshot_table(connection: sqlite3.Connection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            base_currency TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            rate REAL NOT NULL,
+            PRIMARY KEY (base_currency, currency)
+        )
+        """
+    )
+
+
+class SnapshotExchangeRateProvider(ExchangeRateProvider):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.rates = load_rate_snapshot(path)
+
+    def fetch_rates(self, base_currency: str) -> Dict[str, float]:
+        conversion_rates = self.rates.get(base_currency)
+        if conversion_rates is None:
+            raise ValueError(
+                f"Error fetching exchange rate data: "
+                f"{base_currency} is not in snapshot {self.path}"
+            )
+        return dict(conversion_rates)
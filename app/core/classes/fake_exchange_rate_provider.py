@@ -0,0 +1,31 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
+
+DEFAULT_RATES: Dict[str, Dict[str, float]] = {
+    "GEL": {"GEL": 1.0, "USD": 0.37, "EUR": 0.34},
+}
+
+
+@dataclass
+class FakeExchangeRateProvider(ExchangeRateProvider):
+    """Offline stand-in for the HTTP provider with a configurable latency."""
+
+    rates: Dict[str, Dict[str, float]] = field(
+        default_factory=lambda: {
+            base: dict(table) for base, table in DEFAULT_RATES.items()
+        }
+    )
+    latency_seconds: float = 0
+    failing: bool = False
+    calls: int = 0
+
+    def fetch_rates(self, base_currency: str) -> Dict[str, float]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.failing or base_currency not in self.rates:
+            raise ValueError("Error fetching exchange rate data: unsupported-code")
+        return dict(self.rates[base_currency])
@@ -0,0 +1,37 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import Dict
+
+DEFAULT_BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+
+@dataclass
+class LatencyHistogram:
+    """Fetch latencies counted into fixed millisecond buckets."""
+
+    buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS
+    counts: list[int] = field(init=False)
+    count: int = field(init=False, default=0)
+    total_ms: float = field(init=False, default=0.0)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+
+    def observe(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        index = bisect.bisect_left(self.buckets_ms, milliseconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += milliseconds
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            labels = [f"<={bound:g}ms" for bound in self.buckets_ms]
+            labels.append(f">{self.buckets_ms[-1]:g}ms")
+            return dict(zip(labels, self.counts))
+
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
@@ -0,0 +1,31 @@
+from typing import Iterable
+
+from app.core.Interfaces.receipt_interface import ReceiptProduct
+
+
+def merge_receipt_lines(
+    lines: list[ReceiptProduct], added: Iterable[ReceiptProduct]
+) -> list[ReceiptProduct]:
+    """
+    Fold ``added`` into ``lines`` so each product_id keeps a single line.
+
+    A merged line keeps its first unit price and sums quantity and total.
+    Lines are replaced rather than mutated, so earlier copies of the list
+    stay valid.
+    """
+    merged = list(lines)
+    positions = {line.id: position for position, line in enumerate(merged)}
+    for line in added:
+        position = positions.get(line.id)
+        if position is None:
+            positions[line.id] = len(merged)
+            merged.append(line)
+        else:
+            current = merged[position]
+            merged[position] = ReceiptProduct(
+                id=current.id,
+                quantity=current.quantity + line.quantity,
+                price=current.price,
+                total=current.total + line.total,
+            )
+    return merged
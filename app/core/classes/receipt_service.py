@@ -1,7 +1,6 @@
 import uuid
 from dataclasses import dataclass
 
-from app.core.classes.errors import AlreadyClosedError
 from app.core.Interfaces.receipt_interface import (
     AddProductRequest,
     Receipt,
@@ -38,17 +37,18 @@ class ReceiptService(ReceiptInterface):
         return self.repository.read(receipt_id)
 
     def close_receipt(self, receipt_id: str) -> None:
-        receipt = self.read_receipt(receipt_id)
-        if receipt.status == "closed":
-            raise AlreadyClosedError(f"Receipt with ID {receipt.id} is already closed.")
-        receipt.status = "closed"
-        self.repository.update(receipt)
+        self.repository.close_receipt(receipt_id)
 
     def add_product(
         self, receipt_id: str, product_request: AddProductRequest
     ) -> Receipt:
         return self.repository.add_product_to_receipt(receipt_id, product_request)
 
+    def add_products(
+        self, receipt_id: str, product_requests: list[AddProductRequest]
+    ) -> Receipt:
+        return self.repository.add_products_to_receipt(receipt_id, product_requests)
+
     def calculate_payment(self, receipt_id: str) -> ReceiptForPayment:
         return self.repository.calculate_payment(receipt_id)
 
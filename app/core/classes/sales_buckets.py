@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+# Sales are rolled up per hour. A bucket is named by the UTC start of its hour,
+# in the same format SQLite's strftime produces, so both backends and the
+# migration agree on bucket keys and keys sort in time order.
+BUCKET_FORMAT = "%Y-%m-%dT%H:00:00Z"
+
+GRANULARITIES = ("hour", "day")
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def timestamp(moment: datetime) -> str:
+    """ISO 8601 time in UTC, as stored in ``Receipt.closed_at``."""
+    return _utc(moment).isoformat(timespec="seconds")
+
+
+def bucket_start(moment: datetime, granularity: str = "hour") -> str:
+    """Name of the hour bucket that starts the hour or day holding ``moment``."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity}.")
+    moment = _utc(moment)
+    if granularity == "day":
+        moment = moment.replace(hour=0)
+    return moment.strftime(BUCKET_FORMAT)
+
+
+def bucket_after(moment: datetime, granularity: str = "hour") -> str:
+    """Name of the hour bucket that starts the hour or day after ``moment``'s."""
+    step = timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+    start = datetime.strptime(bucket_start(moment, granularity), BUCKET_FORMAT)
+    return (start + step).strftime(BUCKET_FORMAT)
+
+
+def bucket_of(closed_at: str) -> str:
+    return bucket_start(datetime.fromisoformat(closed_at))
+
+
+def coarsen(hour_bucket: str, granularity: str) -> str:
+    """The hour or day bucket an hour bucket falls into."""
+    if granularity == "day":
+        return hour_bucket[:10] + "T00:00:00Z"
+    return hour_bucket
+
+
+def _utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
@@ -1,10 +1,14 @@
 import uuid
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Optional
 
 from app.core.classes.errors import DoesntExistError
 from app.core.Interfaces.receipt_interface import Receipt
 from app.core.Interfaces.shift_interface import (
+    ClosedReceipt,
     Report,
+    SalesBucket,
     SalesReport,
     Shift,
     ShiftInterface,
@@ -45,8 +49,23 @@ class ShiftService(ShiftInterface):
     def get_x_report(self, shift_id: str) -> Report:
         return self.repository.get_x_report(shift_id)
 
-    def get_lifetime_sales_report(self) -> SalesReport:
-        return self.repository.get_lifetime_sales_report()
+    def get_z_report(self, shift_id: str) -> Report:
+        return self.repository.get_z_report(shift_id)
+
+    def get_lifetime_sales_report(
+        self, limit: Optional[int] = None, after_receipt_id: Optional[str] = None
+    ) -> SalesReport:
+        return self.repository.get_lifetime_sales_report(limit, after_receipt_id)
+
+    def iter_closed_receipts(
+        self, after_receipt_id: Optional[str] = None
+    ) -> Iterator[ClosedReceipt]:
+        return self.repository.iter_closed_receipts(after_receipt_id)
+
+    def get_sales_timeseries(
+        self, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[SalesBucket]:
+        return self.repository.get_sales_timeseries(start, end, granularity)
 
     def get_shift(self, shift_id: str) -> Shift:
         try:
@@ -1,4 +1,4 @@
-from typing import Any, Protocol
+from typing import Any, Optional, Protocol
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.requests import Request
@@ -32,6 +32,7 @@ class ReceiptEntry(BaseModel):
     status: str
     products: list[ReceiptProductDict]
     total_in_GEL: float
+    closed_at: Optional[str] = None
 
 
 class PaymentResponse(BaseModel):
@@ -47,6 +48,10 @@ class CreateReceiptRequest(BaseModel):
     currency: str
 
 
+class AddProductsRequest(BaseModel):
+    products: list[AddProductRequest]
+
+
 class ReceiptResponse(BaseModel):
     receipt: ReceiptEntry
 
@@ -166,6 +171,38 @@ def add_product(
     return get_receipt_response(receipt)
 
 
+@receipts_api.post(
+    "/{receipt_id}/products/batch",
+    status_code=201,
+    responses={
+        404: {"model": ErrorResponse, "description": "Product not found."},
+        400: {"model": ErrorResponse, "description": "receipt already closed ."},
+    },
+)
+def add_products(
+    receipt_id: str,
+    request: AddProductsRequest,
+    receipts_repo: ReceiptRepositoryInterface = Depends(create_receipts_repository),
+) -> ReceiptResponse:
+    receipt_service = ReceiptService(receipts_repo)
+
+    try:
+        receipt = receipt_service.add_products(receipt_id, request.products)
+    except DoesntExistError:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": {"message": "product or receipt with this id does not exist."}
+            },
+        )
+    except AlreadyClosedError:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"message": "receipt with this id already closed."}},
+        )
+    return get_receipt_response(receipt)
+
+
 def get_receipt_response(receipt: Receipt) -> ReceiptResponse:
     return ReceiptResponse(
         receipt=ReceiptEntry(
@@ -183,6 +220,7 @@ def get_receipt_response(receipt: Receipt) -> ReceiptResponse:
                 for p in receipt.products
             ],
             total_in_GEL=float(receipt.total / 100),
+            closed_at=receipt.closed_at,
         )
     )
 
@@ -1,17 +1,22 @@
-from typing import Dict, Protocol
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Literal, Optional, Protocol
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.requests import Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.core.classes.errors import DoesntExistError, OpenReceiptsError
 from app.core.classes.shift_service import ShiftService
-from app.core.Interfaces.shift_interface import Report, Shift
+from app.core.Interfaces.shift_interface import ClosedReceipt, Report, Shift
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
 from app.infra.api.products import ErrorResponse
 
 shifts_api = APIRouter()
 
+MAX_SALES_PAGE_SIZE = 1000
+
 
 class _Infra(Protocol):
     def shifts(self) -> ShiftRepositoryInterface:
@@ -44,10 +49,23 @@ class ClosedReceiptResponse(BaseModel):
     calculated_payment: float
 
 
+class SalesBucketResponse(BaseModel):
+    bucket: str
+    n_receipts: int
+    revenue: Dict[str, float]
+    products: list[Dict[str, Any]]
+
+
+class SalesTimeseriesResponse(BaseModel):
+    granularity: str
+    buckets: list[SalesBucketResponse]
+
+
 class SalesReportResponse(BaseModel):
     total_receipts: int
     total_revenue: Dict[str, float]
-    closed_receipts: list[ClosedReceiptResponse]
+    closed_receipts: Optional[list[ClosedReceiptResponse]] = None
+    next_after_receipt_id: Optional[str] = None
 
 
 @shifts_api.post(
@@ -87,6 +105,28 @@ def get_x_reports(
         raise HTTPException(status_code=400, detail="Shift is closed.")
 
 
+@shifts_api.get(
+    "/{shift_id}/z-report",
+    responses={
+        400: {"model": ErrorResponse, "description": "shift is still open."},
+        404: {"model": ErrorResponse, "description": "shift not found"},
+    },
+)
+def get_z_report(
+    shift_id: str,
+    repository: ShiftRepositoryInterface = Depends(create_shift_repository),
+) -> ZReportResponse:
+    """The report archived when the shift was closed."""
+    shift_service = ShiftService(repository)
+    try:
+        z_response = shift_service.get_z_report(shift_id)
+        return ZReportResponse(z_report=z_response)
+    except DoesntExistError:
+        raise HTTPException(status_code=404, detail="Shift not found.")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Shift is open.")
+
+
 @shifts_api.post(
     "/close-shift",
     responses={
@@ -134,21 +174,104 @@ def close_shift(
 
 @shifts_api.get("/sales", response_model=SalesReportResponse)
 def get_sales_report(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_SALES_PAGE_SIZE),
+    after_receipt_id: Optional[str] = None,
     repository: ShiftRepositoryInterface = Depends(create_shift_repository),
 ) -> SalesReportResponse:
+    """
+    Lifetime totals; pass ``limit`` to also list a page of closed receipts.
+
+    Receipts are listed in id order, after ``after_receipt_id``. The last id
+    of a full page is returned as ``next_after_receipt_id`` for the next one.
+    """
     shift_service = ShiftService(repository)
     try:
-        report = shift_service.get_lifetime_sales_report()
+        report = shift_service.get_lifetime_sales_report(limit, after_receipt_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if limit is None:
         return SalesReportResponse(
             total_receipts=report.total_receipts,
             total_revenue=report.total_revenue,
-            closed_receipts=[
-                ClosedReceiptResponse(
-                    receipt_id=receipt.receipt_id,
-                    calculated_payment=receipt.calculated_payment,
-                )
-                for receipt in report.closed_receipts
-            ],
         )
+    return SalesReportResponse(
+        total_receipts=report.total_receipts,
+        total_revenue=report.total_revenue,
+        closed_receipts=[
+            ClosedReceiptResponse(
+                receipt_id=receipt.receipt_id,
+                calculated_payment=receipt.calculated_payment,
+            )
+            for receipt in report.closed_receipts
+        ],
+        next_after_receipt_id=report.closed_receipts[-1].receipt_id
+        if len(report.closed_receipts) == limit
+        else None,
+    )
+
+
+@shifts_api.get(
+    "/sales/receipts",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One closed receipt per line.",
+        },
+    },
+)
+def stream_closed_receipts(
+    after_receipt_id: Optional[str] = None,
+    repository: ShiftRepositoryInterface = Depends(create_shift_repository),
+) -> StreamingResponse:
+    """Closed receipts in id order as newline-delimited JSON, sent as read."""
+    shift_service = ShiftService(repository)
+    receipts = shift_service.iter_closed_receipts(after_receipt_id)
+    return StreamingResponse(_ndjson(receipts), media_type="application/x-ndjson")
+
+
+@shifts_api.get("/sales/timeseries", response_model=SalesTimeseriesResponse)
+def get_sales_timeseries(
+    start: datetime,
+    end: datetime,
+    granularity: Literal["hour", "day"] = "hour",
+    repository: ShiftRepositoryInterface = Depends(create_shift_repository),
+) -> SalesTimeseriesResponse:
+    """
+    Revenue per currency and sales per product, bucketed by hour or day.
+
+    Buckets run from the one holding ``start`` through the one holding
+    ``end``; times without an offset are taken as UTC. Revenue is in each
+    receipt's currency, product totals are undiscounted GEL tetri.
+    """
+    shift_service = ShiftService(repository)
+    try:
+        buckets = shift_service.get_sales_timeseries(start, end, granularity)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return SalesTimeseriesResponse(
+        granularity=granularity,
+        buckets=[
+            SalesBucketResponse(
+                bucket=bucket.bucket,
+                n_receipts=bucket.n_receipts,
+                revenue=bucket.revenue,
+                products=bucket.products,
+            )
+            for bucket in buckets
+        ],
+    )
+
+
+def _ndjson(receipts: Iterator[ClosedReceipt]) -> Iterator[str]:
+    for receipt in receipts:
+        yield (
+            json.dumps(
+                {
+                    "receipt_id": receipt.receipt_id,
+                    "calculated_payment": receipt.calculated_payment,
+                }
+            )
+            + "\n"
+        )
@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
+from typing import Optional
 
 from app.core.classes.exchange_rate_service import ExchangeRateService
 from app.core.Interfaces.campaign_interface import Campaign
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
 from app.core.Interfaces.repository import Repository
@@ -22,6 +24,8 @@ from app.infra.in_memory_repositories.shift_in_memory_repository import (
 
 @dataclass
 class InMemory:
+    exchange_rate_provider: Optional[ExchangeRateProvider] = None
+
     _products: ProductInMemoryRepository = field(
         init=False,
         default_factory=ProductInMemoryRepository,
@@ -38,11 +42,10 @@ class InMemory:
     _campaigns: CampaignInMemoryRepository = field(
         init=False,
     )
-    _exchange_rate_service: ExchangeRateService = field(
-        init=False, default_factory=ExchangeRateService
-    )
+    _exchange_rate_service: ExchangeRateService = field(init=False)
 
     def __post_init__(self) -> None:
+        self._exchange_rate_service = ExchangeRateService(self.exchange_rate_provider)
         self._campaigns = CampaignInMemoryRepository(
             products_repo=self._products,
         )
@@ -64,3 +67,6 @@ class InMemory:
 
     def shifts(self) -> ShiftRepositoryInterface:
         return self._shifts
+
+    def exchange_rate_service(self) -> ExchangeRateService:
+        return self._exchange_rate_service
@@ -1,9 +1,13 @@
 import uuid
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Optional
 
+from app.core.classes.campaign_index import CampaignIndex
 from app.core.classes.errors import DoesntExistError
 from app.core.Interfaces.campaign_interface import BuyNGetN, Campaign, Combo, Discount
+from app.core.Interfaces.campaign_repository_interface import (
+    CampaignRepositoryInterface,
+)
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.repository import Repository
 from app.infra.in_memory_repositories.product_in_memory_repository import (
@@ -11,7 +15,7 @@ from app.infra.in_memory_repositories.product_in_memory_repository import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class CampaignAndProducts:
     id: str
     campaign_id: str
@@ -20,7 +24,7 @@ class CampaignAndProducts:
 
 
 @dataclass
-class CampaignInMemoryRepository(Repository[Campaign]):
+class CampaignInMemoryRepository(CampaignRepositoryInterface):
     products_repo: Repository[Product] = field(
         default_factory=ProductInMemoryRepository
     )
@@ -29,9 +33,18 @@ class CampaignInMemoryRepository(Repository[Campaign]):
         default_factory=dict
     )
     campaigns: list[Campaign] = field(default_factory=list)
+    campaigns_by_id: Dict[str, Campaign] = field(init=False)
+    _index: Optional[CampaignIndex] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self.campaigns_by_id = {
+            campaign.campaign_id: campaign for campaign in self.campaigns
+        }
 
     def create(self, campaign: Campaign) -> Campaign:
         self.campaigns.append(campaign)
+        self.campaigns_by_id[campaign.campaign_id] = campaign
+        self._index = None
         if campaign.type == "discount" and isinstance(campaign.data, Discount):
             if self.product_does_not_exist(campaign.data.product_id):
                 raise DoesntExistError
@@ -87,11 +100,10 @@ class CampaignInMemoryRepository(Repository[Campaign]):
         return campaign
 
     def delete(self, campaign_id: str) -> None:
-        find: bool = False
-        for campaign in self.campaigns:
-            if campaign.campaign_id == campaign_id:
-                self.campaigns.remove(campaign)
-                find = True
+        campaign = self.campaigns_by_id.pop(campaign_id, None)
+        if campaign is not None:
+            self.campaigns.remove(campaign)
+            self._index = None
 
         for product_id, campaign_product_list in list(
             self.campaigns_product_list.items()
@@ -101,22 +113,30 @@ class CampaignInMemoryRepository(Repository[Campaign]):
                     del self.campaigns_product_list[product_id]
                     return
 
-        if not find:
+        if campaign is None:
             raise DoesntExistError
         return
 
     def read_all(self) -> list[Campaign]:
         return self.campaigns
 
+    def index(self) -> CampaignIndex:
+        if self._index is None:
+            self._index = CampaignIndex.build(self.campaigns)
+        return self._index
+
     def read(self, campaign_id: str) -> Campaign:
-        raise NotImplementedError("Not implemented yet.")
+        campaign = self.campaigns_by_id.get(campaign_id)
+        if campaign is None:
+            raise DoesntExistError(f"Campaign with ID {campaign_id} does not exist.")
+        return campaign
 
     def update(self, campaign: Campaign) -> None:
         raise NotImplementedError("Not implemented yet.")
 
     def product_does_not_exist(self, product_id: str) -> bool:
-        for product_from_list in self.products_repo.read_all():
-            if product_from_list.id == product_id:
-                return False
-
-        return True
+        try:
+            self.products_repo.read(product_id)
+        except DoesntExistError:
+            return True
+        return False
@@ -0,0 +1,101 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterator
+
+from app.core.Interfaces.receipt_interface import Receipt
+
+
+@dataclass
+class CodeTable:
+    """Interns repeated strings, such as product ids, as small integer codes."""
+
+    codes: Dict[str, int] = field(default_factory=dict)
+    values: list[str] = field(default_factory=list)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+@dataclass
+class ClosedReceiptLedger:
+    """
+    Closed receipts of one shift, kept column by column.
+
+    Every closed receipt is one row of the receipt columns and every line one
+    row of the line columns. Reports sum the columns, and the sums are kept:
+    each read folds in only the rows appended since the last one, so polling
+    the X report costs O(products) plus the receipts closed in between.
+    """
+
+    products: CodeTable
+    currencies: CodeTable
+    receipt_currencies: "array[int]" = field(default_factory=lambda: array("q"))
+    receipt_discounted_totals: "array[float]" = field(
+        default_factory=lambda: array("d")
+    )
+    line_products: "array[int]" = field(default_factory=lambda: array("q"))
+    line_quantities: "array[int]" = field(default_factory=lambda: array("q"))
+    line_totals: "array[int]" = field(default_factory=lambda: array("q"))
+    # currency code -> revenue, product code -> units, over the folded rows
+    _revenue: Dict[int, float] = field(default_factory=dict)
+    _quantities: Dict[int, int] = field(default_factory=dict)
+    _folded_receipts: int = 0
+    _folded_lines: int = 0
+
+    def __len__(self) -> int:
+        return len(self.receipt_currencies)
+
+    def append(self, receipt: Receipt) -> range:
+        """Add a closed receipt; returns the line rows it was given."""
+        self.receipt_currencies.append(self.currencies.code(receipt.currency))
+        self.receipt_discounted_totals.append(receipt.discounted_total)
+        first = len(self.line_products)
+        for line in receipt.products:
+            self.line_products.append(self.products.code(line.id))
+            self.line_quantities.append(line.quantity)
+            self.line_totals.append(line.total)
+        return range(first, len(self.line_products))
+
+    def lines(self, rows: range) -> Iterator[tuple[str, int, int]]:
+        """Product id, quantity and total of each line row in ``rows``."""
+        products = self.products.values
+        for code, quantity, total in zip(
+            self.line_products[rows.start : rows.stop],
+            self.line_quantities[rows.start : rows.stop],
+            self.line_totals[rows.start : rows.stop],
+        ):
+            yield products[code], quantity, total
+
+    def revenue_by_currency(self, revenue: Dict[str, float]) -> Dict[str, float]:
+        """Add this shift's discounted totals to ``revenue``, per currency."""
+        self._fold()
+        currencies = self.currencies.values
+        for code, amount in self._revenue.items():
+            currency = currencies[code]
+            revenue[currency] = revenue.get(currency, 0) + amount
+        return revenue
+
+    def quantities_by_product(self) -> Dict[str, int]:
+        """Units sold per product, in the order products were first sold."""
+        self._fold()
+        products = self.products.values
+        return {products[code]: quantity for code, quantity in self._quantities.items()}
+
+    def _fold(self) -> None:
+        start = self._folded_receipts
+        for code, amount in zip(
+            self.receipt_currencies[start:], self.receipt_discounted_totals[start:]
+        ):
+            self._revenue[code] = self._revenue.get(code, 0) + amount
+        self._folded_receipts = len(self.receipt_currencies)
+
+        start = self._folded_lines
+        for code, quantity in zip(
+            self.line_products[start:], self.line_quantities[start:]
+        ):
+            self._quantities[code] = self._quantities.get(code, 0) + quantity
+        self._folded_lines = len(self.line_products)
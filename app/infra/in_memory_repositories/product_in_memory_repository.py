@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from typing import Dict
 
 from app.core.classes.errors import DoesntExistError, ExistsError
 from app.core.Interfaces.product_interface import Product
@@ -8,33 +9,50 @@ from app.core.Interfaces.repository import Repository
 @dataclass
 class ProductInMemoryRepository(Repository[Product]):
     products: list[Product] = field(default_factory=list)
+    products_by_id: Dict[str, Product] = field(init=False)
+    products_by_barcode: Dict[str, Product] = field(init=False)
+    # product id -> position of the product in products
+    product_positions: Dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.products_by_id = {product.id: product for product in self.products}
+        self.products_by_barcode = {
+            product.barcode: product for product in self.products
+        }
+        self.product_positions = {
+            product.id: position for position, product in enumerate(self.products)
+        }
 
     def create(self, product: Product) -> Product:
-        for existing_product in self.products:
-            if existing_product.barcode == product.barcode:
-                raise ExistsError(product.barcode)
+        if product.barcode in self.products_by_barcode:
+            raise ExistsError(product.barcode)
 
+        self.product_positions[product.id] = len(self.products)
         self.products.append(product)
+        self.products_by_id[product.id] = product
+        self.products_by_barcode[product.barcode] = product
         return product
 
     def read(self, product_id: str) -> Product:
-        for product in self.products:
-            if product.id == product_id:
-                return product
-        raise DoesntExistError
+        product = self.products_by_id.get(product_id)
+        if product is None:
+            raise DoesntExistError
+        return product
 
     def update(self, product: Product) -> None:
-        find: bool = False
-        for _product in self.products:
-            if _product.id == product.id:
-                self.products.remove(_product)
-                self.products.append(product)
-                return
-        if not find:
-            raise DoesntExistError
+        existing = self.read(product.id)
+        owner = self.products_by_barcode.get(product.barcode)
+        if owner is not None and owner.id != product.id:
+            raise ExistsError(product.barcode)
+
+        self.products[self.product_positions[product.id]] = product
+        self.products_by_id[product.id] = product
+        if self.products_by_barcode.get(existing.barcode) is existing:
+            del self.products_by_barcode[existing.barcode]
+        self.products_by_barcode[product.barcode] = product
 
     def read_all(self) -> list[Product]:
         return self.products
 
     def delete(self, product_id: str) -> None:
-        raise NotImplementedError("Not implemented yet.")
\ No newline at end of file
+        raise NotImplementedError("Not implemented yet.")
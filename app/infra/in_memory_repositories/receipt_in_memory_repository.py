@@ -1,14 +1,13 @@
-from copy import deepcopy
 from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict
 
 from app.core.classes.campaign_discount_calculator import CampaignDiscountCalculator
 from app.core.classes.errors import AlreadyClosedError, DoesntExistError
 from app.core.classes.exchange_rate_service import ExchangeRateService
 from app.core.classes.percentage_discount import PercentageDiscount
-from app.core.Interfaces.campaign_interface import (
-    Campaign,
-    ReceiptDiscount,
-)
+from app.core.classes.receipt_lines import merge_receipt_lines
+from app.core.classes.sales_buckets import timestamp, utc_now
 from app.core.Interfaces.discount_handler import DiscountHandler
 from app.core.Interfaces.receipt_interface import (
     AddProductRequest,
@@ -18,7 +17,6 @@ from app.core.Interfaces.receipt_interface import (
 )
 from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
 from app.infra.in_memory_repositories.campaign_in_memory_repository import (
-    CampaignAndProducts,
     CampaignInMemoryRepository,
 )
 from app.infra.in_memory_repositories.product_in_memory_repository import (
@@ -43,128 +41,120 @@ class ReceiptInMemoryRepository(ReceiptRepositoryInterface):
         default_factory=ExchangeRateService
     )
     discount_handler: DiscountHandler = field(default_factory=PercentageDiscount)
+    clock: Callable[[], datetime] = utc_now
     campaign_discount_calculator: CampaignDiscountCalculator = field(init=False)
+    receipts_by_id: Dict[str, Receipt] = field(init=False)
+    # receipt id -> position of the receipt in receipts
+    receipt_positions: Dict[str, int] = field(init=False)
 
     def __post_init__(self) -> None:
+        self.receipts_by_id = {receipt.id: receipt for receipt in self.receipts}
+        self.receipt_positions = {
+            receipt.id: position for position, receipt in enumerate(self.receipts)
+        }
         self.campaign_discount_calculator = CampaignDiscountCalculator(
             self.discount_handler
         )
 
     def create(self, receipt: Receipt) -> Receipt:
-        shift_found = False
-        for shift in self.shifts.read_all_shifts():
-            if shift.shift_id == receipt.shift_id:
-                shift_found = True
-                break
-
-        if shift_found is False:
+        if receipt.shift_id not in self.shifts.shifts_by_id:
             raise (
                 DoesntExistError(f"Shift with ID {receipt.shift_id} does not exist.")
             )
         receipt.currency = receipt.currency.upper()
-        self.receipts.append(deepcopy(receipt))
+        receipt.products = merge_receipt_lines([], receipt.products)
+        stored = receipt.snapshot()
+        self.receipt_positions[stored.id] = len(self.receipts)
+        self.receipts.append(stored)
+        self.receipts_by_id[stored.id] = stored
         self.shifts.add_receipt_to_shift(receipt)
         return receipt
 
     def update(self, updated_receipt: Receipt) -> None:
-        for receipt in self.receipts:
-            if receipt.id == updated_receipt.id:
-                self.receipts.remove(receipt)
-                self.receipts.append(updated_receipt)
-                return
-            raise DoesntExistError(f"Receipt with ID {receipt.id} does not exist.")
+        self.read(updated_receipt.id)
+        self.receipts[self.receipt_positions[updated_receipt.id]] = updated_receipt
+        self.receipts_by_id[updated_receipt.id] = updated_receipt
+
+    def close_receipt(self, receipt_id: str) -> None:
+        receipt = self.read(receipt_id)
+        if receipt.status == "closed":
+            raise AlreadyClosedError(f"Receipt with ID {receipt_id} is already closed.")
+        receipt.status = "closed"
+        receipt.closed_at = timestamp(self.clock())
 
     def read(self, receipt_id: str) -> Receipt:
-        for receipt in self.receipts:
-            if receipt.id == receipt_id:
-                return receipt
-        raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+        receipt = self.receipts_by_id.get(receipt_id)
+        if receipt is None:
+            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+        return receipt
 
     def add_product_to_receipt(
         self, receipt_id: str, product_request: AddProductRequest
     ) -> Receipt:
-        product_price: float = 0
-        product_found = False
-        for product in self.products.read_all():
-            if product.id == product_request.product_id:
-                product_price = product.price
-                product_found = True
-                break
-
-        if product_found is False:
-            raise (
-                DoesntExistError(
-                    f"Product with ID {product_request.product_id} does not exist."
-                )
-            )
+        product_price = self._price_of(product_request.product_id)
+        receipt = self.read(receipt_id)
+        if receipt.status == "closed":
+            raise (AlreadyClosedError("receipt already closed."))
+        total_price = product_request.quantity * product_price
+
+        new_product = ReceiptProduct(
+            id=product_request.product_id,
+            quantity=product_request.quantity,
+            price=int(product_price),
+            total=int(total_price),
+        )
 
-        for receipt in self.receipts:
-            if receipt.id == receipt_id:
-                if receipt.status == "closed":
-                    raise (AlreadyClosedError("receipt already closed."))
-                total_price = product_request.quantity * product_price
+        receipt.products = merge_receipt_lines(receipt.products, [new_product])
+        receipt.total += total_price
 
-                new_product = ReceiptProduct(
+        return receipt
+
+    def add_products_to_receipt(
+        self, receipt_id: str, product_requests: list[AddProductRequest]
+    ) -> Receipt:
+        receipt = self.read(receipt_id)
+        if receipt.status == "closed":
+            raise AlreadyClosedError(f"Receipt with ID {receipt_id} is already closed.")
+
+        lines = []
+        for product_request in product_requests:
+            price = self._price_of(product_request.product_id)
+            lines.append(
+                ReceiptProduct(
                     id=product_request.product_id,
                     quantity=product_request.quantity,
-                    price=int(product_price),
-                    total=int(total_price),
+                    price=int(price),
+                    total=int(product_request.quantity * price),
                 )
+            )
 
-                receipt.products.append(deepcopy(new_product))
-                receipt.total += total_price
+        receipt.products = merge_receipt_lines(receipt.products, lines)
+        receipt.total += sum(line.total for line in lines)
+        return receipt
 
-                return receipt
-        raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+    def _price_of(self, product_id: str) -> float:
+        product = self.products.products_by_id.get(product_id)
+        if product is None:
+            raise DoesntExistError(f"Product with ID {product_id} does not exist.")
+        return product.price
 
     def calculate_payment(
         self,
         receipt_id: str,
     ) -> ReceiptForPayment:
-        discounted_price: int = 0
         receipt = self.read(receipt_id)
-        receipt_products_from_receipt = receipt.products
-        campaigns_and_products = self.campaigns_repo.campaigns_product_list
-        for receipt_product in receipt_products_from_receipt:
-            campaigns_list_on_this_product: list[CampaignAndProducts] = (
-                campaigns_and_products.get(receipt_product.id, [])
+        campaign_index = self.campaigns_repo.index()
+        discounted_price = self.campaign_discount_calculator.calculate_products_price(
+            receipt.products, campaign_index
+        )
+
+        discount_percentage = campaign_index.receipt_discount_percentage(
+            discounted_price
+        )
+        if discount_percentage is not None:
+            discounted_price = self.discount_handler.calculate_discounted_price(
+                discounted_price, discount_percentage
             )
-            if campaigns_list_on_this_product is None:
-                discounted_price += receipt_product.total
-            else:
-                best_discounted_price_for_this_product = receipt_product.total
-                for (
-                    campaign_without_type_on_this_product
-                ) in campaigns_list_on_this_product:
-                    result = (
-                        self.campaign_discount_calculator.calculate_price_for_campaign(
-                            receipt_id,
-                            campaign_without_type_on_this_product,
-                            receipt_product,
-                            self,
-                        )
-                    )
-                    discounted_price_using_this_campaign = result
-                    if (
-                        discounted_price_using_this_campaign
-                        < best_discounted_price_for_this_product
-                    ):
-                        best_discounted_price_for_this_product = (
-                            discounted_price_using_this_campaign
-                        )
-
-                discounted_price += best_discounted_price_for_this_product
-
-        for campaign in self.campaigns_repo.campaigns:
-            if (
-                campaign.type == "receipt discount"
-                and isinstance(campaign.data, ReceiptDiscount)
-                and discounted_price >= campaign.data.min_amount
-            ):
-                discounted_price = self.discount_handler.calculate_discounted_price(
-                    discounted_price, campaign.data.discount_percentage
-                )
-                break
 
         total_price = receipt.total
         if receipt.currency.upper() != "GEL":
@@ -196,30 +186,3 @@ class ReceiptInMemoryRepository(ReceiptRepositoryInterface):
 
     def read_all(self) -> list[Receipt]:
         raise NotImplementedError("Not implemented yet.")
-
-    def get_campaign_with_campaign_id(self, campaign_id: str) -> Campaign | None:
-        for campaign in self.campaigns_repo.campaigns:
-            if campaign.campaign_id == campaign_id:
-                return campaign
-
-        return None
-
-    def get_other_products_with_same_campaign(self, campaign_id: str) -> list[str]:
-        result_list: list[str] = []
-        for (
-            product_id,
-            campaign_product_list,
-        ) in self.campaigns_repo.campaigns_product_list.items():
-            for campaign_product in campaign_product_list:
-                if campaign_product.campaign_id == campaign_id:
-                    result_list.append(product_id)
-
-        return result_list
-
-    def product_not_in_receipt(self, product_id: str, receipt_id: str) -> bool:
-        receipt = self.read(receipt_id)
-        receipt_products_from_receipt = receipt.products
-        for receipt_product in receipt_products_from_receipt:
-            if receipt_product.id == product_id:
-                return False
-        return True
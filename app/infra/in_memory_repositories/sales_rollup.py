@@ -0,0 +1,77 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable
+
+from app.core.classes.sales_buckets import bucket_of, coarsen
+from app.core.Interfaces.shift_interface import SalesBucket
+
+
+@dataclass
+class HourTotals:
+    receipts: Dict[str, int] = field(default_factory=dict)
+    revenue: Dict[str, float] = field(default_factory=dict)
+    # product id -> [quantity, line total in GEL tetri]
+    products: Dict[str, list[int]] = field(default_factory=dict)
+
+
+@dataclass
+class SalesRollup:
+    """
+    Closed receipts summed per hour, by currency and by product.
+
+    Hours are kept sorted, so a time series bisects to its first hour and
+    reads only the hours in range, never the receipts behind them.
+    """
+
+    hours: list[str] = field(default_factory=list)
+    totals: Dict[str, HourTotals] = field(default_factory=dict)
+
+    def add(
+        self,
+        closed_at: str,
+        currency: str,
+        discounted_total: float,
+        lines: Iterable[tuple[str, int, int]],
+    ) -> None:
+        """Count one closed receipt, given as (product id, quantity, total) lines."""
+        hour = bucket_of(closed_at)
+        totals = self.totals.get(hour)
+        if totals is None:
+            totals = self.totals[hour] = HourTotals()
+            insort(self.hours, hour)
+
+        totals.receipts[currency] = totals.receipts.get(currency, 0) + 1
+        totals.revenue[currency] = totals.revenue.get(currency, 0) + discounted_total
+        for product_id, quantity, total in lines:
+            sold = totals.products.setdefault(product_id, [0, 0])
+            sold[0] += quantity
+            sold[1] += total
+
+    def series(self, first: str, last: str, granularity: str) -> list[SalesBucket]:
+        """Buckets of the hours from ``first`` up to, not including, ``last``."""
+        buckets: Dict[str, SalesBucket] = {}
+        products: Dict[str, Dict[str, list[int]]] = {}
+        for hour in self.hours[
+            bisect_left(self.hours, first) : bisect_left(self.hours, last)
+        ]:
+            name = coarsen(hour, granularity)
+            bucket = buckets.get(name)
+            if bucket is None:
+                bucket = buckets[name] = SalesBucket(name, 0, {}, [])
+                products[name] = {}
+            totals = self.totals[hour]
+            bucket.n_receipts += sum(totals.receipts.values())
+            for currency, amount in totals.revenue.items():
+                bucket.revenue[currency] = bucket.revenue.get(currency, 0) + amount
+            for product_id, (quantity, total) in totals.products.items():
+                sold = products[name].setdefault(product_id, [0, 0])
+                sold[0] += quantity
+                sold[1] += total
+
+        for name, bucket in buckets.items():
+            bucket.revenue = dict(sorted(bucket.revenue.items()))
+            bucket.products = [
+                {"id": product_id, "quantity": quantity, "total": total}
+                for product_id, (quantity, total) in sorted(products[name].items())
+            ]
+        return list(buckets.values())
@@ -1,113 +1,165 @@
-from copy import deepcopy
-from dataclasses import dataclass, field
-from typing import Any, Dict
+from bisect import bisect_right, insort
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, Optional
 
 from app.core.classes.errors import DoesntExistError, OpenReceiptsError
+from app.core.classes.sales_buckets import bucket_after, bucket_start
 from app.core.Interfaces.receipt_interface import Receipt
 from app.core.Interfaces.shift_interface import (
     ClosedReceipt,
     Report,
+    SalesBucket,
     SalesReport,
     Shift,
 )
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
+from app.infra.in_memory_repositories.closed_receipt_ledger import (
+    ClosedReceiptLedger,
+    CodeTable,
+)
+from app.infra.in_memory_repositories.sales_rollup import SalesRollup
+
+STREAM_PAGE_SIZE = 1000
 
 
 @dataclass
 class ShiftInMemoryRepository(ShiftRepositoryInterface):
     shifts: list[Shift] = field(default_factory=list)
+    shifts_by_id: Dict[str, Shift] = field(init=False)
+    # shift_id -> position of the shift in shifts
+    shift_positions: Dict[str, int] = field(init=False)
+    # shift_id -> receipt id -> position of the receipt in shift.receipts
+    receipt_positions: Dict[str, Dict[str, int]] = field(init=False)
+    # Closed receipts are moved into these columnar ledgers; shift.receipts
+    # keeps only their headers, without lines.
+    closed_receipts: Dict[str, ClosedReceiptLedger] = field(init=False)
+    # product ids and currencies, interned once for every shift's ledger
+    product_codes: CodeTable = field(init=False, default_factory=CodeTable)
+    currency_codes: CodeTable = field(init=False, default_factory=CodeTable)
+    # every closed receipt id in sorted order, and its total, for the listing
+    closed_receipt_ids: list[str] = field(init=False, default_factory=list)
+    closed_receipt_totals: Dict[str, float] = field(init=False, default_factory=dict)
+    # lifetime totals, updated as each closed receipt is recorded
+    sales_receipts: int = field(init=False, default=0)
+    sales_revenue: Dict[str, float] = field(init=False, default_factory=dict)
+    sales_rollup: SalesRollup = field(init=False, default_factory=SalesRollup)
+    # shift_id -> final report, taken once when the shift is closed
+    z_reports: Dict[str, Report] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.shifts_by_id = {}
+        self.shift_positions = {
+            shift.shift_id: position for position, shift in enumerate(self.shifts)
+        }
+        self.receipt_positions = {}
+        self.closed_receipts = {}
+        for shift in self.shifts:
+            self._index(shift)
 
     def create(self, shift: Shift) -> Shift:
-        self.shifts.append(deepcopy(shift))
+        stored = replace(
+            shift, receipts=[receipt.snapshot() for receipt in shift.receipts]
+        )
+        self.shift_positions[stored.shift_id] = len(self.shifts)
+        self.shifts.append(stored)
+        self._index(stored)
         return shift
 
     def update(self, shift: Shift) -> None:
-        find: bool = False
-        for _shift in self.shifts:
-            if _shift.shift_id == shift.shift_id:
-                for _receipt in _shift.receipts:
-                    if _receipt.status == "open":
-                        raise OpenReceiptsError(
-                            "Shift cannot be closed while there are open receipts."
-                        )
-                self.shifts.remove(_shift)
-                self.shifts.append(shift)
-                return
-        if not find:
+        existing = self.shifts_by_id.get(shift.shift_id)
+        if existing is None:
             raise DoesntExistError
+        for _receipt in existing.receipts:
+            if _receipt.status == "open":
+                raise OpenReceiptsError(
+                    "Shift cannot be closed while there are open receipts."
+                )
+        self.shifts[self.shift_positions[shift.shift_id]] = shift
+        self._index(shift)
 
     def add_receipt_to_shift(self, receipt: Receipt) -> None:
-        new_receipt_id = receipt.id
-        for shift in self.shifts:
-            if shift.shift_id == receipt.shift_id:
-                for _receipt in shift.receipts:
-                    if _receipt.id == new_receipt_id:
-                        shift.receipts.remove(_receipt)
-
-                shift.receipts.append(deepcopy(receipt))
-                return
-        raise DoesntExistError(f"Shift with ID {receipt.shift_id} not found.")
+        shift = self.shifts_by_id.get(receipt.shift_id)
+        if shift is None:
+            raise DoesntExistError(f"Shift with ID {receipt.shift_id} not found.")
+
+        stored = self._keep(receipt, self.closed_receipts[receipt.shift_id])
+        positions = self.receipt_positions[receipt.shift_id]
+        position = positions.get(receipt.id)
+        if position is None:
+            positions[receipt.id] = len(shift.receipts)
+            shift.receipts.append(stored)
+        else:
+            shift.receipts[position] = stored
 
     def get_x_report(self, shift_id: str) -> Report:
-        shift = next((s for s in self.shifts if s.shift_id == shift_id), None)
+        shift = self.shifts_by_id.get(shift_id)
         if not shift:
             raise DoesntExistError(f"Shift with ID {shift_id} not found.")
         if shift.status != "open":
             raise ValueError(f"Cannot generate X Report for closed shift {shift_id}.")
-        n_receipts = 0
-        currency_revenue: Dict[str, float] = {}
-        product_summary: Dict[str, Dict[str, Any]] = {}
-
-        for receipt in shift.receipts:
-            if receipt.status == "closed":
-                n_receipts += 1
-                currency_revenue[receipt.currency] = (
-                    currency_revenue.get(receipt.currency, 0) + receipt.discounted_total
-                )
-
-                for product in receipt.products:
-                    if product.id not in product_summary:
-                        product_summary[product.id] = {"quantity": 0}
-                    product_summary[product.id]["quantity"] += product.quantity
-
-        products = [
-            {"id": str(pid), "quantity": int(data["quantity"])}
-            for pid, data in product_summary.items()
-        ]
+        return self._report(shift_id)
 
-        return Report(
-            shift_id=shift_id,
-            n_receipts=n_receipts,
-            revenue=currency_revenue,
-            products=products,
+    def get_z_report(self, shift_id: str) -> Report:
+        shift = self.shifts_by_id.get(shift_id)
+        if not shift:
+            raise DoesntExistError(f"Shift with ID {shift_id} not found.")
+        if shift.status != "closed":
+            raise ValueError(f"Cannot generate Z Report for open shift {shift_id}.")
+
+        report = self.z_reports[shift_id]
+        return replace(
+            report,
+            revenue=dict(report.revenue),
+            products=[dict(product) for product in report.products],
         )
 
-    def get_lifetime_sales_report(self) -> SalesReport:
-        total_receipts = 0
-        currency_totals: Dict[str, float] = {}
+    def get_lifetime_sales_report(
+        self, limit: Optional[int] = None, after_receipt_id: Optional[str] = None
+    ) -> SalesReport:
         closed_receipts: list[ClosedReceipt] = []
-
-        for shift in self.shifts:
-            for receipt in shift.receipts:
-                if receipt.status == "closed":
-                    total_receipts += 1
-                    currency_totals[receipt.currency] = (
-                        currency_totals.get(receipt.currency, 0)
-                        + receipt.discounted_total
-                    )
-
-                    closed_receipts.append(
-                        ClosedReceipt(
-                            receipt_id=receipt.id, calculated_payment=receipt.total
-                        )
-                    )
+        if limit is not None:
+            closed_receipts = list(
+                islice(self.iter_closed_receipts(after_receipt_id), limit)
+            )
 
         return SalesReport(
-            total_receipts=total_receipts,
-            total_revenue=currency_totals,
+            total_receipts=self.sales_receipts,
+            total_revenue=dict(self.sales_revenue),
             closed_receipts=closed_receipts,
         )
 
+    def iter_closed_receipts(
+        self, after_receipt_id: Optional[str] = None
+    ) -> Iterator[ClosedReceipt]:
+        """
+        Every closed receipt after ``after_receipt_id``, in id order.
+
+        As in SQL, pages are keyed on the last id seen, so receipts closed
+        while a stream is being read are picked up if they sort after it.
+        """
+        while True:
+            start = bisect_right(self.closed_receipt_ids, after_receipt_id or "")
+            page = self.closed_receipt_ids[start : start + STREAM_PAGE_SIZE]
+            for receipt_id in page:
+                yield ClosedReceipt(
+                    receipt_id=receipt_id,
+                    calculated_payment=self.closed_receipt_totals[receipt_id],
+                )
+            if len(page) < STREAM_PAGE_SIZE:
+                return
+            after_receipt_id = page[-1]
+
+    def get_sales_timeseries(
+        self, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[SalesBucket]:
+        return self.sales_rollup.series(
+            bucket_start(start, granularity),
+            bucket_after(end, granularity),
+            granularity,
+        )
+
     def read_all_shifts(self) -> list[Shift]:
         return self.shifts
 
@@ -115,10 +167,57 @@ class ShiftInMemoryRepository(ShiftRepositoryInterface):
         raise NotImplementedError("Not implemented yet.")
 
     def read(self, shift_id: str) -> Shift:
-        for shift in self.shifts:
-            if shift.shift_id == shift_id:
-                return shift
-        raise DoesntExistError
+        shift = self.shifts_by_id.get(shift_id)
+        if shift is None:
+            raise DoesntExistError
+        return shift
 
     def read_all(self) -> list[Shift]:
         raise NotImplementedError("Not implemented yet.")
+
+    def _index(self, shift: Shift) -> None:
+        self.shifts_by_id[shift.shift_id] = shift
+        ledger = self.closed_receipts.get(shift.shift_id)
+        if ledger is None:
+            ledger = self.closed_receipts[shift.shift_id] = ClosedReceiptLedger(
+                self.product_codes, self.currency_codes
+            )
+        shift.receipts[:] = [self._keep(receipt, ledger) for receipt in shift.receipts]
+        self.receipt_positions[shift.shift_id] = {
+            receipt.id: position for position, receipt in enumerate(shift.receipts)
+        }
+        if shift.status == "closed" and shift.shift_id not in self.z_reports:
+            self.z_reports[shift.shift_id] = self._report(shift.shift_id)
+
+    def _report(self, shift_id: str) -> Report:
+        ledger = self.closed_receipts[shift_id]
+        return Report(
+            shift_id=shift_id,
+            n_receipts=len(ledger),
+            revenue=ledger.revenue_by_currency({}),
+            products=[
+                {"id": product_id, "quantity": quantity}
+                for product_id, quantity in ledger.quantities_by_product().items()
+            ],
+        )
+
+    def _keep(self, receipt: Receipt, ledger: ClosedReceiptLedger) -> Receipt:
+        """Copy to hold in shift.receipts, moving a closed receipt's lines out."""
+        if receipt.status != "closed":
+            return receipt.snapshot()
+        if receipt.id not in self.closed_receipt_totals:
+            rows = ledger.append(receipt)
+            self.closed_receipt_totals[receipt.id] = receipt.total
+            insort(self.closed_receipt_ids, receipt.id)
+            self.sales_receipts += 1
+            self.sales_revenue[receipt.currency] = (
+                self.sales_revenue.get(receipt.currency, 0) + receipt.discounted_total
+            )
+            if receipt.closed_at is not None:
+                self.sales_rollup.add(
+                    receipt.closed_at,
+                    receipt.currency,
+                    receipt.discounted_total,
+                    ledger.lines(rows),
+                )
+        return replace(receipt, products=[])
@@ -0,0 +1,101 @@
+"""
+Forward-only schema migrations for the SQLite backend.
+
+Every migration has a number and is applied at most once. Applied numbers are
+recorded in ``schema_version``, and all pending migrations run inside a single
+transaction, so a store is either fully upgraded or left untouched. To change
+the schema, add the next numbered module and append it to ``MIGRATIONS``;
+never edit one that has shipped.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+
+from app.infra.migrations import (
+    m001_initial_schema,
+    m002_hot_path_indexes,
+    m003_merged_receipt_lines,
+    m004_shift_report_totals,
+    m005_sales_totals,
+    m006_shift_z_reports,
+    m007_sales_rollups,
+    m008_campaign_catalog_version,
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS = (
+    Migration(1, "initial schema", m001_initial_schema.STATEMENTS),
+    Migration(2, "hot path indexes", m002_hot_path_indexes.STATEMENTS),
+    Migration(3, "merged receipt lines", m003_merged_receipt_lines.STATEMENTS),
+    Migration(4, "shift report totals", m004_shift_report_totals.STATEMENTS),
+    Migration(5, "sales totals", m005_sales_totals.STATEMENTS),
+    Migration(6, "shift z reports", m006_shift_z_reports.STATEMENTS),
+    Migration(7, "sales rollups", m007_sales_rollups.STATEMENTS),
+    Migration(8, "campaign catalog version", m008_campaign_catalog_version.STATEMENTS),
+)
+
+
+class MigrationError(Exception):
+    pass
+
+
+def current_version(connection: sqlite3.Connection) -> int:
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if exists is None:
+        return 0
+    (version,) = connection.execute(
+        "SELECT COALESCE(MAX(version), 0) FROM schema_version"
+    ).fetchone()
+    return int(version)
+
+
+def migrate(
+    connection: sqlite3.Connection,
+    migrations: tuple[Migration, ...] = MIGRATIONS,
+) -> int:
+    """Apply pending migrations in one transaction and return the new version."""
+    connection.commit()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        version = current_version(connection)
+        latest = migrations[-1].version if migrations else 0
+        if version > latest:
+            raise MigrationError(
+                f"Database schema version {version} is newer than {latest}."
+            )
+
+        for migration in migrations:
+            if migration.version <= version:
+                continue
+            if migration.version != version + 1:
+                raise MigrationError(f"Migration {version + 1} is missing.")
+            for statement in migration.statements:
+                connection.execute(statement)
+            connection.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (migration.version, migration.name),
+            )
+            version = migration.version
+    except BaseException:
+        connection.rollback()
+        raise
+    connection.commit()
+    return version
@@ -0,0 +1,61 @@
+STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        barcode TEXT UNIQUE NOT NULL,
+        price INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS campaigns (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL CHECK (
+            type IN
+                (
+                    'buy n get n', 'discount', 'combo', 'receipt discount'
+                )
+            ),
+        discount_percentage INTEGER,
+        buy_quantity INTEGER,
+        get_quantity INTEGER,
+        min_amount INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS campaign_products (
+        id TEXT PRIMARY KEY,
+        campaign_id TEXT,
+        product_id TEXT,
+        discounted_price INTEGER,
+        FOREIGN KEY (campaign_id) REFERENCES campaigns(id),
+        FOREIGN KEY (product_id) REFERENCES products(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS shifts (
+        shift_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS receipts (
+        id TEXT PRIMARY KEY,
+        shift_id TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        status TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        discounted_total INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS receipt_products (
+        receipt_id TEXT,
+        product_id TEXT,
+        quantity INTEGER,
+        price INTEGER,
+        total INTEGER,
+        FOREIGN KEY (receipt_id) REFERENCES receipts(id)
+    )
+    """,
+)
@@ -0,0 +1,16 @@
+INDEXES = {
+    "idx_receipt_products_receipt": (
+        "receipt_products (receipt_id, product_id, quantity, price, total)"
+    ),
+    "idx_receipt_products_product": "receipt_products (product_id, receipt_id)",
+    "idx_campaign_products_campaign": "campaign_products (campaign_id, product_id)",
+    "idx_campaign_products_product": "campaign_products (product_id, campaign_id)",
+    "idx_receipts_shift_status": (
+        "receipts (shift_id, status, currency, discounted_total)"
+    ),
+}
+
+STATEMENTS = tuple(
+    f"CREATE INDEX IF NOT EXISTS {name} ON {columns}"
+    for name, columns in INDEXES.items()
+)
@@ -0,0 +1,27 @@
+STATEMENTS = (
+    """
+    UPDATE receipt_products
+    SET (quantity, total) = (
+        SELECT SUM(d.quantity), SUM(d.total)
+        FROM receipt_products d
+        WHERE d.receipt_id = receipt_products.receipt_id
+            AND d.product_id = receipt_products.product_id
+    )
+    WHERE rowid IN (
+        SELECT MIN(rowid)
+        FROM receipt_products
+        GROUP BY receipt_id, product_id
+        HAVING COUNT(*) > 1
+    )
+    """,
+    """
+    DELETE FROM receipt_products
+    WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM receipt_products GROUP BY receipt_id, product_id
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_receipt_products_line
+    ON receipt_products (receipt_id, product_id)
+    """,
+)
@@ -0,0 +1,135 @@
+"""
+Running X-report totals per shift, kept up to date by triggers.
+
+``shift_revenue`` counts closed receipts and sums their discounted totals per
+currency, and ``shift_product_sales`` sums the quantities sold per product.
+Every write to ``receipts`` or ``receipt_products`` that changes what a closed
+receipt contributes takes the old contribution out and puts the new one in,
+in the same transaction, so the X report reads a handful of rows instead of
+scanning the shift's receipts and lines. Rows that drop back to zero are kept
+and filtered out by the report.
+"""
+
+ADD_REVENUE = """
+    INSERT INTO shift_revenue (shift_id, currency, n_receipts, revenue)
+    SELECT NEW.shift_id, NEW.currency, 1, NEW.discounted_total
+    WHERE NEW.status = 'closed'
+    ON CONFLICT (shift_id, currency) DO UPDATE SET
+        n_receipts = n_receipts + 1,
+        revenue = revenue + excluded.revenue;
+"""
+
+REMOVE_REVENUE = """
+    UPDATE shift_revenue
+    SET n_receipts = n_receipts - 1, revenue = revenue - OLD.discounted_total
+    WHERE OLD.status = 'closed'
+        AND shift_id = OLD.shift_id
+        AND currency = OLD.currency;
+"""
+
+ADD_RECEIPT_LINES = """
+    INSERT INTO shift_product_sales (shift_id, product_id, quantity)
+    SELECT NEW.shift_id, product_id, quantity
+    FROM receipt_products
+    WHERE receipt_id = NEW.id AND NEW.status = 'closed'
+    ON CONFLICT (shift_id, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity;
+"""
+
+REMOVE_RECEIPT_LINES = """
+    UPDATE shift_product_sales
+    SET quantity = shift_product_sales.quantity - rp.quantity
+    FROM receipt_products rp
+    WHERE OLD.status = 'closed'
+        AND rp.receipt_id = OLD.id
+        AND shift_product_sales.shift_id = OLD.shift_id
+        AND shift_product_sales.product_id = rp.product_id;
+"""
+
+ADD_LINE = """
+    INSERT INTO shift_product_sales (shift_id, product_id, quantity)
+    SELECT r.shift_id, NEW.product_id, NEW.quantity
+    FROM receipts r
+    WHERE r.id = NEW.receipt_id AND r.status = 'closed'
+    ON CONFLICT (shift_id, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity;
+"""
+
+REMOVE_LINE = """
+    UPDATE shift_product_sales
+    SET quantity = quantity - OLD.quantity
+    WHERE product_id = OLD.product_id
+        AND shift_id = (
+            SELECT shift_id FROM receipts
+            WHERE id = OLD.receipt_id AND status = 'closed'
+        );
+"""
+
+STATEMENTS = (
+    """
+    CREATE TABLE shift_revenue (
+        shift_id TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        n_receipts INTEGER NOT NULL,
+        revenue INTEGER NOT NULL,
+        PRIMARY KEY (shift_id, currency)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE shift_product_sales (
+        shift_id TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        PRIMARY KEY (shift_id, product_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    INSERT INTO shift_revenue (shift_id, currency, n_receipts, revenue)
+    SELECT shift_id, currency, COUNT(*), SUM(discounted_total)
+    FROM receipts
+    WHERE status = 'closed'
+    GROUP BY shift_id, currency
+    """,
+    """
+    INSERT INTO shift_product_sales (shift_id, product_id, quantity)
+    SELECT r.shift_id, rp.product_id, SUM(rp.quantity)
+    FROM receipt_products rp
+    JOIN receipts r ON r.id = rp.receipt_id
+    WHERE r.status = 'closed'
+    GROUP BY r.shift_id, rp.product_id
+    """,
+    f"""
+    CREATE TRIGGER receipts_report_insert AFTER INSERT ON receipts
+    WHEN NEW.status = 'closed'
+    BEGIN {ADD_REVENUE} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_report_delete AFTER DELETE ON receipts
+    WHEN OLD.status = 'closed'
+    BEGIN {REMOVE_REVENUE} {REMOVE_RECEIPT_LINES} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_report_revenue
+    AFTER UPDATE OF status, shift_id, currency, discounted_total ON receipts
+    WHEN OLD.status = 'closed' OR NEW.status = 'closed'
+    BEGIN {REMOVE_REVENUE} {ADD_REVENUE} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_report_lines AFTER UPDATE OF status, shift_id ON receipts
+    WHEN OLD.status IS NOT NEW.status OR OLD.shift_id IS NOT NEW.shift_id
+    BEGIN {REMOVE_RECEIPT_LINES} {ADD_RECEIPT_LINES} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_report_insert AFTER INSERT ON receipt_products
+    BEGIN {ADD_LINE} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_report_delete AFTER DELETE ON receipt_products
+    BEGIN {REMOVE_LINE} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_report_update
+    AFTER UPDATE OF receipt_id, product_id, quantity ON receipt_products
+    BEGIN {REMOVE_LINE} {ADD_LINE} END
+    """,
+)
@@ -0,0 +1,60 @@
+"""
+Lifetime sales totals per currency, kept up to date by triggers.
+
+``sales_totals`` counts closed receipts and sums their discounted totals, in
+the same transaction as the write that closes, pays, moves or deletes a
+receipt, so the sales report reads one row per currency. The closed receipt
+listing is paged in id order through ``idx_receipts_status_id``.
+"""
+
+ADD_SALE = """
+    INSERT INTO sales_totals (currency, n_receipts, revenue)
+    SELECT NEW.currency, 1, NEW.discounted_total
+    WHERE NEW.status = 'closed'
+    ON CONFLICT (currency) DO UPDATE SET
+        n_receipts = n_receipts + 1,
+        revenue = revenue + excluded.revenue;
+"""
+
+REMOVE_SALE = """
+    UPDATE sales_totals
+    SET n_receipts = n_receipts - 1, revenue = revenue - OLD.discounted_total
+    WHERE OLD.status = 'closed' AND currency = OLD.currency;
+"""
+
+STATEMENTS = (
+    """
+    CREATE TABLE sales_totals (
+        currency TEXT PRIMARY KEY,
+        n_receipts INTEGER NOT NULL,
+        revenue INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    INSERT INTO sales_totals (currency, n_receipts, revenue)
+    SELECT currency, COUNT(*), SUM(discounted_total)
+    FROM receipts
+    WHERE status = 'closed'
+    GROUP BY currency
+    """,
+    f"""
+    CREATE TRIGGER receipts_sales_insert AFTER INSERT ON receipts
+    WHEN NEW.status = 'closed'
+    BEGIN {ADD_SALE} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_sales_delete AFTER DELETE ON receipts
+    WHEN OLD.status = 'closed'
+    BEGIN {REMOVE_SALE} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_sales_update
+    AFTER UPDATE OF status, currency, discounted_total ON receipts
+    WHEN OLD.status = 'closed' OR NEW.status = 'closed'
+    BEGIN {REMOVE_SALE} {ADD_SALE} END
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_receipts_status_id
+    ON receipts (status, id, discounted_total)
+    """,
+)
@@ -0,0 +1,62 @@
+"""
+Z reports, archived once when a shift is closed.
+
+Closing a shift copies its running totals from ``shift_revenue`` and
+``shift_product_sales`` into one ``shift_z_reports`` row, in the same
+transaction as the status change. Revenue and products are stored as JSON, so
+the report is served as it was at closing time and is never recomputed, even
+if receipts of the shift are changed afterwards. Rows cannot be updated; they
+go away only with their shift.
+"""
+
+SNAPSHOT = """
+    INSERT OR IGNORE INTO shift_z_reports
+        (shift_id, n_receipts, revenue, products)
+    SELECT
+        {shift},
+        (
+            SELECT COALESCE(SUM(n_receipts), 0) FROM shift_revenue
+            WHERE shift_id = {shift} AND n_receipts > 0
+        ),
+        (
+            SELECT json_group_object(currency, revenue) FROM shift_revenue
+            WHERE shift_id = {shift} AND n_receipts > 0
+        ),
+        (
+            SELECT json_group_array(
+                json_object('id', product_id, 'quantity', quantity)
+            )
+            FROM (
+                SELECT product_id, quantity FROM shift_product_sales
+                WHERE shift_id = {shift} AND quantity != 0
+                ORDER BY product_id
+            )
+        )
+"""
+
+STATEMENTS = (
+    """
+    CREATE TABLE shift_z_reports (
+        shift_id TEXT PRIMARY KEY,
+        n_receipts INTEGER NOT NULL,
+        revenue TEXT NOT NULL,
+        products TEXT NOT NULL,
+        closed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    """,
+    SNAPSHOT.format(shift="closed.shift_id")
+    + "FROM shifts closed WHERE closed.status = 'closed'",
+    f"""
+    CREATE TRIGGER shifts_z_report AFTER UPDATE OF status ON shifts
+    WHEN OLD.status = 'open' AND NEW.status = 'closed'
+    BEGIN {SNAPSHOT.format(shift="NEW.shift_id")}; END
+    """,
+    """
+    CREATE TRIGGER shift_z_reports_immutable BEFORE UPDATE ON shift_z_reports
+    BEGIN SELECT RAISE(ABORT, 'Z reports cannot be changed.'); END
+    """,
+    """
+    CREATE TRIGGER shifts_z_report_delete AFTER DELETE ON shifts
+    BEGIN DELETE FROM shift_z_reports WHERE shift_id = OLD.shift_id; END
+    """,
+)
@@ -0,0 +1,141 @@
+"""
+Hourly sales rollups, kept up to date by triggers.
+
+Receipts record when they were closed in ``closed_at``. ``sales_rollup_receipts``
+counts closed receipts and sums their discounted totals per hour and currency,
+and ``sales_rollup_products`` sums quantities and line totals per hour and
+product. Line totals are undiscounted GEL tetri whatever the receipt currency,
+so product rows are not split by currency.
+
+As in the shift report totals, every write that changes what a closed receipt
+contributes takes the old contribution out and puts the new one in, so paying
+a receipt moves its revenue into its bucket in the same transaction. Time
+series read a range of buckets by primary key; daily series add up the hours
+of each day.
+
+Receipts closed before this migration have no ``closed_at`` and stay out of
+the rollups.
+"""
+
+BUCKET = "strftime('%Y-%m-%dT%H:00:00Z', {closed_at})"
+
+ADD_RECEIPT = f"""
+    INSERT INTO sales_rollup_receipts (bucket, currency, n_receipts, revenue)
+    SELECT {BUCKET.format(closed_at="NEW.closed_at")}, NEW.currency, 1,
+        NEW.discounted_total
+    WHERE NEW.status = 'closed' AND NEW.closed_at IS NOT NULL
+    ON CONFLICT (bucket, currency) DO UPDATE SET
+        n_receipts = n_receipts + 1,
+        revenue = revenue + excluded.revenue;
+"""
+
+REMOVE_RECEIPT = f"""
+    UPDATE sales_rollup_receipts
+    SET n_receipts = n_receipts - 1, revenue = revenue - OLD.discounted_total
+    WHERE OLD.status = 'closed'
+        AND bucket = {BUCKET.format(closed_at="OLD.closed_at")}
+        AND currency = OLD.currency;
+"""
+
+ADD_RECEIPT_LINES = f"""
+    INSERT INTO sales_rollup_products (bucket, product_id, quantity, total)
+    SELECT {BUCKET.format(closed_at="NEW.closed_at")}, product_id, quantity, total
+    FROM receipt_products
+    WHERE receipt_id = NEW.id
+        AND NEW.status = 'closed'
+        AND NEW.closed_at IS NOT NULL
+    ON CONFLICT (bucket, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        total = total + excluded.total;
+"""
+
+REMOVE_RECEIPT_LINES = f"""
+    UPDATE sales_rollup_products
+    SET quantity = sales_rollup_products.quantity - rp.quantity,
+        total = sales_rollup_products.total - rp.total
+    FROM receipt_products rp
+    WHERE OLD.status = 'closed'
+        AND rp.receipt_id = OLD.id
+        AND sales_rollup_products.bucket = {BUCKET.format(closed_at="OLD.closed_at")}
+        AND sales_rollup_products.product_id = rp.product_id;
+"""
+
+ADD_LINE = f"""
+    INSERT INTO sales_rollup_products (bucket, product_id, quantity, total)
+    SELECT {BUCKET.format(closed_at="r.closed_at")}, NEW.product_id, NEW.quantity,
+        NEW.total
+    FROM receipts r
+    WHERE r.id = NEW.receipt_id
+        AND r.status = 'closed'
+        AND r.closed_at IS NOT NULL
+    ON CONFLICT (bucket, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        total = total + excluded.total;
+"""
+
+REMOVE_LINE = f"""
+    UPDATE sales_rollup_products
+    SET quantity = quantity - OLD.quantity, total = total - OLD.total
+    WHERE product_id = OLD.product_id
+        AND bucket = (
+            SELECT {BUCKET.format(closed_at="closed_at")} FROM receipts
+            WHERE id = OLD.receipt_id AND status = 'closed'
+        );
+"""
+
+STATEMENTS = (
+    "ALTER TABLE receipts ADD COLUMN closed_at TEXT",
+    """
+    CREATE TABLE sales_rollup_receipts (
+        bucket TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        n_receipts INTEGER NOT NULL,
+        revenue INTEGER NOT NULL,
+        PRIMARY KEY (bucket, currency)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE sales_rollup_products (
+        bucket TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (bucket, product_id)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER receipts_rollup_insert AFTER INSERT ON receipts
+    WHEN NEW.status = 'closed' AND NEW.closed_at IS NOT NULL
+    BEGIN {ADD_RECEIPT} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_rollup_delete AFTER DELETE ON receipts
+    WHEN OLD.status = 'closed' AND OLD.closed_at IS NOT NULL
+    BEGIN {REMOVE_RECEIPT} {REMOVE_RECEIPT_LINES} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_rollup_revenue
+    AFTER UPDATE OF status, currency, discounted_total, closed_at ON receipts
+    WHEN OLD.status = 'closed' OR NEW.status = 'closed'
+    BEGIN {REMOVE_RECEIPT} {ADD_RECEIPT} END
+    """,
+    f"""
+    CREATE TRIGGER receipts_rollup_lines
+    AFTER UPDATE OF status, closed_at ON receipts
+    WHEN OLD.status IS NOT NEW.status OR OLD.closed_at IS NOT NEW.closed_at
+    BEGIN {REMOVE_RECEIPT_LINES} {ADD_RECEIPT_LINES} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_rollup_insert AFTER INSERT ON receipt_products
+    BEGIN {ADD_LINE} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_rollup_delete AFTER DELETE ON receipt_products
+    BEGIN {REMOVE_LINE} END
+    """,
+    f"""
+    CREATE TRIGGER receipt_products_rollup_update
+    AFTER UPDATE OF receipt_id, product_id, quantity, total ON receipt_products
+    BEGIN {REMOVE_LINE} {ADD_LINE} END
+    """,
+)
@@ -0,0 +1,28 @@
+"""
+A version number for the campaign catalog, bumped by triggers.
+
+Every committed change to ``campaigns`` or ``campaign_products`` raises
+``campaign_catalog.version``, whichever connection or process made it.
+Repositories that memoize the catalog read this one row to tell whether their
+copy is still current.
+"""
+
+BUMP = "UPDATE campaign_catalog SET version = version + 1 WHERE id = 1;"
+
+STATEMENTS = (
+    """
+    CREATE TABLE campaign_catalog (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    """,
+    "INSERT INTO campaign_catalog (id, version) VALUES (1, 0)",
+    *(
+        f"""
+        CREATE TRIGGER {table}_catalog_{event.lower()} AFTER {event} ON {table}
+        BEGIN {BUMP} END
+        """
+        for table in ("campaigns", "campaign_products")
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ),
+)
@@ -1,16 +1,20 @@
 import os
-import sqlite3
 from typing import Protocol
 
 from dotenv import load_dotenv
 
+from app.core.classes.exchange_rate_api_provider import ExchangeRateApiProvider
+from app.core.classes.exchange_rate_service import ExchangeRateService
+from app.core.classes.exchange_rate_snapshot import SnapshotExchangeRateProvider
 from app.core.Interfaces.campaign_interface import Campaign
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
 from app.core.Interfaces.repository import Repository
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
 from app.infra.in_memory import InMemory
 from app.infra.sqlite import Sqlite
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 load_dotenv()  # Load environment variables from .env
 
@@ -28,19 +32,33 @@ class RepositoryProvider(Protocol):
     def campaigns(self) -> Repository[Campaign]:
         pass
 
+    def exchange_rate_service(self) -> ExchangeRateService:
+        pass
+
 
 class RepositoryFactory:
     @staticmethod
     def create() -> RepositoryProvider:
         """Creates the appropriate repository based on the environment variable."""
         repository_kind = os.getenv("REPOSITORY_KIND")
+        exchange_rate_provider = RepositoryFactory.create_exchange_rate_provider()
 
         if repository_kind == "sqlite-memory":
             print("Using SQLite (in-memory)")
-            return Sqlite(sqlite3.connect(":memory:", check_same_thread=False))
+            return Sqlite(SqliteConnectionPool.open(":memory:"), exchange_rate_provider)
         elif repository_kind == "sqlite-disk":
             print("Using SQLite (persistent)")
-            return Sqlite(sqlite3.connect("pos.db", check_same_thread=False))
+            return Sqlite(SqliteConnectionPool.open("pos.db"), exchange_rate_provider)
         else:
             print("Using InMemory repository")
-            return InMemory()
+            return InMemory(exchange_rate_provider)
+
+    @staticmethod
+    def create_exchange_rate_provider() -> ExchangeRateProvider:
+        """Live rates (optionally snapshotted to disk) or an offline snapshot."""
+        snapshot_path = os.getenv("EXCHANGE_RATE_SNAPSHOT")
+
+        if os.getenv("EXCHANGE_RATE_PROVIDER") == "snapshot" and snapshot_path:
+            print(f"Using exchange rate snapshot {snapshot_path}")
+            return SnapshotExchangeRateProvider(snapshot_path)
+        return ExchangeRateApiProvider(snapshot_path=snapshot_path)
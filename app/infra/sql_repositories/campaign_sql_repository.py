@@ -1,7 +1,7 @@
-import sqlite3
 import uuid
-from typing import Union
+from typing import Any, Dict, Optional, Union
 
+from app.core.classes.campaign_index import CampaignIndex
 from app.core.classes.errors import DoesntExistError
 from app.core.Interfaces.campaign_interface import (
     BuyNGetN,
@@ -10,120 +10,122 @@ from app.core.Interfaces.campaign_interface import (
     Discount,
     ReceiptDiscount,
 )
+from app.core.Interfaces.campaign_repository_interface import (
+    CampaignRepositoryInterface,
+)
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.repository import Repository
+from app.infra.sqlite_pool import SqliteConnectionPool
 
+CampaignRow = tuple[Any, ...]
 
-class CampaignSQLRepository(Repository[Campaign]):
-    def __init__(
-        self, connection: sqlite3.Connection, products_repo: Repository[Product]
-    ) -> None:
-        self.conn = connection
-        self.products = products_repo
-        self._initialize_db()
-
-    def _initialize_db(self) -> None:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS campaigns (
-                id TEXT PRIMARY KEY,
-                type TEXT NOT NULL CHECK (
-                    type IN 
-                        (
-                            'buy n get n', 'discount', 'combo', 'receipt discount'
-                        )
-                    ),
-                discount_percentage INTEGER,
-                buy_quantity INTEGER,
-                get_quantity INTEGER,
-                min_amount INTEGER
-            )
-            """
-        )
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS campaign_products (
-                id TEXT PRIMARY KEY,
-                campaign_id TEXT,
-                product_id TEXT,
-                discounted_price INTEGER,
-                FOREIGN KEY (campaign_id) REFERENCES campaigns(id),
-                FOREIGN KEY (product_id) REFERENCES products(id)
-            )
-            """
-        )
-        self.conn.commit()
+def build_campaign(campaign_row: CampaignRow, product_ids: list[str]) -> Campaign:
+    (
+        campaign_id,
+        type_,
+        discount_percentage,
+        buy_quantity,
+        get_quantity,
+        min_amount,
+    ) = campaign_row
 
-    def create(self, campaign: Campaign) -> Campaign:
-        cursor = self.conn.cursor()
-
-        discount_percentage = (
-            campaign.data.discount_percentage
-            if campaign.type in ["discount", "combo", "receipt discount"]
-            and (
-                isinstance(campaign.data, Discount)
-                or isinstance(campaign.data, ReceiptDiscount)
-                or isinstance(campaign.data, Combo)
-            )
-            else None
+    campaign_data_obj: Union[Discount, Combo, BuyNGetN, ReceiptDiscount]
+    if type_ == "discount":
+        campaign_data_obj = Discount(
+            product_id=product_ids[0],
+            discount_percentage=discount_percentage,
         )
-        buy_quantity = (
-            campaign.data.buy_quantity
-            if campaign.type == "buy n get n" and isinstance(campaign.data, BuyNGetN)
-            else None
+    elif type_ == "combo":
+        campaign_data_obj = Combo(
+            products=product_ids,
+            discount_percentage=discount_percentage,
         )
-        get_quantity = (
-            campaign.data.get_quantity
-            if campaign.type == "buy n get n" and isinstance(campaign.data, BuyNGetN)
-            else None
+    elif type_ == "buy n get n":
+        campaign_data_obj = BuyNGetN(
+            product_id=product_ids[0],
+            buy_quantity=buy_quantity,
+            get_quantity=get_quantity,
         )
-
-        min_amount = (
-            campaign.data.min_amount
-            if campaign.type == "receipt discount"
-            and isinstance(campaign.data, ReceiptDiscount)
-            else None
+    elif type_ == "receipt discount":
+        campaign_data_obj = ReceiptDiscount(
+            min_amount=min_amount / 100,
+            discount_percentage=discount_percentage,
         )
+    else:
+        raise DoesntExistError(f"Unknown campaign type {type_}")
+
+    return Campaign(
+        campaign_id=campaign_id,
+        type=type_,
+        data=campaign_data_obj,
+    )
+
+
+class CampaignSQLRepository(CampaignRepositoryInterface):
+    def __init__(
+        self, pool: SqliteConnectionPool, products_repo: Repository[Product]
+    ) -> None:
+        self.pool = pool
+        self.products = products_repo
+        # memos, each tagged with the catalog version it was read at
+        self._campaigns: tuple[int, Dict[str, Campaign]] = (-1, {})
+        self._index: Optional[tuple[int, CampaignIndex]] = None
 
-        cursor.execute(
-            """
-            INSERT INTO campaigns (
-                id, type, discount_percentage, buy_quantity, get_quantity, min_amount
+    def create(self, campaign: Campaign) -> Campaign:
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+
+            discount_percentage = (
+                campaign.data.discount_percentage
+                if campaign.type in ["discount", "combo", "receipt discount"]
+                and (
+                    isinstance(campaign.data, Discount)
+                    or isinstance(campaign.data, ReceiptDiscount)
+                    or isinstance(campaign.data, Combo)
+                )
+                else None
+            )
+            buy_quantity = (
+                campaign.data.buy_quantity
+                if campaign.type == "buy n get n"
+                and isinstance(campaign.data, BuyNGetN)
+                else None
+            )
+            get_quantity = (
+                campaign.data.get_quantity
+                if campaign.type == "buy n get n"
+                and isinstance(campaign.data, BuyNGetN)
+                else None
+            )
+
+            min_amount = (
+                campaign.data.min_amount
+                if campaign.type == "receipt discount"
+                and isinstance(campaign.data, ReceiptDiscount)
+                else None
             )
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                campaign.campaign_id,
-                campaign.type,
-                discount_percentage,
-                buy_quantity,
-                get_quantity,
-                min_amount,
-            ),
-        )
 
-        if campaign.type == "discount" and isinstance(campaign.data, Discount):
-            old_price = self.products.read(campaign.data.product_id).price
-            discount = campaign.data.discount_percentage
-            new_price = old_price - (old_price * discount / 100)
             cursor.execute(
                 """
-                INSERT INTO campaign_products 
-                    (id, campaign_id, product_id, discounted_price)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO campaigns (
+                    id, type, discount_percentage, buy_quantity, get_quantity,
+                    min_amount
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
                 """,
                 (
-                    str(uuid.uuid4()),
                     campaign.campaign_id,
-                    campaign.data.product_id,
-                    new_price,
+                    campaign.type,
+                    discount_percentage,
+                    buy_quantity,
+                    get_quantity,
+                    min_amount,
                 ),
             )
-        elif campaign.type == "combo" and isinstance(campaign.data, Combo):
-            for product_id in campaign.data.products:
-                old_price = self.products.read(product_id).price
+
+            if campaign.type == "discount" and isinstance(campaign.data, Discount):
+                old_price = self.products.read(campaign.data.product_id).price
                 discount = campaign.data.discount_percentage
                 new_price = old_price - (old_price * discount / 100)
                 cursor.execute(
@@ -135,103 +137,133 @@ class CampaignSQLRepository(Repository[Campaign]):
                     (
                         str(uuid.uuid4()),
                         campaign.campaign_id,
-                        product_id,
+                        campaign.data.product_id,
                         new_price,
                     ),
                 )
-        elif campaign.type == "buy n get n" and isinstance(campaign.data, BuyNGetN):
-            cursor.execute(
-                """
-                INSERT INTO campaign_products 
-                    (id, campaign_id, product_id, discounted_price)
-                VALUES (?, ?, ?, ?)
-                """,
-                (
-                    str(uuid.uuid4()),
-                    campaign.campaign_id,
-                    campaign.data.product_id,
-                    self.products.read(campaign.data.product_id).price,
-                ),
-            )
-
-        self.conn.commit()
+            elif campaign.type == "combo" and isinstance(campaign.data, Combo):
+                for product_id in campaign.data.products:
+                    old_price = self.products.read(product_id).price
+                    discount = campaign.data.discount_percentage
+                    new_price = old_price - (old_price * discount / 100)
+                    cursor.execute(
+                        """
+                        INSERT INTO campaign_products 
+                            (id, campaign_id, product_id, discounted_price)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (
+                            str(uuid.uuid4()),
+                            campaign.campaign_id,
+                            product_id,
+                            new_price,
+                        ),
+                    )
+            elif campaign.type == "buy n get n" and isinstance(campaign.data, BuyNGetN):
+                cursor.execute(
+                    """
+                    INSERT INTO campaign_products 
+                        (id, campaign_id, product_id, discounted_price)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        str(uuid.uuid4()),
+                        campaign.campaign_id,
+                        campaign.data.product_id,
+                        self.products.read(campaign.data.product_id).price,
+                    ),
+                )
 
         return campaign
 
     def delete(self, campaign_id: str) -> None:
-        cursor = self.conn.cursor()
-
-        cursor.execute("SELECT id FROM campaigns WHERE id = ?", (campaign_id,))
-        campaign = cursor.fetchone()
-        if not campaign:
-            raise DoesntExistError(f"Campaign with ID {campaign_id} does not exist.")
-        print("i am deleting")
-        cursor.execute(
-            "DELETE FROM campaign_products WHERE campaign_id = ?", (campaign_id,)
-        )
-        cursor.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
-        self.conn.commit()
-
-    def read_all(self) -> list[Campaign]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM campaigns")
-        campaigns_data = cursor.fetchall()
-
-        campaigns = []
-        for campaign_data in campaigns_data:
-            (
-                campaign_id,
-                type_,
-                discount_percentage,
-                buy_quantity,
-                get_quantity,
-                min_amount,
-            ) = campaign_data
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
 
+            cursor.execute("SELECT id FROM campaigns WHERE id = ?", (campaign_id,))
+            campaign = cursor.fetchone()
+            if not campaign:
+                raise DoesntExistError(
+                    f"Campaign with ID {campaign_id} does not exist."
+                )
+            print("i am deleting")
             cursor.execute(
-                "SELECT product_id FROM campaign_products WHERE campaign_id = ?",
-                (campaign_id,),
+                "DELETE FROM campaign_products WHERE campaign_id = ?", (campaign_id,)
             )
-            campaign_products_data = cursor.fetchall()
-            product_ids = [product[0] for product in campaign_products_data]
-
-            campaign_data_obj: Union[Discount, Combo, BuyNGetN, ReceiptDiscount]
-            if type_ == "discount":
-                campaign_data_obj = Discount(
-                    product_id=product_ids[0],
-                    discount_percentage=discount_percentage,
-                )
-            elif type_ == "combo":
-                campaign_data_obj = Combo(
-                    products=product_ids,
-                    discount_percentage=discount_percentage,
-                )
-            elif type_ == "buy n get n":
-                campaign_data_obj = BuyNGetN(
-                    product_id=product_ids[0],
-                    buy_quantity=buy_quantity,
-                    get_quantity=get_quantity,
-                )
-            elif type_ == "receipt discount":
-                campaign_data_obj = ReceiptDiscount(
-                    min_amount=min_amount / 100,
-                    discount_percentage=discount_percentage,
-                )
-            else:
-                raise DoesntExistError(f"Unknown campaign type {type_}")
+            cursor.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
 
-            campaign = Campaign(
-                campaign_id=campaign_id,
-                type=type_,
-                data=campaign_data_obj,
+    def read_all(self) -> list[Campaign]:
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT c.id, c.type, c.discount_percentage, c.buy_quantity,
+                    c.get_quantity, c.min_amount, cp.product_id
+                FROM campaigns c
+                LEFT JOIN campaign_products cp ON cp.campaign_id = c.id
+                ORDER BY c.rowid, cp.rowid
+                """
             )
 
-            campaigns.append(campaign)
+            campaign_rows: Dict[str, CampaignRow] = {}
+            members: Dict[str, list[str]] = {}
+            for row in cursor.fetchall():
+                campaign_rows[row[0]] = row[:6]
+                product_ids = members.setdefault(row[0], [])
+                if row[6] is not None:
+                    product_ids.append(row[6])
 
-        return campaigns
+            return [
+                build_campaign(campaign_row, members[campaign_id])
+                for campaign_id, campaign_row in campaign_rows.items()
+            ]
+
+    def index(self) -> CampaignIndex:
+        # the version is read first, so a change made while building is seen
+        # by the next call
+        version = self._catalog_version()
+        memo = self._index
+        if memo is None or memo[0] != version:
+            # read_all reports min_amount in GEL, receipts are priced in tetri
+            index = CampaignIndex.build(self.read_all(), min_amount_unit=100)
+            memo = self._index = (version, index)
+        return memo[1]
 
     def read(self, campaign_id: str) -> Campaign:
-        raise NotImplementedError("Not implemented yet.")
+        version = self._catalog_version()
+        memo_version, campaigns = self._campaigns
+        if memo_version != version:
+            campaigns = {}
+            self._campaigns = (version, campaigns)
+        cached = campaigns.get(campaign_id)
+        if cached is not None:
+            return cached
+
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,))
+            campaign_row = cursor.fetchone()
+            if not campaign_row:
+                raise DoesntExistError(
+                    f"Campaign with ID {campaign_id} does not exist."
+                )
+
+            cursor.execute(
+                "SELECT product_id FROM campaign_products WHERE campaign_id = ?",
+                (campaign_id,),
+            )
+            product_ids = [row[0] for row in cursor.fetchall()]
+        campaign = build_campaign(campaign_row, product_ids)
+        campaigns[campaign_id] = campaign
+        return campaign
 
     def update(self, campaign: Campaign) -> None:
         raise NotImplementedError("Not implemented yet.")
+
+    def _catalog_version(self) -> int:
+        """Raised by triggers on every catalog change, from any connection."""
+        with self.pool.reader() as connection:
+            (version,) = connection.execute(
+                "SELECT version FROM campaign_catalog WHERE id = 1"
+            ).fetchone()
+        return int(version)
@@ -1,11 +1,18 @@
 import sqlite3
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Callable, NoReturn, Optional
 
 from app.core.classes.campaign_discount_calculator import CampaignDiscountCalculator
 from app.core.classes.errors import AlreadyClosedError, DoesntExistError
 from app.core.classes.exchange_rate_service import ExchangeRateService
 from app.core.classes.percentage_discount import PercentageDiscount
-from app.core.Interfaces.campaign_interface import Campaign
+from app.core.classes.receipt_lines import merge_receipt_lines
+from app.core.classes.sales_buckets import timestamp, utc_now
+from app.core.Interfaces.campaign_repository_interface import (
+    CampaignRepositoryInterface,
+)
 from app.core.Interfaces.discount_handler import DiscountHandler
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.receipt_interface import (
@@ -17,289 +24,436 @@ from app.core.Interfaces.receipt_interface import (
 from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
 from app.core.Interfaces.repository import ItemT, Repository
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
-from app.infra.in_memory_repositories.campaign_in_memory_repository import (
-    CampaignAndProducts,
+from app.infra.sqlite_pool import SqliteConnectionPool
+
+# one line per product: repeated scans add to its quantity and total
+ON_LINE_CONFLICT = (
+    "ON CONFLICT (receipt_id, product_id) DO UPDATE SET "
+    "quantity = quantity + excluded.quantity, total = total + excluded.total"
+)
+
+# open receipts kept as working copies, least recently used evicted first;
+# the copies are only read or changed while the pool's write lock is held
+OPEN_RECEIPT_CACHE_SIZE = 1024
+
+UPSERT_RECEIPT_LINE = (
+    "INSERT INTO receipt_products "
+    "(receipt_id, product_id, quantity, price, total) "
+    f"VALUES (?, ?, ?, ?, ?) {ON_LINE_CONFLICT}"
+)
+
+# a line as given, overwriting the stored one
+REPLACE_RECEIPT_LINE = (
+    "INSERT INTO receipt_products "
+    "(receipt_id, product_id, quantity, price, total) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (receipt_id, product_id) DO UPDATE SET "
+    "quantity = excluded.quantity, price = excluded.price, total = excluded.total"
 )
 
+# receipt columns an update may change
+RECEIPT_COLUMNS = ("currency", "status", "total", "discounted_total", "closed_at")
+
 
 class ReceiptSQLRepository(ReceiptRepositoryInterface):
     def __init__(
         self,
-        connection: sqlite3.Connection,
+        pool: SqliteConnectionPool,
         products_repo: Repository[Product],
         shifts_repo: ShiftRepositoryInterface,
-        campaigns_repo: Repository[Campaign],
+        campaigns_repo: CampaignRepositoryInterface,
         exchange_rate_service: ExchangeRateService,
         discount_handler: DiscountHandler = PercentageDiscount(),
         campaign_calculator: Optional[CampaignDiscountCalculator] = None,
+        clock: Callable[[], datetime] = utc_now,
     ) -> None:
-        self.conn = connection
+        self.pool = pool
         self.products = products_repo
         self.shifts = shifts_repo
         self.campaigns = campaigns_repo
         self.exchange_rate_service = exchange_rate_service
-        self._initialize_db()
+        self._open_receipts: OrderedDict[str, Receipt] = OrderedDict()
+        self._data_version: Optional[int] = None
         self.discount_handler = discount_handler
+        self.clock = clock
 
         if campaign_calculator is None:
             self.campaign_calculator = CampaignDiscountCalculator(discount_handler)
         else:
             self.campaign_calculator = campaign_calculator
 
-    def _initialize_db(self) -> None:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS receipts (
-                id TEXT PRIMARY KEY,
-                shift_id TEXT NOT NULL,
-                currency TEXT NOT NULL,
-                status TEXT NOT NULL,
-                total INTEGER NOT NULL,
-                discounted_total INTEGER NOT NULL
+    def create(self, receipt: Receipt) -> Receipt:
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT shift_id, status FROM shifts WHERE shift_id = ?",
+                (receipt.shift_id,),
             )
-            """
-        )
+            row = cursor.fetchone()
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS receipt_products (
-                receipt_id TEXT,
-                product_id TEXT,
-                quantity INTEGER,
-                price INTEGER,
-                total INTEGER,
-                FOREIGN KEY (receipt_id) REFERENCES receipts(id)
-            )
-            """
-        )
-        self.conn.commit()
+            if not row:
+                raise DoesntExistError(
+                    f"Shift with ID {receipt.shift_id} does not exist."
+                )
 
-    def create(self, receipt: Receipt) -> Receipt:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT shift_id, status FROM shifts WHERE shift_id = ?",
-            (receipt.shift_id,),
-        )
-        row = cursor.fetchone()
+            if row[1] == "closed":
+                raise AlreadyClosedError(
+                    f"Shift with ID {receipt.shift_id} is already closed."
+                )
 
-        if not row:
-            raise DoesntExistError(f"Shift with ID {receipt.shift_id} does not exist.")
+            cursor.execute(
+                "INSERT INTO receipts "
+                "(id, shift_id, currency, status, total, discounted_total, closed_at)"
+                " VALUES (?, ?, ?,?,?,?,?)",
+                (
+                    receipt.id,
+                    receipt.shift_id,
+                    receipt.currency.upper(),
+                    receipt.status,
+                    receipt.total,
+                    receipt.discounted_total,
+                    receipt.closed_at,
+                ),
+            )
 
-        if row[1] == "closed":
-            raise AlreadyClosedError(
-                f"Shift with ID {receipt.shift_id} is already closed."
+            lines = merge_receipt_lines([], receipt.products)
+            cursor.executemany(
+                UPSERT_RECEIPT_LINE,
+                [
+                    (receipt.id, line.id, line.quantity, line.price, line.total)
+                    for line in lines
+                ],
             )
 
-        cursor.execute(
-            "INSERT INTO receipts "
-            "(id, shift_id, currency, status, total, discounted_total)"
-            " VALUES (?, ?, ?,?,?,?)",
-            (
-                receipt.id,
-                receipt.shift_id,
+            if receipt.status == "open":
+                self._sync_open_receipts(connection)
+                self._remember(
+                    replace(receipt, currency=receipt.currency.upper(), products=lines)
+                )
+            return replace(receipt, products=lines)
+
+    def update(self, receipt: Receipt) -> None:
+        """Write only the receipt columns and lines that differ from storage."""
+        with self.pool.writer() as connection:
+            self._open_receipts.pop(receipt.id, None)
+            row = connection.execute(
+                f"SELECT {', '.join(RECEIPT_COLUMNS)} FROM receipts WHERE id = ?",
+                (receipt.id,),
+            ).fetchone()
+            if row is None:
+                raise DoesntExistError(f"Receipt with ID {receipt.id} does not exist.")
+
+            values = (
                 receipt.currency.upper(),
                 receipt.status,
                 receipt.total,
                 receipt.discounted_total,
-            ),
-        )
-
-        for product in receipt.products:
-            cursor.execute(
-                "INSERT INTO receipt_products "
-                "(receipt_id, product_id, quantity, price, total)"
-                " VALUES (?, ?, ?, ?, ?)",
-                (
-                    receipt.id,
-                    product.id,
-                    product.quantity,
-                    product.price,
-                    product.total,
-                ),
+                receipt.closed_at,
             )
+            changed = {
+                column: value
+                for column, value, stored in zip(RECEIPT_COLUMNS, values, row)
+                if value != stored
+            }
+            if changed:
+                assignments = ", ".join(f"{column} = ?" for column in changed)
+                connection.execute(
+                    f"UPDATE receipts SET {assignments} WHERE id = ?",
+                    (*changed.values(), receipt.id),
+                )
 
-        self.conn.commit()
+            stored_lines = {
+                line.id: line
+                for line in (
+                    ReceiptProduct(*line_row)
+                    for line_row in connection.execute(
+                        "SELECT product_id, quantity, price, total "
+                        "FROM receipt_products WHERE receipt_id = ?",
+                        (receipt.id,),
+                    )
+                )
+            }
+            lines = merge_receipt_lines([], receipt.products)
+            connection.executemany(
+                "DELETE FROM receipt_products WHERE receipt_id = ? AND product_id = ?",
+                [
+                    (receipt.id, product_id)
+                    for product_id in stored_lines.keys() - {line.id for line in lines}
+                ],
+            )
+            connection.executemany(
+                REPLACE_RECEIPT_LINE,
+                [
+                    (receipt.id, line.id, line.quantity, line.price, line.total)
+                    for line in lines
+                    if stored_lines.get(line.id) != line
+                ],
+            )
 
-        return receipt
+    def close_receipt(self, receipt_id: str) -> None:
+        with self.pool.writer() as connection:
+            self._open_receipts.pop(receipt_id, None)
+            cursor = connection.execute(
+                "UPDATE receipts SET status = 'closed', closed_at = ? "
+                "WHERE id = ? AND status = 'open'",
+                (timestamp(self.clock()), receipt_id),
+            )
+            if cursor.rowcount == 1:
+                return
+            row = connection.execute(
+                "SELECT status FROM receipts WHERE id = ?", (receipt_id,)
+            ).fetchone()
 
-    def update(self, receipt: Receipt) -> None:
-        self.delete(receipt.id)
-        self.create(receipt)
+        if row is None:
+            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+        raise AlreadyClosedError(f"Receipt with ID {receipt_id} is already closed.")
 
     def read(self, receipt_id: str) -> Receipt:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT id, shift_id, currency, status, total, discounted_total "
-            "FROM receipts WHERE id = ?",
-            (receipt_id,),
-        )
-        row = cursor.fetchone()
-        if row:
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
             cursor.execute(
-                """
-                SELECT rp.product_id, rp.quantity, rp.price, rp.total
-                FROM receipt_products rp
-                WHERE rp.receipt_id = ?
-                """,
+                "SELECT id, shift_id, currency, status, total, discounted_total, "
+                "closed_at FROM receipts WHERE id = ?",
                 (receipt_id,),
             )
-            products_data = cursor.fetchall()
-
-            products = []
-            for product_data in products_data:
-                product = ReceiptProduct(
-                    id=product_data[0],
-                    quantity=product_data[1],
-                    price=product_data[2],
-                    total=product_data[3],
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(
+                    """
+                    SELECT rp.product_id, rp.quantity, rp.price, rp.total
+                    FROM receipt_products rp
+                    WHERE rp.receipt_id = ?
+                    ORDER BY rp.rowid
+                    """,
+                    (receipt_id,),
                 )
-                products.append(product)
-
-            receipt = Receipt(
-                id=row[0],
-                shift_id=row[1],
-                currency=row[2],
-                status=row[3],
-                total=row[4],
-                products=products,
-                discounted_total=row[5],
-            )
-            return receipt
-        raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+                products_data = cursor.fetchall()
+
+                products = []
+                for product_data in products_data:
+                    product = ReceiptProduct(
+                        id=product_data[0],
+                        quantity=product_data[1],
+                        price=product_data[2],
+                        total=product_data[3],
+                    )
+                    products.append(product)
+
+                receipt = Receipt(
+                    id=row[0],
+                    shift_id=row[1],
+                    currency=row[2],
+                    status=row[3],
+                    total=row[4],
+                    products=products,
+                    discounted_total=row[5],
+                    closed_at=row[6],
+                )
+                return receipt
+            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
 
     def add_product_to_receipt(
         self, receipt_id: str, product_request: AddProductRequest
     ) -> Receipt:
-        cursor = self.conn.cursor()
-
-        cursor.execute("SELECT * FROM receipts WHERE id = ?", (receipt_id,))
-        receipt = cursor.fetchone()
+        """
+        Validate, merge the line and bump the total in one transaction.
+
+        The returned receipt is the open receipt's working copy with the new
+        line merged in, so the lines already on it are not read back.
+        """
+        with self.pool.writer() as connection:
+            line = connection.execute(
+                "INSERT INTO receipt_products "
+                "(receipt_id, product_id, quantity, price, total) "
+                "SELECT r.id, p.id, ?, p.price, ? * p.price "
+                "FROM receipts r, products p "
+                "WHERE r.id = ? AND r.status = 'open' AND p.id = ? "
+                f"{ON_LINE_CONFLICT} "
+                "RETURNING quantity, price, total, "
+                "(SELECT price FROM products WHERE id = product_id)",
+                (
+                    product_request.quantity,
+                    product_request.quantity,
+                    receipt_id,
+                    product_request.product_id,
+                ),
+            ).fetchone()
+            if line is None:
+                self._raise_for_rejected_line(connection, receipt_id, product_request)
+            quantity, line_price, line_total, price = line
+            added = ReceiptProduct(
+                id=product_request.product_id,
+                quantity=product_request.quantity,
+                price=price,
+                total=product_request.quantity * price,
+            )
+            merged = ReceiptProduct(
+                product_request.product_id, quantity, line_price, line_total
+            )
+            return self._extend_open_receipt(connection, receipt_id, [added], [merged])
 
-        if not receipt:
-            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
-        elif receipt[3] == "closed":
-            raise AlreadyClosedError(f"Receipt with ID {receipt_id} is already closed.")
+    def add_products_to_receipt(
+        self, receipt_id: str, product_requests: list[AddProductRequest]
+    ) -> Receipt:
+        """Price every line from one product query and insert them together."""
+        with self.pool.writer() as connection:
+            row = connection.execute(
+                "SELECT status FROM receipts WHERE id = ?", (receipt_id,)
+            ).fetchone()
+            if row is None:
+                raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+            if row[0] == "closed":
+                raise AlreadyClosedError(
+                    f"Receipt with ID {receipt_id} is already closed."
+                )
 
-        cursor.execute(
-            "SELECT price FROM products WHERE id = ?",
-            (product_request.product_id,),
-        )
-        row = cursor.fetchone()
-        if row:
-            product_price = row[0]
-        else:
-            raise DoesntExistError(
-                f"Product with ID {product_request.product_id} does not exist."
+            product_ids = list(dict.fromkeys(r.product_id for r in product_requests))
+            placeholders = ", ".join("?" * len(product_ids))
+            prices = dict(
+                connection.execute(
+                    f"SELECT id, price FROM products WHERE id IN ({placeholders})",
+                    product_ids,
+                ).fetchall()
             )
+            lines = []
+            for product_request in product_requests:
+                price = prices.get(product_request.product_id)
+                if price is None:
+                    raise DoesntExistError(
+                        f"Product with ID {product_request.product_id} does not exist."
+                    )
+                lines.append(
+                    ReceiptProduct(
+                        id=product_request.product_id,
+                        quantity=product_request.quantity,
+                        price=price,
+                        total=product_request.quantity * price,
+                    )
+                )
 
-        total_price = product_request.quantity * product_price
-
-        cursor.execute(
-            "INSERT INTO receipt_products "
-            "(receipt_id, product_id, quantity, price, total)"
-            " VALUES (?, ?, ?, ?, ?)",
-            (
-                receipt_id,
-                product_request.product_id,
-                product_request.quantity,
-                product_price,
-                total_price,
-            ),
-        )
-        self.conn.commit()
+            connection.executemany(
+                UPSERT_RECEIPT_LINE,
+                [
+                    (receipt_id, line.id, line.quantity, line.price, line.total)
+                    for line in lines
+                ],
+            )
+            merged = [
+                ReceiptProduct(*row)
+                for row in connection.execute(
+                    "SELECT product_id, quantity, price, total FROM receipt_products "
+                    f"WHERE receipt_id = ? AND product_id IN ({placeholders})",
+                    [receipt_id, *product_ids],
+                )
+            ]
+            return self._extend_open_receipt(connection, receipt_id, lines, merged)
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "UPDATE receipts SET total = total + ? WHERE id = ?",
-            (total_price, receipt_id),
+    def _extend_open_receipt(
+        self,
+        connection: sqlite3.Connection,
+        receipt_id: str,
+        added: list[ReceiptProduct],
+        merged: list[ReceiptProduct],
+    ) -> Receipt:
+        """
+        Fold ``added`` into the working copy, or read the receipt back.
+
+        ``merged`` holds the stored lines the write produced. The working copy
+        is used only if folding ``added`` into it gives exactly those lines,
+        the stored line count and the stored total. Otherwise something else
+        changed the receipt, and it is read back.
+        """
+        added_total = sum(line.total for line in added)
+        total, n_lines = connection.execute(
+            "UPDATE receipts SET total = total + ? WHERE id = ? RETURNING total, "
+            "(SELECT COUNT(*) FROM receipt_products WHERE receipt_id = ?)",
+            (added_total, receipt_id, receipt_id),
+        ).fetchone()
+
+        self._sync_open_receipts(connection)
+        receipt = self._open_receipts.get(receipt_id)
+        if receipt is not None:
+            lines = merge_receipt_lines(receipt.products, added)
+            by_id = {line.id: line for line in lines}
+            if (
+                receipt.total + added_total == total
+                and len(lines) == n_lines
+                and all(by_id.get(line.id) == line for line in merged)
+            ):
+                receipt.products = lines
+                receipt.total = total
+            else:
+                receipt = None
+        if receipt is None:
+            receipt = self.read(receipt_id)
+        self._remember(receipt)
+        return replace(receipt, products=list(receipt.products))
+
+    def _sync_open_receipts(self, connection: sqlite3.Connection) -> None:
+        """Drop every working copy once another connection has committed."""
+        (version,) = connection.execute("PRAGMA data_version").fetchone()
+        if version != self._data_version:
+            self._open_receipts.clear()
+            self._data_version = version
+
+    def _remember(self, receipt: Receipt) -> None:
+        """Keep ``receipt`` as most recently used; only under the write lock."""
+        self._open_receipts.pop(receipt.id, None)
+        self._open_receipts[receipt.id] = receipt
+        if len(self._open_receipts) > OPEN_RECEIPT_CACHE_SIZE:
+            self._open_receipts.popitem(last=False)
+
+    @staticmethod
+    def _raise_for_rejected_line(
+        connection: sqlite3.Connection,
+        receipt_id: str,
+        product_request: AddProductRequest,
+    ) -> NoReturn:
+        row = connection.execute(
+            "SELECT status FROM receipts WHERE id = ?", (receipt_id,)
+        ).fetchone()
+        if row is None:
+            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
+        if row[0] == "closed":
+            raise AlreadyClosedError(f"Receipt with ID {receipt_id} is already closed.")
+        raise DoesntExistError(
+            f"Product with ID {product_request.product_id} does not exist."
         )
-        self.conn.commit()
-
-        return self.read(receipt_id)
 
     def delete(self, item_id: str) -> None:
-        cursor = self.conn.cursor()
+        with self.pool.writer() as connection:
+            self._open_receipts.pop(item_id, None)
+            cursor = connection.cursor()
 
-        cursor.execute("SELECT id FROM receipts WHERE id = ?", (item_id,))
-        if not cursor.fetchone():
-            raise DoesntExistError(f"Receipt with ID {item_id} does not exist.")
+            cursor.execute("SELECT id FROM receipts WHERE id = ?", (item_id,))
+            if not cursor.fetchone():
+                raise DoesntExistError(f"Receipt with ID {item_id} does not exist.")
 
-        cursor.execute("DELETE FROM receipt_products WHERE receipt_id = ?", (item_id,))
-
-        cursor.execute("DELETE FROM receipts WHERE id = ?", (item_id,))
+            cursor.execute(
+                "DELETE FROM receipt_products WHERE receipt_id = ?", (item_id,)
+            )
 
-        self.conn.commit()
+            cursor.execute("DELETE FROM receipts WHERE id = ?", (item_id,))
 
     def calculate_payment(self, receipt_id: str) -> ReceiptForPayment:
-        cursor = self.conn.cursor()
-
         receipt = self.read(receipt_id)
         original_total = receipt.total
-        products_data = receipt.products
-        total_discounted_price: float = 0
-        for receipt_product in products_data:
-            cursor.execute(
-                """
-                SELECT 
-                c.id, cp.campaign_id, c.type, cp.discounted_price,
-                c.discount_percentage, c.buy_quantity,
-                c.get_quantity, c.min_amount
-                FROM campaign_products cp
-                JOIN campaigns c ON cp.campaign_id = c.id
-                WHERE cp.product_id = ?
-                """,
-                (receipt_product.id,),
+        campaign_index = self.campaigns.index()
+        total_discounted_price: float = (
+            self.campaign_calculator.calculate_products_price(
+                receipt.products, campaign_index
             )
-            campaign_rows = cursor.fetchall()
-
-            if not campaign_rows:
-                total_discounted_price += receipt_product.total
-            else:
-                best_discounted_price_for_this_product = receipt_product.total
-                for campaign_row in campaign_rows:
-                    discounted_price_using_this_campaign = (
-                        self.campaign_calculator.calculate_price_for_campaign(
-                            receipt_id,
-                            CampaignAndProducts(
-                                id=campaign_row[0],
-                                campaign_id=campaign_row[1],
-                                product_id=receipt_product.id,
-                                discounted_price=campaign_row[3],
-                            ),
-                            receipt_product,
-                            self,
-                        )
-                    )
-
-                    best_discounted_price_for_this_product = min(
-                        best_discounted_price_for_this_product,
-                        discounted_price_using_this_campaign,
-                    )
-
-                total_discounted_price += best_discounted_price_for_this_product
-
-        cursor.execute(
-            """
-            SELECT discount_percentage 
-            FROM campaigns 
-            WHERE type = 'receipt discount' 
-            AND min_amount <= ?
-            ORDER BY discount_percentage DESC 
-            LIMIT 1
-            """,
-            (total_discounted_price,),
         )
-        receipt_campaign = cursor.fetchone()
 
-        if receipt_campaign:
-            discount_percentage = receipt_campaign[0]
+        discount_percentage = campaign_index.receipt_discount_percentage(
+            total_discounted_price
+        )
+        if discount_percentage is not None:
             total_discounted_price = self.discount_handler.calculate_discounted_price(
                 int(total_discounted_price), discount_percentage
             )
 
         reduced_price = original_total - total_discounted_price
-        receipt = self.read(receipt_id)
         receipt.currency = receipt.currency.upper()
         if receipt.currency != "GEL":
             conversion_rate = self.exchange_rate_service.get_exchange_rate(
@@ -326,53 +480,24 @@ class ReceiptSQLRepository(ReceiptRepositoryInterface):
             reduced_price=reduced_price_in_target_currency,
         )
 
-
-    def get_campaign_with_campaign_id(self, campaign_id: str) -> Campaign | None:
-        campaigns = self.campaigns.read_all()
-        for campaign in campaigns:
-            if campaign.campaign_id == campaign_id:
-                return campaign
-        return None
-
-    def get_other_products_with_same_campaign(self, campaign_id: str) -> list[str]:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT product_id 
-            FROM campaign_products 
-            WHERE campaign_id = ?
-            """,
-            (campaign_id,),
-        )
-        return [row[0] for row in cursor.fetchall()]
-
-    def product_not_in_receipt(self, product_id: str, receipt_id: str) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT * FROM receipt_products 
-            WHERE receipt_id = ? AND product_id = ?
-            """,
-            (receipt_id, product_id),
-        )
-        return cursor.fetchone() is None
-
     def add_payment(self, receipt_id: str) -> ReceiptForPayment:
-        cursor = self.conn.cursor()
-
-        cursor.execute("SELECT * FROM receipts WHERE id = ?", (receipt_id,))
-        receipt = cursor.fetchone()
-
-        if not receipt:
-            raise DoesntExistError(f"Receipt with ID {receipt_id} does not exist.")
-
-        receipt_for_payment = self.calculate_payment(receipt_id)
-        discounted_price = receipt_for_payment.discounted_price
-        cursor.execute(
-            "UPDATE receipts SET discounted_total = ? WHERE id = ?",
-            (discounted_price, receipt_id),
-        )
-        self.conn.commit()
+        # fetching rates may wait on the network, so it happens before the write
+        # lock; the lines are then priced and paid in one write transaction
+        with self.pool.reader() as connection:
+            row = connection.execute(
+                "SELECT currency FROM receipts WHERE id = ?", (receipt_id,)
+            ).fetchone()
+        if row is not None and row[0] != "GEL":
+            self.exchange_rate_service.get_rate_table("GEL")
+
+        with self.pool.writer() as connection:
+            receipt_for_payment = self.calculate_payment(receipt_id)
+            discounted_price = receipt_for_payment.discounted_price
+            connection.execute(
+                "UPDATE receipts SET discounted_total = ? WHERE id = ?",
+                (discounted_price, receipt_id),
+            )
+            self._open_receipts.pop(receipt_id, None)
         receipt = receipt_for_payment.receipt
         receipt_for_payment.receipt = receipt
 
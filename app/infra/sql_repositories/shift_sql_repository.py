@@ -1,180 +1,266 @@
+import json
 import sqlite3
 from dataclasses import dataclass
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
 
 from app.core.classes.errors import DoesntExistError, OpenReceiptsError
+from app.core.classes.sales_buckets import bucket_after, bucket_start
 from app.core.Interfaces.receipt_interface import Receipt
 from app.core.Interfaces.repository import ItemT
 from app.core.Interfaces.shift_interface import (
     ClosedReceipt,
     Report,
+    SalesBucket,
     SalesReport,
     Shift,
 )
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
+from app.infra.sqlite_pool import SqliteConnectionPool
+
+STREAM_PAGE_SIZE = 1000
+
+# hour buckets name their day by the first 10 characters, YYYY-MM-DD
+BUCKET_COLUMN = {
+    "hour": "bucket",
+    "day": "substr(bucket, 1, 10) || 'T00:00:00Z'",
+}
 
 
 @dataclass
 class ShiftSQLRepository(ShiftRepositoryInterface):
     def __init__(
         self,
-        connection: sqlite3.Connection,
+        pool: SqliteConnectionPool,
     ) -> None:
-        self.conn = connection
-        self._initialize_database()
-
-    def _initialize_database(self) -> None:
-        """Create necessary tables if they don't exist."""
-
-        cursor = self.conn.cursor()
-        cursor.executescript("""
-            CREATE TABLE IF NOT EXISTS shifts (
-                shift_id TEXT PRIMARY KEY,
-                status TEXT NOT NULL
-            );
-        """)
-        self.conn.commit()
+        self.pool = pool
 
     def create(self, shift: Shift) -> Shift:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO shifts (shift_id, status) VALUES (?, ?)",
-            (shift.shift_id, shift.status),
-        )
-        self.conn.commit()
-        return shift
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "INSERT INTO shifts (shift_id, status) VALUES (?, ?)",
+                (shift.shift_id, shift.status),
+            )
+            return shift
 
     def update(self, shift: Shift) -> None:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) FROM receipts WHERE shift_id = ? AND status = 'open'",
-            (shift.shift_id,),
-        )
-        open_receipt_count = cursor.fetchone()[0]
-
-        if open_receipt_count > 0:
-            raise OpenReceiptsError(
-                "Shift cannot be closed while there are open receipts."
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM receipts WHERE shift_id = ? AND status = 'open'",
+                (shift.shift_id,),
             )
-        self.delete(shift.shift_id)
+            open_receipt_count = cursor.fetchone()[0]
 
-        cursor.execute(
-            """
-            INSERT INTO shifts (shift_id, status) VALUES (?, ?)
-            """,
-            (shift.shift_id, shift.status),
-        )
-        self.conn.commit()
+            if open_receipt_count > 0:
+                raise OpenReceiptsError(
+                    "Shift cannot be closed while there are open receipts."
+                )
+            cursor.execute(
+                "UPDATE shifts SET status = ? WHERE shift_id = ?",
+                (shift.status, shift.shift_id),
+            )
+            if cursor.rowcount == 0:
+                raise DoesntExistError
 
     def add_receipt_to_shift(self, receipt: Receipt) -> None:
         """Add a receipt to a shift in the database."""
         pass
 
     def get_x_report(self, shift_id: str) -> Report:
-        cursor = self.conn.cursor()
-
-        cursor.execute("SELECT status FROM shifts WHERE shift_id = ?", (shift_id,))
-        result = cursor.fetchone()
-        print(result)
-        if not result:
-            raise DoesntExistError(f"Shift with ID {shift_id} not found.")
-        if result[0] != "open":
-            raise ValueError(f"Cannot generate X Report for closed shift {shift_id}.")
-        cursor.execute(
-            """
-            SELECT r.id, r.discounted_total, r.currency
-            FROM receipts r
-            WHERE r.shift_id = ? AND r.status = 'closed'
-            """,
-            (shift_id,),
-        )
-        receipts = cursor.fetchall()
-        n_receipts = len(receipts)
-        currency_revenue: dict[Any, Any] = {}
-
-        for receipt_id, discounted_total, currency in receipts:
-            print(discounted_total)
-            currency_revenue[currency] = (
-                currency_revenue.get(currency, 0) + discounted_total
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute("SELECT status FROM shifts WHERE shift_id = ?", (shift_id,))
+            result = cursor.fetchone()
+            if not result:
+                raise DoesntExistError(f"Shift with ID {shift_id} not found.")
+            if result[0] != "open":
+                raise ValueError(
+                    f"Cannot generate X Report for closed shift {shift_id}."
+                )
+            cursor.execute(
+                "SELECT currency, n_receipts, revenue FROM shift_revenue "
+                "WHERE shift_id = ? AND n_receipts > 0",
+                (shift_id,),
             )
+            n_receipts = 0
+            currency_revenue: dict[Any, Any] = {}
+            for currency, receipts, revenue in cursor.fetchall():
+                n_receipts += receipts
+                currency_revenue[currency] = revenue
 
-        product_summary = {}
-        cursor.execute(
-            """
-            SELECT rp.product_id, SUM(rp.quantity) AS total_quantity
-            FROM receipt_products rp
-            JOIN receipts r ON rp.receipt_id = r.id
-            WHERE r.shift_id = ? AND r.status = 'closed'
-            GROUP BY rp.product_id
-            """,
-            (shift_id,),
-        )
-        for product_id, total_quantity in cursor.fetchall():
-            product_summary[product_id] = {"quantity": total_quantity}
+            cursor.execute(
+                "SELECT product_id, quantity FROM shift_product_sales "
+                "WHERE shift_id = ? AND quantity != 0",
+                (shift_id,),
+            )
+            products = [
+                {"id": product_id, "quantity": quantity}
+                for product_id, quantity in cursor.fetchall()
+            ]
 
-        products = [
-            {"id": pid, "quantity": data["quantity"]}
-            for pid, data in product_summary.items()
-        ]
+            return Report(
+                shift_id=shift_id,
+                n_receipts=n_receipts,
+                revenue=currency_revenue,
+                products=products,
+            )
 
-        return Report(
-            shift_id=shift_id,
-            n_receipts=n_receipts,
-            revenue=currency_revenue,
-            products=products,
-        )
+    def get_z_report(self, shift_id: str) -> Report:
+        """Served from the snapshot taken when the shift was closed."""
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
 
-    def get_lifetime_sales_report(self) -> SalesReport:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT r.id, r.currency, r.discounted_total
-            FROM receipts r
-            WHERE r.status = 'closed'
-            """
-        )
-        receipts = cursor.fetchall()
-
-        total_receipts = len(receipts)
-        currency_totals: Dict[str, float] = {}
-        closed_receipts: list[ClosedReceipt] = []
-        for receipt_id, currency, total_payment in receipts:
-            currency_totals[currency] = round(
-                currency_totals.get(currency, 0) + total_payment, 2
+            cursor.execute("SELECT status FROM shifts WHERE shift_id = ?", (shift_id,))
+            result = cursor.fetchone()
+            if not result:
+                raise DoesntExistError(f"Shift with ID {shift_id} not found.")
+            if result[0] != "closed":
+                raise ValueError(f"Cannot generate Z Report for open shift {shift_id}.")
+            cursor.execute(
+                "SELECT n_receipts, revenue, products FROM shift_z_reports "
+                "WHERE shift_id = ?",
+                (shift_id,),
             )
-            closed_receipts.append(
-                ClosedReceipt(receipt_id=receipt_id, calculated_payment=total_payment)
+            row = cursor.fetchone()
+            if not row:
+                raise DoesntExistError(f"Z Report for shift {shift_id} not found.")
+
+            n_receipts, revenue, products = row
+            return Report(
+                shift_id=shift_id,
+                n_receipts=n_receipts,
+                revenue=json.loads(revenue),
+                products=json.loads(products),
             )
-        return SalesReport(
-            total_receipts=total_receipts,
-            total_revenue=currency_totals,
-            closed_receipts=closed_receipts,
-        )
 
-    def delete(self, shift_id: str) -> None:
-        cursor = self.conn.cursor()
+    def get_lifetime_sales_report(
+        self, limit: Optional[int] = None, after_receipt_id: Optional[str] = None
+    ) -> SalesReport:
+        """Totals come from sales_totals; closed receipts are listed by id."""
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT currency, n_receipts, revenue FROM sales_totals "
+                "WHERE n_receipts > 0"
+            )
+            total_receipts = 0
+            currency_totals: Dict[str, float] = {}
+            for currency, receipts, revenue in cursor.fetchall():
+                total_receipts += receipts
+                currency_totals[currency] = round(revenue, 2)
+
+            closed_receipts: list[ClosedReceipt] = []
+            if limit is not None:
+                closed_receipts = self._closed_receipts_page(
+                    connection, after_receipt_id, limit
+                )
+            return SalesReport(
+                total_receipts=total_receipts,
+                total_revenue=currency_totals,
+                closed_receipts=closed_receipts,
+            )
 
-        cursor.execute(
-            """
-            DELETE FROM shifts WHERE shift_id = ?
-            """,
-            (shift_id,),
+    def iter_closed_receipts(
+        self, after_receipt_id: Optional[str] = None
+    ) -> Iterator[ClosedReceipt]:
+        """
+        Every closed receipt after ``after_receipt_id``, in id order.
+
+        Rows are read a keyset page at a time, and no connection is held
+        between pages, so a lifetime export neither pins a reader nor, on an
+        in-memory database, blocks writers while the client is consuming it.
+        """
+        while True:
+            with self.pool.reader() as connection:
+                page = self._closed_receipts_page(
+                    connection, after_receipt_id, STREAM_PAGE_SIZE
+                )
+            yield from page
+            if len(page) < STREAM_PAGE_SIZE:
+                return
+            after_receipt_id = page[-1].receipt_id
+
+    @staticmethod
+    def _closed_receipts_page(
+        connection: sqlite3.Connection, after_receipt_id: Optional[str], limit: int
+    ) -> list[ClosedReceipt]:
+        rows = connection.execute(
+            "SELECT id, discounted_total FROM receipts "
+            "WHERE status = 'closed' AND id > ? ORDER BY id LIMIT ?",
+            (after_receipt_id or "", limit),
         )
-        if cursor.rowcount == 0:
-            raise DoesntExistError
+        return [
+            ClosedReceipt(receipt_id=receipt_id, calculated_payment=payment)
+            for receipt_id, payment in rows
+        ]
 
-        self.conn.commit()
+    def get_sales_timeseries(
+        self, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[SalesBucket]:
+        """
+        Buckets from the one holding ``start`` through the one holding ``end``.
+
+        Both rollup tables are read by a primary key range over their hourly
+        buckets; a daily series adds up the hours of each day.
+        """
+        first = bucket_start(start, granularity)
+        after = bucket_after(end, granularity)
+        column = BUCKET_COLUMN[granularity]
+        buckets: Dict[str, SalesBucket] = {}
+        with self.pool.reader() as connection:
+            rows = connection.execute(
+                f"SELECT {column}, currency, SUM(n_receipts), SUM(revenue) "
+                "FROM sales_rollup_receipts "
+                "WHERE bucket >= ? AND bucket < ? AND n_receipts > 0 "
+                "GROUP BY 1, 2 ORDER BY 1, 2",
+                (first, after),
+            ).fetchall()
+            for bucket, currency, n_receipts, revenue in rows:
+                point = buckets.setdefault(bucket, SalesBucket(bucket, 0, {}, []))
+                point.n_receipts += n_receipts
+                point.revenue[currency] = revenue
+
+            rows = connection.execute(
+                f"SELECT {column}, product_id, SUM(quantity), SUM(total) "
+                "FROM sales_rollup_products "
+                "WHERE bucket >= ? AND bucket < ? AND quantity != 0 "
+                "GROUP BY 1, 2 ORDER BY 1, 2",
+                (first, after),
+            ).fetchall()
+            for bucket, product_id, quantity, total in rows:
+                point = buckets.setdefault(bucket, SalesBucket(bucket, 0, {}, []))
+                point.products.append(
+                    {"id": product_id, "quantity": quantity, "total": total}
+                )
+        return [buckets[bucket] for bucket in sorted(buckets)]
+
+    def delete(self, shift_id: str) -> None:
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute(
+                """
+                DELETE FROM shifts WHERE shift_id = ?
+                """,
+                (shift_id,),
+            )
+            if cursor.rowcount == 0:
+                raise DoesntExistError
 
     def read(self, shift_id: str) -> Shift:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT shift_id, status FROM shifts WHERE shift_id = ?",
-            (shift_id,),
-        )
-        row = cursor.fetchone()
-        if row:
-            return Shift(shift_id=row[0], receipts=[], status=row[1])
-        raise DoesntExistError
+        with self.pool.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT shift_id, status FROM shifts WHERE shift_id = ?",
+                (shift_id,),
+            )
+            row = cursor.fetchone()
+            if row:
+                return Shift(shift_id=row[0], receipts=[], status=row[1])
+            raise DoesntExistError
 
     def read_all(self) -> list[ItemT]:
         raise NotImplementedError("Not implemented yet.")
@@ -1,28 +1,37 @@
-import sqlite3
+from typing import Optional
 
 from app.core.classes.exchange_rate_service import ExchangeRateService
 from app.core.Interfaces.campaign_interface import Campaign
+from app.core.Interfaces.exchange_rate_provider import ExchangeRateProvider
 from app.core.Interfaces.product_interface import Product
 from app.core.Interfaces.receipt_repository_interface import ReceiptRepositoryInterface
 from app.core.Interfaces.repository import Repository
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
+from app.infra.migrations import migrate
 from app.infra.sql_repositories.campaign_sql_repository import CampaignSQLRepository
 from app.infra.sql_repositories.product_sql_repository import ProductSQLRepository
 from app.infra.sql_repositories.receipt_sql_repository import ReceiptSQLRepository
 from app.infra.sql_repositories.shift_sql_repository import ShiftSQLRepository
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 
 # @dataclass
 class Sqlite:
     # db_path: str
-    def __init__(self, connection: sqlite3.Connection) -> None:
+    def __init__(
+        self,
+        pool: SqliteConnectionPool,
+        exchange_rate_provider: Optional[ExchangeRateProvider] = None,
+    ) -> None:
         """Initialize repositories with correct dependencies."""
-        self._products = ProductSQLRepository(connection)
-        self._campaigns = CampaignSQLRepository(connection, self._products)
-        self._shifts = ShiftSQLRepository(connection)
-        self._exchange_rate_service = ExchangeRateService()
+        with pool.writer() as connection:
+            migrate(connection)
+        self._products = ProductSQLRepository(pool)
+        self._campaigns = CampaignSQLRepository(pool, self._products)
+        self._shifts = ShiftSQLRepository(pool)
+        self._exchange_rate_service = ExchangeRateService(exchange_rate_provider)
         self._receipts = ReceiptSQLRepository(
-            connection,
+            pool,
             self._products,
             self._shifts,
             self._campaigns,
@@ -40,3 +49,6 @@ class Sqlite:
 
     def campaigns(self) -> Repository[Campaign]:
         return self._campaigns
+
+    def exchange_rate_service(self) -> ExchangeRateService:
+        return self._exchange_rate_service
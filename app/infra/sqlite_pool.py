@@ -0,0 +1,98 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from app.infra.sqlite_schema import configure_connection
+
+DEFAULT_READERS = 4
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+class SqliteConnectionPool:
+    """
+    Hands out SQLite connections to concurrent request threads.
+
+    Writes go through one connection behind a lock, so write transactions are
+    serialized in-process instead of racing for SQLite's write lock. Reads
+    check out one of ``readers`` connections, which run alongside the writer
+    in WAL mode. A thread inside ``writer()`` reads through the writer, so it
+    sees its own uncommitted changes, and nested ``writer()`` blocks join the
+    outermost transaction. With no readers every operation shares the writer
+    connection, which is what an in-memory database needs.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        readers: int = DEFAULT_READERS,
+    ) -> None:
+        self._writer = connect()
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._idle_readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self.readers = readers
+        for _ in range(readers):
+            reader = connect()
+            reader.execute("PRAGMA query_only = ON")
+            self._idle_readers.put(reader)
+
+    @classmethod
+    def open(
+        cls, database: str, readers: int = DEFAULT_READERS
+    ) -> "SqliteConnectionPool":
+        def connect() -> sqlite3.Connection:
+            connection = sqlite3.connect(
+                database, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False
+            )
+            configure_connection(connection)
+            return connection
+
+        # every connection to :memory: is a database of its own
+        return cls(connect, readers=0 if database == ":memory:" else readers)
+
+    @classmethod
+    def single(cls, connection: sqlite3.Connection) -> "SqliteConnectionPool":
+        configure_connection(connection)
+        return cls(lambda: connection, readers=0)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Commit on success and roll back on error, unless nested."""
+        with self._write_lock:
+            depth = self._write_depth()
+            self._local.write_depth = depth + 1
+            try:
+                yield self._writer
+                if depth == 0:
+                    self._writer.commit()
+            except BaseException:
+                if depth == 0:
+                    self._writer.rollback()
+                raise
+            finally:
+                self._local.write_depth = depth
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        if self._write_depth() > 0:
+            yield self._writer
+        elif self.readers == 0:
+            with self._write_lock:
+                yield self._writer
+        else:
+            connection = self._idle_readers.get()
+            try:
+                yield connection
+            finally:
+                self._idle_readers.put(connection)
+
+    def close(self) -> None:
+        with self._write_lock:
+            for _ in range(self.readers):
+                self._idle_readers.get().close()
+            self._writer.close()
+
+    def _write_depth(self) -> int:
+        return int(getattr(self._local, "write_depth", 0))
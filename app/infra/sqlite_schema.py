@@ -0,0 +1,10 @@
+import sqlite3
+
+PAGE_CACHE_KIB = 64 * 1024
+
+
+def configure_connection(connection: sqlite3.Connection) -> None:
+    """WAL journaling, fewer fsyncs and a larger page cache for this connection."""
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(f"PRAGMA cache_size = -{PAGE_CACHE_KIB}")
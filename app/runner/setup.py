@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from app.infra.api.campaigns import campaigns_api
@@ -7,8 +10,16 @@ from app.infra.api.shifts import shifts_api
 from app.infra.repository_factory import RepositoryFactory
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    exchange_rate_service = app.state.infra.exchange_rate_service()
+    exchange_rate_service.start_background_refresh()
+    yield
+    exchange_rate_service.stop_background_refresh()
+
+
 def setup() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     app.state.infra = RepositoryFactory.create()
     app.include_router(products_api, prefix="/products", tags=["products"])
@@ -0,0 +1,52 @@
+"""
+Memory held by the in-memory backend for a large history of closed receipts.
+
+    python -m benchmarks.in_memory_footprint --lines 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.core.Interfaces.receipt_interface import Receipt, ReceiptProduct
+from app.core.Interfaces.shift_interface import Shift
+from app.infra.in_memory import InMemory
+
+PRODUCTS = 500
+LINES_PER_RECEIPT = 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    product_ids = [f"p{i}" for i in range(PRODUCTS)]
+    receipts = args.lines // LINES_PER_RECEIPT
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    infra = InMemory()
+    infra.shifts().create(Shift("bench", [], "open"))
+    for i in range(receipts):
+        lines = [
+            ReceiptProduct(product_ids[(i + j) % PRODUCTS], 1, 100, 100)
+            for j in range(LINES_PER_RECEIPT)
+        ]
+        infra.receipts().create(
+            Receipt(f"r{i}", "bench", "GEL", lines, "closed", 2000, 2000)
+        )
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines_stored = receipts * LINES_PER_RECEIPT
+    print(f"stored {lines_stored} lines in {time.perf_counter() - started:.1f} s")
+    print(f"total      {allocated / 2**20:8.1f} MiB")
+    print(f"per line   {allocated / lines_stored:8.1f} B")
+
+
+if __name__ == "__main__":
+    main()
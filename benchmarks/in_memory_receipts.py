@@ -0,0 +1,65 @@
+"""
+Receipt and report latency of the in-memory backend on large receipts.
+
+    python -m benchmarks.in_memory_receipts --lines 200 --receipts 1000
+"""
+
+import argparse
+import time
+
+from app.core.classes.fake_exchange_rate_provider import FakeExchangeRateProvider
+from app.core.classes.receipt_service import ReceiptService
+from app.core.classes.shift_service import ShiftService
+from app.core.Interfaces.product_interface import Product
+from app.core.Interfaces.receipt_interface import AddProductRequest
+from app.core.Interfaces.shift_interface import Shift
+from app.infra.in_memory import InMemory
+from benchmarks.sqlite_indexes import measure, report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--receipts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    infra = InMemory(FakeExchangeRateProvider())
+    service = ReceiptService(infra.receipts())
+    shifts = ShiftService(infra.shifts())
+    infra.shifts().create(Shift("bench", [], "open"))
+    for i in range(args.lines + 1):
+        infra.products().create(Product(f"p{i}", f"product {i}", 100 + i, f"b{i}"))
+    lines = [AddProductRequest(f"p{i}", 1) for i in range(args.lines)]
+
+    started = time.perf_counter()
+    receipt_ids = []
+    for _ in range(args.receipts + args.repeat):
+        receipt = service.create_receipt("bench", "GEL")
+        service.add_products(receipt.id, lines)
+        receipt_ids.append(receipt.id)
+    print(
+        f"opened {len(receipt_ids)} receipts of {args.lines} lines "
+        f"in {time.perf_counter() - started:.1f} s"
+    )
+
+    quoted = receipt_ids[0]
+    unpaid = iter(receipt_ids[args.receipts :])
+    report(
+        "add-item",
+        measure(
+            lambda: service.add_product(quoted, AddProductRequest("p0", 1)),
+            args.repeat,
+        ),
+    )
+    report("quote", measure(lambda: service.calculate_payment(quoted), args.repeat))
+    report(
+        "payment",
+        measure(lambda: service.add_payment(next(unpaid)), args.repeat),
+    )
+    report("x-report", measure(lambda: shifts.get_x_report("bench"), 20))
+    report("sales", measure(shifts.get_lifetime_sales_report, 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+X-report and add-item latency of the SQLite backend on a large history.
+
+    python -m benchmarks.sqlite_indexes --lines 1000000
+    python -m benchmarks.sqlite_indexes --lines 1000000 --no-indexes
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from app.core.classes.fake_exchange_rate_provider import FakeExchangeRateProvider
+from app.core.Interfaces.product_interface import Product
+from app.core.Interfaces.receipt_interface import AddProductRequest, Receipt
+from app.core.Interfaces.shift_interface import Shift
+from app.infra.migrations.m002_hot_path_indexes import INDEXES
+from app.infra.sqlite import Sqlite
+from app.infra.sqlite_pool import SqliteConnectionPool
+
+PRODUCTS = 500
+LINES_PER_RECEIPT = 20
+RECEIPTS_PER_SHIFT = 50
+
+
+def populate(connection: sqlite3.Connection, lines: int) -> str:
+    receipts = lines // LINES_PER_RECEIPT
+    shifts = max(receipts // RECEIPTS_PER_SHIFT, 1)
+    with connection:
+        connection.executemany(
+            "INSERT INTO products (id, name, barcode, price) VALUES (?, ?, ?, ?)",
+            ((f"p{i}", f"product {i}", f"b{i}", 100 + i) for i in range(PRODUCTS)),
+        )
+        connection.executemany(
+            "INSERT INTO shifts (shift_id, status) VALUES (?, 'open')",
+            ((f"s{i}",) for i in range(shifts)),
+        )
+        connection.executemany(
+            "INSERT INTO receipts "
+            "(id, shift_id, currency, status, total, discounted_total) "
+            "VALUES (?, ?, 'GEL', 'closed', 0, 0)",
+            ((f"r{i}", f"s{i % shifts}") for i in range(receipts)),
+        )
+        connection.executemany(
+            "INSERT INTO receipt_products "
+            "(receipt_id, product_id, quantity, price, total) "
+            "VALUES (?, ?, 1, 100, 100)",
+            (
+                (f"r{i // LINES_PER_RECEIPT}", f"p{i % PRODUCTS}")
+                for i in range(receipts * LINES_PER_RECEIPT)
+            ),
+        )
+    return f"s{shifts // 2}"
+
+
+def measure(operation: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(f"{name:<10} median {statistics.median(timings):8.3f} ms  p95 {p95:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--no-indexes", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SqliteConnectionPool.open(os.path.join(directory, "bench.db"))
+        infra = Sqlite(pool, FakeExchangeRateProvider())
+        with pool.writer() as connection:
+            if args.no_indexes:
+                for name in INDEXES:
+                    connection.execute(f"DROP INDEX {name}")
+
+            started = time.perf_counter()
+            shift_id = populate(connection, args.lines)
+        print(f"populated {args.lines} lines in {time.perf_counter() - started:.1f} s")
+
+        infra.shifts().create(Shift("bench", [], "open"))
+        infra.receipts().create(Receipt("bench", "bench", "GEL", [], "open", 0, 0))
+        infra.products().create(Product("bench", "bench", 100, "bench"))
+
+        report(
+            "x-report",
+            measure(lambda: infra.shifts().get_x_report(shift_id), args.repeat),
+        )
+        report(
+            "add-item",
+            measure(
+                lambda: infra.receipts().add_product_to_receipt(
+                    "bench", AddProductRequest("bench", 1)
+                ),
+                args.repeat,
+            ),
+        )
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
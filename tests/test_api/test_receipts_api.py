@@ -7,6 +7,10 @@ from fastapi.testclient import TestClient
 from app.runner.setup import setup
 
 os.environ["REPOSITORY_KIND"] = "in_memory"
+os.environ["EXCHANGE_RATE_PROVIDER"] = "snapshot"
+os.environ["EXCHANGE_RATE_SNAPSHOT"] = os.path.join(
+    os.path.dirname(__file__), "exchange_rates.json"
+)
 
 
 @pytest.fixture(scope="function")
@@ -98,3 +102,42 @@ def test_add_payment(test_app: TestClient, receipt_id: str) -> None:
     assert response.status_code == 200
     assert "id" in response.json()
     assert "total" in response.json()
+
+
+def test_add_products_to_receipt_in_batch(
+    test_app: TestClient, receipt_id: str, product_id: str
+) -> None:
+    """Test adding several products to a receipt in one request"""
+    response = test_app.post(
+        f"/receipts/{receipt_id}/products/batch",
+        json={
+            "products": [
+                {"product_id": product_id, "quantity": 2},
+                {"product_id": product_id, "quantity": 1},
+            ]
+        },
+    )
+    assert response.status_code == 201
+    receipt = response.json()["receipt"]
+    assert [line["quantity"] for line in receipt["products"]] == [3]
+    assert receipt["total_in_GEL"] == sum(
+        line["total_in_GEL"] for line in receipt["products"]
+    )
+
+
+def test_add_products_in_batch_with_unknown_product(
+    test_app: TestClient, receipt_id: str, product_id: str
+) -> None:
+    """Should add nothing when any product in the batch does not exist"""
+    response = test_app.post(
+        f"/receipts/{receipt_id}/products/batch",
+        json={
+            "products": [
+                {"product_id": product_id, "quantity": 1},
+                {"product_id": "missing", "quantity": 1},
+            ]
+        },
+    )
+    assert response.status_code == 404
+    receipt = test_app.get(f"/receipts/{receipt_id}").json()["receipt"]
+    assert receipt["products"] == []
@@ -1,4 +1,6 @@
+import json
 import os
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from fastapi.testclient import TestClient
@@ -42,6 +44,48 @@ def test_get_x_reports_non_existent_shift(test_app: TestClient) -> None:
     assert response.json()["detail"] == "Shift not found."
 
 
+def test_get_z_report_of_closed_shift(test_app: TestClient) -> None:
+    """Test that closing a shift archives its final report"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+    product = test_app.post(
+        "/products", json={"name": "Milk", "barcode": "123456", "price": 100}
+    ).json()["product"]
+    receipt = test_app.post(
+        "/receipts", json={"shift_id": shift_id, "currency": "GEL"}
+    ).json()["receipt"]
+    test_app.post(
+        f"/receipts/{receipt['id']}/products",
+        json={"product_id": product["id"], "quantity": 2},
+    )
+    test_app.post(f"/receipts/{receipt['id']}/payments")
+    test_app.post(f"/shifts/close-shift?shift_id={shift_id}")
+
+    response = test_app.get(f"/shifts/{shift_id}/z-report")
+
+    assert response.status_code == 200
+    z_report = response.json()["z_report"]
+    assert z_report["shift_id"] == shift_id
+    assert z_report["n_receipts"] == 1
+    assert z_report["products"] == [{"id": product["id"], "quantity": 2}]
+
+
+def test_get_z_report_of_open_shift(test_app: TestClient) -> None:
+    """Should return 400 when the shift has not been closed yet"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+
+    response = test_app.get(f"/shifts/{shift_id}/z-report")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Shift is open."
+
+
+def test_get_z_report_non_existent_shift(test_app: TestClient) -> None:
+    """Should return 404 when fetching Z report for a non-existent shift"""
+    response = test_app.get("/shifts/non-existent/z-report")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Shift not found."
+
+
 def test_close_shift(test_app: TestClient) -> None:
     """Test closing a shift"""
     response = test_app.post("/shifts")
@@ -82,4 +126,109 @@ def test_get_sales_report(test_app: TestClient) -> None:
     assert response.status_code == 200
     assert "total_receipts" in response.json()
     assert "total_revenue" in response.json()
-    assert isinstance(response.json()["closed_receipts"], list)
+    assert response.json()["closed_receipts"] is None
+
+
+def test_get_sales_report_lists_a_page_of_closed_receipts(
+    test_app: TestClient,
+) -> None:
+    """Test that closed receipts are listed only when a page is requested"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+    receipt_ids = []
+    for _ in range(3):
+        response = test_app.post(
+            "/receipts", json={"shift_id": shift_id, "currency": "GEL"}
+        )
+        receipt_ids.append(response.json()["receipt"]["id"])
+        test_app.post(f"/receipts/{receipt_ids[-1]}/payments")
+    receipt_ids.sort()
+
+    response = test_app.get(f"/shifts/sales?limit=2&after_receipt_id={receipt_ids[0]}")
+
+    assert response.status_code == 200
+    assert response.json()["total_receipts"] == 3
+    assert [r["receipt_id"] for r in response.json()["closed_receipts"]] == (
+        receipt_ids[1:]
+    )
+    assert response.json()["next_after_receipt_id"] == receipt_ids[2]
+
+
+def test_stream_closed_receipts_as_ndjson(test_app: TestClient) -> None:
+    """Test that every closed receipt is streamed as one JSON line"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+    receipt_ids = []
+    for _ in range(3):
+        response = test_app.post(
+            "/receipts", json={"shift_id": shift_id, "currency": "GEL"}
+        )
+        receipt_ids.append(response.json()["receipt"]["id"])
+        test_app.post(f"/receipts/{receipt_ids[-1]}/payments")
+    receipt_ids.sort()
+
+    response = test_app.get(f"/shifts/sales/receipts?after_receipt_id={receipt_ids[0]}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["receipt_id"] for line in lines] == receipt_ids[1:]
+    assert all("calculated_payment" in line for line in lines)
+
+
+def test_stream_closed_receipts_after_unknown_receipt(test_app: TestClient) -> None:
+    """Test that any id is a cursor, closed receipt or not"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+    receipt_id = test_app.post(
+        "/receipts", json={"shift_id": shift_id, "currency": "GEL"}
+    ).json()["receipt"]["id"]
+    test_app.post(f"/receipts/{receipt_id}/payments")
+
+    before = test_app.get("/shifts/sales/receipts?after_receipt_id=-")
+    after = test_app.get("/shifts/sales/receipts?after_receipt_id=~")
+
+    assert before.status_code == 200
+    assert [json.loads(line)["receipt_id"] for line in before.text.splitlines()] == [
+        receipt_id
+    ]
+    assert after.status_code == 200
+    assert after.text == ""
+
+
+def test_get_sales_report_rejects_invalid_page_size(test_app: TestClient) -> None:
+    """Should return 422 for a page size outside the allowed range"""
+    assert test_app.get("/shifts/sales?limit=0").status_code == 422
+
+
+def test_get_sales_timeseries(test_app: TestClient) -> None:
+    """Test that a paid receipt shows up in the bucket of the current hour"""
+    shift_id = test_app.post("/shifts").json()["shift"]["shift_id"]
+    receipt_id = test_app.post(
+        "/receipts", json={"shift_id": shift_id, "currency": "GEL"}
+    ).json()["receipt"]["id"]
+    test_app.post(f"/receipts/{receipt_id}/payments")
+    now = datetime.now(timezone.utc)
+
+    response = test_app.get(
+        "/shifts/sales/timeseries",
+        params={
+            "start": (now - timedelta(days=1)).isoformat(),
+            "end": (now + timedelta(days=1)).isoformat(),
+            "granularity": "day",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["granularity"] == "day"
+    buckets = response.json()["buckets"]
+    assert sum(bucket["n_receipts"] for bucket in buckets) == 1
+    assert all(bucket["bucket"].endswith("T00:00:00Z") for bucket in buckets)
+
+
+def test_get_sales_timeseries_rejects_unknown_granularity(
+    test_app: TestClient,
+) -> None:
+    """Should return 422 for a granularity other than hour or day"""
+    response = test_app.get(
+        "/shifts/sales/timeseries",
+        params={"start": "2026-01-01", "end": "2026-02-01", "granularity": "week"},
+    )
+    assert response.status_code == 422
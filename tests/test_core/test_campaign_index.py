@@ -0,0 +1,92 @@
+from app.core.classes.campaign_index import CampaignIndex
+from app.core.Interfaces.campaign_interface import (
+    BuyNGetN,
+    Campaign,
+    Combo,
+    Discount,
+    ReceiptDiscount,
+)
+from app.core.Interfaces.product_interface import Product
+from app.infra.in_memory_repositories.campaign_in_memory_repository import (
+    CampaignInMemoryRepository,
+)
+from app.infra.in_memory_repositories.product_in_memory_repository import (
+    ProductInMemoryRepository,
+)
+
+CAMPAIGNS = [
+    Campaign("d1", "discount", Discount(product_id="1", discount_percentage=10)),
+    Campaign(
+        "b1", "buy n get n", BuyNGetN(product_id="2", buy_quantity=2, get_quantity=1)
+    ),
+    Campaign("c1", "combo", Combo(products=["1", "3"], discount_percentage=20)),
+    Campaign(
+        "r1", "receipt discount", ReceiptDiscount(min_amount=5, discount_percentage=5)
+    ),
+    Campaign(
+        "r2", "receipt discount", ReceiptDiscount(min_amount=1, discount_percentage=3)
+    ),
+]
+
+
+def test_should_index_rules_by_product() -> None:
+    index = CampaignIndex.build(CAMPAIGNS)
+
+    assert [rule.campaign.campaign_id for rule in index.rules_for("1")] == [
+        "d1",
+        "c1",
+    ]
+    assert [rule.campaign.campaign_id for rule in index.rules_for("3")] == ["c1"]
+    assert index.rules_for("unknown") == ()
+
+
+def test_combo_rule_should_apply_only_when_all_members_are_present() -> None:
+    index = CampaignIndex.build(CAMPAIGNS)
+    combo_rule = index.rules_for("3")[0]
+    discount_rule = index.rules_for("1")[0]
+
+    assert not combo_rule.applies_to(index.products_mask(["3", "2"]))
+    assert combo_rule.applies_to(index.products_mask(["3", "2", "1"]))
+    assert discount_rule.applies_to(index.products_mask([]))
+
+
+def test_should_sort_receipt_discount_tiers_in_receipt_units() -> None:
+    index = CampaignIndex.build(CAMPAIGNS, min_amount_unit=100)
+
+    assert index.receipt_discount_thresholds == (100, 500)
+    assert index.receipt_discount_percentage(99) is None
+    assert index.receipt_discount_percentage(100) == 3
+    assert index.receipt_discount_percentage(700) == 5
+
+
+def test_should_pick_best_tier_reachable_by_amount() -> None:
+    tiers = [
+        Campaign(
+            f"r{min_amount}",
+            "receipt discount",
+            ReceiptDiscount(min_amount=min_amount, discount_percentage=percentage),
+        )
+        for min_amount, percentage in [(300, 10), (100, 15), (200, 5), (400, 12)]
+    ]
+    index = CampaignIndex.build(tiers)
+
+    assert index.receipt_discount_percentage(150) == 15
+    assert index.receipt_discount_percentage(350) == 15
+    assert index.receipt_discount_percentage(400) == 15
+    assert CampaignIndex.build(tiers[:1]).receipt_discount_percentage(400) == 10
+
+
+def test_repository_should_rebuild_index_only_when_catalog_changes() -> None:
+    products = ProductInMemoryRepository([Product("1", "lobio", 100, "123")])
+    repository = CampaignInMemoryRepository(products)
+
+    index = repository.index()
+    assert repository.index() is index
+
+    repository.create(CAMPAIGNS[0])
+    rebuilt = repository.index()
+    assert rebuilt is not index
+    assert len(rebuilt.rules_for("1")) == 1
+
+    repository.delete("d1")
+    assert repository.index().rules_for("1") == ()
@@ -0,0 +1,94 @@
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app.core.classes.exchange_rate_api_provider import (
+    ExchangeRateApiProvider,
+    create_session,
+)
+from app.core.classes.latency_histogram import LatencyHistogram
+
+
+@pytest.fixture
+def session() -> MagicMock:
+    response = MagicMock()
+    response.json.return_value = {
+        "result": "success",
+        "conversion_rates": {"GEL": 1, "USD": 0.37},
+    }
+    session = MagicMock()
+    session.get.return_value = response
+    return session
+
+
+def test_should_reuse_session_with_timeouts(session: MagicMock) -> None:
+    provider = ExchangeRateApiProvider(key="key", session=session, timeout=(1, 2))
+
+    provider.fetch_rates("GEL")
+    provider.fetch_rates("USD")
+
+    assert session.get.call_count == 2
+    session.get.assert_called_with(
+        "https://v6.exchangerate-api.com/v6/key/latest/USD", timeout=(1, 2)
+    )
+
+
+def test_should_record_fetch_latency(session: MagicMock) -> None:
+    provider = ExchangeRateApiProvider(key="key", session=session)
+
+    provider.fetch_rates("GEL")
+
+    assert provider.fetch_latency.count == 1
+
+
+def test_should_log_fetch_latency(
+    session: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    provider = ExchangeRateApiProvider(key="key", session=session)
+
+    with caplog.at_level(logging.INFO):
+        provider.fetch_rates("GEL")
+
+    assert "Fetched GEL rates in" in caplog.text
+    assert "over 1 fetches" in caplog.text
+    assert "'<=1ms'" in caplog.text
+
+
+def test_should_record_latency_of_failed_fetch(session: MagicMock) -> None:
+    session.get.side_effect = requests.ConnectionError
+    provider = ExchangeRateApiProvider(key="key", session=session)
+
+    with pytest.raises(requests.ConnectionError):
+        provider.fetch_rates("GEL")
+    assert provider.fetch_latency.count == 1
+
+
+def test_should_raise_on_error_result(session: MagicMock) -> None:
+    session.get.return_value.json.return_value = {
+        "result": "error",
+        "error-type": "invalid-key",
+    }
+    provider = ExchangeRateApiProvider(key="key", session=session)
+
+    with pytest.raises(ValueError, match="invalid-key"):
+        provider.fetch_rates("GEL")
+
+
+def test_session_should_retry_with_bounded_attempts() -> None:
+    adapter = create_session(max_retries=3).get_adapter("https://example.com")
+
+    assert adapter.max_retries.total == 3  # type: ignore[attr-defined]
+
+
+def test_histogram_should_bucket_latencies() -> None:
+    histogram = LatencyHistogram(buckets_ms=(10.0, 100.0))
+
+    histogram.observe(0.005)
+    histogram.observe(0.050)
+    histogram.observe(0.050)
+    histogram.observe(1.0)
+
+    assert histogram.snapshot() == {"<=10ms": 1, "<=100ms": 2, ">100ms": 1}
+    assert histogram.mean_ms() == pytest.approx(276.25)
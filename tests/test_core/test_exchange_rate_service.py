@@ -0,0 +1,193 @@
+import threading
+
+import pytest
+
+from app.core.classes.exchange_rate_service import ExchangeRateService
+from app.core.classes.fake_exchange_rate_provider import FakeExchangeRateProvider
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def provider() -> FakeExchangeRateProvider:
+    return FakeExchangeRateProvider()
+
+
+@pytest.fixture
+def service(
+    provider: FakeExchangeRateProvider, clock: FakeClock
+) -> ExchangeRateService:
+    return ExchangeRateService(
+        provider, ttl_seconds=60, refresh_ahead_seconds=10, clock=clock
+    )
+
+
+def test_should_serve_rates_from_cache_until_refresh_is_due(
+    service: ExchangeRateService,
+    provider: FakeExchangeRateProvider,
+    clock: FakeClock,
+) -> None:
+    assert service.get_exchange_rate("GEL", "USD") == 0.37
+    clock.now = 49
+    assert service.get_exchange_rate("GEL", "EUR") == 0.34
+    assert provider.calls == 1
+
+
+def test_short_ttl_should_refresh_once_per_window(
+    provider: FakeExchangeRateProvider, clock: FakeClock
+) -> None:
+    service = ExchangeRateService(provider, ttl_seconds=120, clock=clock)
+
+    for second in range(60):
+        clock.now = second
+        service.get_exchange_rate("GEL", "USD")
+
+    assert provider.calls == 1
+    assert service.refresh_ahead_seconds == 60
+
+
+def test_should_cache_rate_tables_per_base_currency(
+    service: ExchangeRateService, provider: FakeExchangeRateProvider
+) -> None:
+    provider.rates["USD"] = {"EUR": 0.92}
+    service.get_exchange_rate("GEL", "USD")
+    service.get_exchange_rate("USD", "EUR")
+    service.get_exchange_rate("GEL", "EUR")
+    assert provider.calls == 2
+
+
+def test_should_raise_for_unknown_target_currency(
+    service: ExchangeRateService,
+) -> None:
+    with pytest.raises(ValueError, match="Conversion rate for XYZ not found."):
+        service.get_exchange_rate("GEL", "XYZ")
+
+
+def test_should_raise_when_cold_fetch_fails(
+    service: ExchangeRateService, provider: FakeExchangeRateProvider
+) -> None:
+    provider.failing = True
+    with pytest.raises(ValueError, match="Error fetching exchange rate data"):
+        service.get_exchange_rate("GEL", "USD")
+
+
+def test_should_serve_stale_rates_while_refreshing(
+    service: ExchangeRateService,
+    provider: FakeExchangeRateProvider,
+    clock: FakeClock,
+) -> None:
+    service.get_exchange_rate("GEL", "USD")
+    provider.rates["GEL"]["USD"] = 0.40
+    clock.now = 120
+
+    assert service.get_exchange_rate("GEL", "USD") == 0.37
+    service.refresh_in_background("GEL").result()
+    assert service.get_exchange_rate("GEL", "USD") == 0.40
+
+
+def test_should_keep_last_good_rates_when_refresh_fails(
+    service: ExchangeRateService,
+    provider: FakeExchangeRateProvider,
+    clock: FakeClock,
+) -> None:
+    service.get_exchange_rate("GEL", "USD")
+    provider.failing = True
+    clock.now = 120
+
+    assert service.get_exchange_rate("GEL", "USD") == 0.37
+    assert service.refresh_in_background("GEL").result() is None
+    assert service.get_exchange_rate("GEL", "USD") == 0.37
+
+
+def test_should_not_wait_on_slow_provider_when_rates_are_cached(
+    service: ExchangeRateService,
+    provider: FakeExchangeRateProvider,
+    clock: FakeClock,
+) -> None:
+    service.get_exchange_rate("GEL", "USD")
+    provider.latency_seconds = 0.2
+    clock.now = 55
+
+    pending = service.refresh_in_background("GEL")
+    assert service.get_exchange_rate("GEL", "USD") == 0.37
+    assert not pending.done()
+    pending.result()
+
+
+def test_background_refresher_warms_and_renews_rates(
+    service: ExchangeRateService, provider: FakeExchangeRateProvider
+) -> None:
+    refreshed = threading.Event()
+    fetch_rates = provider.fetch_rates
+
+    def fetch_and_signal(base_currency: str) -> dict[str, float]:
+        rates = fetch_rates(base_currency)
+        refreshed.set()
+        return rates
+
+    provider.fetch_rates = fetch_and_signal  # type: ignore[method-assign]
+    service.start_background_refresh(["GEL"], interval_seconds=0.01)
+    try:
+        assert refreshed.wait(timeout=1)
+    finally:
+        service.stop_background_refresh()
+
+    assert service.get_exchange_rate("GEL", "EUR") == 0.34
+    assert provider.calls == 1
+
+
+def test_concurrent_cold_lookups_should_share_one_fetch(
+    service: ExchangeRateService, provider: FakeExchangeRateProvider
+) -> None:
+    provider.latency_seconds = 0.1
+    start = threading.Barrier(8)
+    rates: list[float] = []
+
+    def lookup() -> None:
+        start.wait()
+        rates.append(service.get_exchange_rate("GEL", "USD"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert rates == [0.37] * 8
+    assert provider.calls == 1
+
+
+def test_concurrent_cold_lookups_should_share_fetch_error(
+    service: ExchangeRateService, provider: FakeExchangeRateProvider
+) -> None:
+    provider.latency_seconds = 0.1
+    provider.failing = True
+    start = threading.Barrier(4)
+    errors: list[Exception] = []
+
+    def lookup() -> None:
+        start.wait()
+        try:
+            service.get_exchange_rate("GEL", "USD")
+        except ValueError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 4
+    assert provider.calls == 1
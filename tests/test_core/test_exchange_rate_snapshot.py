@@ -0,0 +1,69 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.classes.exchange_rate_api_provider import ExchangeRateApiProvider
+from app.core.classes.exchange_rate_service import ExchangeRateService
+from app.core.classes.exchange_rate_snapshot import (
+    SnapshotExchangeRateProvider,
+    load_rate_snapshot,
+    save_rates_to_snapshot,
+)
+
+
+@pytest.fixture(params=["rates.json", "rates.db"])
+def snapshot_path(request: pytest.FixtureRequest, tmp_path: Path) -> str:
+    return str(tmp_path / request.param)
+
+
+def test_should_round_trip_snapshot(snapshot_path: str) -> None:
+    save_rates_to_snapshot(snapshot_path, "GEL", {"USD": 0.37, "EUR": 0.34})
+    save_rates_to_snapshot(snapshot_path, "USD", {"EUR": 0.92})
+    save_rates_to_snapshot(snapshot_path, "GEL", {"USD": 0.38})
+
+    assert load_rate_snapshot(snapshot_path) == {
+        "GEL": {"USD": 0.38},
+        "USD": {"EUR": 0.92},
+    }
+
+
+def test_should_convert_from_snapshot_provider(snapshot_path: str) -> None:
+    save_rates_to_snapshot(snapshot_path, "GEL", {"USD": 0.37, "EUR": 0.34})
+    service = ExchangeRateService(SnapshotExchangeRateProvider(snapshot_path))
+
+    assert service.get_exchange_rate("GEL", "EUR") == 0.34
+
+
+def test_should_raise_for_base_currency_missing_from_snapshot(
+    snapshot_path: str,
+) -> None:
+    save_rates_to_snapshot(snapshot_path, "GEL", {"USD": 0.37})
+    provider = SnapshotExchangeRateProvider(snapshot_path)
+
+    with pytest.raises(ValueError, match="USD is not in snapshot"):
+        provider.fetch_rates("USD")
+
+
+def test_should_raise_for_missing_snapshot(snapshot_path: str) -> None:
+    with pytest.raises(FileNotFoundError, match="does not exist"):
+        SnapshotExchangeRateProvider(snapshot_path)
+
+    assert not Path(snapshot_path).exists()
+
+
+def test_live_provider_should_write_snapshot(snapshot_path: str) -> None:
+    response = MagicMock()
+    response.json.return_value = {
+        "result": "success",
+        "conversion_rates": {"GEL": 1, "USD": 0.37},
+    }
+    session = MagicMock()
+    session.get.return_value = response
+    provider = ExchangeRateApiProvider(
+        key="key", snapshot_path=snapshot_path, session=session
+    )
+
+    provider.fetch_rates("GEL")
+
+    assert load_rate_snapshot(snapshot_path) == {"GEL": {"GEL": 1.0, "USD": 0.37}}
@@ -143,3 +143,21 @@ class TestCampaignService(unittest.TestCase):
         assert (
             "111" in campaigns_products
         )  # Check if product_id exists in the dictionary
+
+    def test_read_campaign_by_id(self) -> None:
+        product_repo = ProductInMemoryRepository(
+            [Product("123", "sigareti", 10, "12345")]
+        )
+        repository = CampaignInMemoryRepository(product_repo)
+        campaign_service = CampaignService(repository)
+        campaign = campaign_service.create_campaign(
+            CampaignRequest(
+                type="discount",
+                discount=Discount(product_id="123", discount_percentage=10),
+            )
+        )
+
+        assert repository.read(campaign.campaign_id) == campaign
+        campaign_service.delete_campaign(campaign.campaign_id)
+        with pytest.raises(DoesntExistError):
+            repository.read(campaign.campaign_id)
@@ -69,3 +69,38 @@ def test_updaiting_non_existing_product() -> None:
     service = ProductService(ProductInMemoryRepository(product_list))
     with pytest.raises(DoesntExistError):
         service.update_product_price(Product("123", "lobio", 500, "123123"))
+
+
+def test_updated_barcode_is_free_for_new_products() -> None:
+    product_list: list[Product] = []
+    service = ProductService(ProductInMemoryRepository(product_list))
+    product = service.create_product(ProductRequest("lobio", 500, "123123"))
+
+    service.update_product_price(Product(product.id, product.name, 500, "999"))
+    service.create_product(ProductRequest("mchadi", 3, "123123"))
+
+    assert [p.barcode for p in product_list] == ["999", "123123"]
+    with pytest.raises(ExistsError):
+        service.create_product(ProductRequest("lobio", 500, "999"))
+
+
+def test_update_replaces_the_product_at_its_position() -> None:
+    product_list = [Product(str(i), f"p{i}", 100, f"b{i}") for i in range(3)]
+    repository = ProductInMemoryRepository(product_list)
+    repository.create(Product("3", "p3", 100, "b3"))
+
+    repository.update(Product("1", "p1", 250, "b1"))
+    repository.update(Product("3", "p3", 300, "b3"))
+
+    assert [p.price for p in product_list] == [100, 250, 100, 300]
+    assert repository.product_positions == {"0": 0, "1": 1, "2": 2, "3": 3}
+
+
+def test_update_to_taken_barcode() -> None:
+    repository = ProductInMemoryRepository()
+    repository.create(Product("1", "lobio", 500, "123"))
+    repository.create(Product("2", "mchadi", 3, "456"))
+
+    with pytest.raises(ExistsError):
+        repository.update(Product("2", "mchadi", 3, "123"))
+    assert repository.read("2").barcode == "456"
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime, timezone
 from typing import Tuple
 
 import pytest
@@ -106,6 +107,23 @@ def test_should_add_product_to_receipt(
     assert updated_receipt.total == 20.0
 
 
+def test_should_merge_repeated_product_into_one_line(
+    setup_receipt_service: Tuple[ReceiptService, str, list[Receipt]],
+) -> None:
+    service, shift_id, _ = setup_receipt_service
+    receipt = service.create_receipt(shift_id, currency="GEL")
+
+    service.add_product(receipt.id, AddProductRequest(product_id="123", quantity=2))
+    updated_receipt = service.add_product(
+        receipt.id, AddProductRequest(product_id="123", quantity=1)
+    )
+
+    assert len(updated_receipt.products) == 1
+    assert updated_receipt.products[0].quantity == 3
+    assert updated_receipt.products[0].total == 30.0
+    assert updated_receipt.total == 30.0
+
+
 def test_should_raise_error_when_reading_nonexistent_receipt(
     setup_receipt_service: Tuple[ReceiptService, str, list[Receipt]],
 ) -> None:
@@ -632,3 +650,91 @@ def test_calculate_payment_best_campaign_type_selected() -> None:
 
     # Expecting the best discount (Buy 2 Get 1 Free → 133 per unit * 3 = 400)
     assert receipt_payment.discounted_price == 400
+
+
+def test_calculate_payment_applies_best_receipt_discount_tier() -> None:
+    product_repo = ProductInMemoryRepository(
+        [Product(id="1", name="Product 1", price=100, barcode="12345")]
+    )
+    campaigns = [
+        Campaign(
+            campaign_id="small",
+            type="receipt discount",
+            data=ReceiptDiscount(min_amount=100, discount_percentage=5),
+        ),
+        Campaign(
+            campaign_id="large",
+            type="receipt discount",
+            data=ReceiptDiscount(min_amount=300, discount_percentage=20),
+        ),
+        Campaign(
+            campaign_id="unreachable",
+            type="receipt discount",
+            data=ReceiptDiscount(min_amount=1000, discount_percentage=50),
+        ),
+    ]
+    campaign_repo = CampaignInMemoryRepository(product_repo, {}, campaigns)
+    shift_repo = ShiftInMemoryRepository([Shift("1", [], "open")])
+    receipt_repo = ReceiptInMemoryRepository(
+        [], product_repo, shift_repo, campaign_repo
+    )
+    receipt_repo.create(Receipt("1", "1", "GEL", [], "open", 0, 0))
+
+    receipt_repo.add_product_to_receipt("1", AddProductRequest("1", 4))
+
+    assert receipt_repo.calculate_payment("1").discounted_price == 320
+
+
+def test_paid_receipts_are_rolled_up_by_hour() -> None:
+    now = datetime(2026, 10, 17, 9, 45, tzinfo=timezone.utc)
+    shifts = ShiftInMemoryRepository([Shift("1", [], "open")])
+    receipt_repo = ReceiptInMemoryRepository(
+        [],
+        ProductInMemoryRepository([Product("p1", "Milk", 100, "12345")]),
+        shifts,
+        clock=lambda: now,
+    )
+    service = ReceiptService(receipt_repo)
+    for _ in range(2):
+        receipt = service.create_receipt("1", "GEL")
+        service.add_product(receipt.id, AddProductRequest("p1", 2))
+        service.add_payment(receipt.id)
+        now = now.replace(hour=11)
+
+    hourly = shifts.get_sales_timeseries(
+        datetime(2026, 10, 17, 9), datetime(2026, 10, 18)
+    )
+    daily = shifts.get_sales_timeseries(
+        datetime(2026, 10, 17, 9), datetime(2026, 10, 18), "day"
+    )
+
+    assert service.read_receipt(receipt.id).closed_at == "2026-10-17T11:45:00+00:00"
+    assert [b.bucket for b in hourly] == [
+        "2026-10-17T09:00:00Z",
+        "2026-10-17T11:00:00Z",
+    ]
+    assert hourly[0].revenue == {"GEL": 200}
+    assert len(daily) == 1
+    assert daily[0].bucket == "2026-10-17T00:00:00Z"
+    assert daily[0].n_receipts == 2
+    assert daily[0].products == [{"id": "p1", "quantity": 4, "total": 400}]
+
+
+def test_sales_timeseries_includes_the_bucket_holding_end() -> None:
+    now = datetime(2026, 10, 17, 9, 45, tzinfo=timezone.utc)
+    shifts = ShiftInMemoryRepository([Shift("1", [], "open")])
+    service = ReceiptService(
+        ReceiptInMemoryRepository(
+            [],
+            ProductInMemoryRepository([Product("p1", "Milk", 100, "12345")]),
+            shifts,
+            clock=lambda: now,
+        )
+    )
+    receipt = service.create_receipt("1", "GEL")
+    service.add_product(receipt.id, AddProductRequest("p1", 1))
+    service.add_payment(receipt.id)
+
+    assert [b.n_receipts for b in shifts.get_sales_timeseries(now, now)] == [1]
+    assert [b.n_receipts for b in shifts.get_sales_timeseries(now, now, "day")] == [1]
+    assert shifts.get_sales_timeseries(now.replace(hour=7), now.replace(hour=8)) == []
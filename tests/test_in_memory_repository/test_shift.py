@@ -1,8 +1,11 @@
 import uuid
 
+import pytest
+
 from app.core.classes.shift_service import ShiftService
 from app.core.Interfaces.receipt_interface import Receipt, ReceiptProduct
 from app.core.Interfaces.shift_interface import Shift
+from app.infra.in_memory_repositories import shift_in_memory_repository
 from app.infra.in_memory_repositories.shift_in_memory_repository import (
     ShiftInMemoryRepository,
 )
@@ -141,14 +144,16 @@ def test_should_generate_lifetime_sales_report() -> None:
     )
     service.add_receipt_to_shift(receipt2)
 
-    report = service.get_lifetime_sales_report()
+    report = service.get_lifetime_sales_report(limit=10)
 
     assert report.total_receipts == 2
     assert report.total_revenue["gel"] == 50
     assert report.total_revenue["usd"] == 90
     assert len(report.closed_receipts) == 2
-    assert report.closed_receipts[0].calculated_payment == 50
-    assert report.closed_receipts[1].calculated_payment == 90
+    # listed in receipt id order
+    payments = {r.receipt_id: r.calculated_payment for r in report.closed_receipts}
+    assert [r.receipt_id for r in report.closed_receipts] == sorted(payments)
+    assert payments == {receipt1.id: 50, receipt2.id: 90}
 
 
 def test_should_generate_empty_lifetime_sales_report_for_no_closed_receipts() -> None:
@@ -173,3 +178,199 @@ def test_should_generate_empty_lifetime_sales_report_for_no_closed_receipts() ->
     assert report.total_receipts == 0
     assert len(report.total_revenue) == 0
     assert len(report.closed_receipts) == 0
+
+
+def test_should_replace_receipt_already_in_shift() -> None:
+    shift_list: list[Shift] = []
+    service = ShiftService(ShiftInMemoryRepository(shift_list))
+    shift = service.create_shift()
+    receipts = [
+        Receipt(
+            id=str(uuid.uuid4()),
+            shift_id=shift.shift_id,
+            currency="gel",
+            products=[],
+            status="open",
+            total=0,
+            discounted_total=0,
+        )
+        for _ in range(2)
+    ]
+    for receipt in receipts:
+        service.add_receipt_to_shift(receipt)
+
+    receipts[0].status = "closed"
+    service.add_receipt_to_shift(receipts[0])
+
+    assert [r.id for r in shift_list[0].receipts] == [r.id for r in receipts]
+    assert shift_list[0].receipts[0].status == "closed"
+
+
+def test_shift_keeps_its_own_copy_of_receipt() -> None:
+    shift_list: list[Shift] = []
+    service = ShiftService(ShiftInMemoryRepository(shift_list))
+    shift = service.create_shift()
+    product = ReceiptProduct(id=str(uuid.uuid4()), quantity=1, price=100, total=100)
+    receipt = Receipt(
+        id=str(uuid.uuid4()),
+        shift_id=shift.shift_id,
+        currency="gel",
+        products=[product],
+        status="open",
+        total=100,
+        discounted_total=0,
+    )
+    service.add_receipt_to_shift(receipt)
+
+    receipt.products.append(product)
+    receipt.status = "closed"
+
+    assert shift_list[0].receipts[0].products == [product]
+    assert shift_list[0].receipts[0].status == "open"
+
+
+def test_x_report_counts_closed_receipt_once_and_keeps_its_header() -> None:
+    shift_list: list[Shift] = []
+    service = ShiftService(ShiftInMemoryRepository(shift_list))
+    shift = service.create_shift()
+    receipt = Receipt(
+        id=str(uuid.uuid4()),
+        shift_id=shift.shift_id,
+        currency="gel",
+        products=[
+            ReceiptProduct(id="p1", quantity=2, price=50, total=100),
+            ReceiptProduct(id="p2", quantity=1, price=30, total=30),
+        ],
+        status="closed",
+        total=130,
+        discounted_total=120,
+    )
+
+    service.add_receipt_to_shift(receipt)
+    service.add_receipt_to_shift(receipt)
+    report = service.get_x_report(shift.shift_id)
+
+    assert report.n_receipts == 1
+    assert report.revenue == {"gel": 120}
+    assert report.products == [
+        {"id": "p1", "quantity": 2},
+        {"id": "p2", "quantity": 1},
+    ]
+    assert shift_list[0].receipts[0].id == receipt.id
+    assert shift_list[0].receipts[0].products == []
+
+
+def test_reports_include_receipts_closed_before_repository_start() -> None:
+    receipt = Receipt(
+        id="r1",
+        shift_id="s1",
+        currency="usd",
+        products=[ReceiptProduct(id="p1", quantity=3, price=30, total=90)],
+        status="closed",
+        total=90,
+        discounted_total=90,
+    )
+    service = ShiftService(ShiftInMemoryRepository([Shift("s1", [receipt], "open")]))
+
+    assert service.get_x_report("s1").products == [{"id": "p1", "quantity": 3}]
+    sales = service.get_lifetime_sales_report(limit=10)
+    assert sales.total_revenue == {"usd": 90}
+    assert [r.receipt_id for r in sales.closed_receipts] == ["r1"]
+
+
+def test_closed_receipts_are_paged_after_a_receipt_id() -> None:
+    receipts = [
+        Receipt(f"r{i}", f"s{i % 2}", "usd", [], "closed", 10, 10) for i in range(5)
+    ]
+    service = ShiftService(
+        ShiftInMemoryRepository(
+            [
+                Shift("s0", [r for r in receipts if r.shift_id == "s0"], "open"),
+                Shift("s1", [r for r in receipts if r.shift_id == "s1"], "open"),
+            ]
+        )
+    )
+
+    everything = [r.receipt_id for r in service.iter_closed_receipts()]
+    page = service.get_lifetime_sales_report(limit=2, after_receipt_id="r1")
+
+    # id order across shifts, as in SQL, and any id works as a cursor
+    assert everything == ["r0", "r1", "r2", "r3", "r4"]
+    assert [r.receipt_id for r in page.closed_receipts] == ["r2", "r3"]
+    assert [r.receipt_id for r in service.iter_closed_receipts("r25")] == ["r3", "r4"]
+
+
+def test_closed_receipts_stream_across_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(shift_in_memory_repository, "STREAM_PAGE_SIZE", 2)
+    repository = ShiftInMemoryRepository([Shift("s0", [], "open")])
+    for i in (3, 1, 4, 0, 2):
+        repository.add_receipt_to_shift(
+            Receipt(f"r{i}", "s0", "usd", [], "closed", i, i)
+        )
+
+    receipts = repository.iter_closed_receipts()
+    first = next(receipts)
+    repository.add_receipt_to_shift(Receipt("r5", "s0", "usd", [], "closed", 5, 5))
+
+    assert first.receipt_id == "r0"
+    assert [r.receipt_id for r in receipts] == ["r1", "r2", "r3", "r4", "r5"]
+
+
+def test_z_report_is_taken_when_the_shift_closes() -> None:
+    shift_list: list[Shift] = []
+    repository = ShiftInMemoryRepository(shift_list)
+    service = ShiftService(repository)
+    shift = service.create_shift()
+    service.add_receipt_to_shift(
+        Receipt(
+            "r1",
+            shift.shift_id,
+            "usd",
+            [ReceiptProduct(id="p1", quantity=2, price=30, total=60)],
+            "closed",
+            60,
+            60,
+        )
+    )
+    service.close_shift(shift.shift_id)
+    repository.add_receipt_to_shift(
+        Receipt("r2", shift.shift_id, "usd", [], "closed", 40, 40)
+    )
+
+    report = service.get_z_report(shift.shift_id)
+    report.revenue["usd"] = 0
+
+    assert service.get_z_report(shift.shift_id).revenue == {"usd": 60}
+    assert report.n_receipts == 1
+    assert report.products == [{"id": "p1", "quantity": 2}]
+    with pytest.raises(ValueError):
+        service.get_z_report(service.create_shift().shift_id)
+
+
+def test_x_report_folds_receipts_closed_between_polls() -> None:
+    repository = ShiftInMemoryRepository()
+    service = ShiftService(repository)
+    shift = service.create_shift()
+
+    def close(receipt_id: str, currency: str, product_id: str) -> None:
+        line = ReceiptProduct(id=product_id, quantity=1, price=10, total=10)
+        service.add_receipt_to_shift(
+            Receipt(receipt_id, shift.shift_id, currency, [line], "closed", 10, 10)
+        )
+
+    close("r1", "gel", "p1")
+    first = service.get_x_report(shift.shift_id)
+    close("r2", "usd", "p2")
+    close("r3", "gel", "p1")
+    second = service.get_x_report(shift.shift_id)
+
+    assert first.revenue == {"gel": 10}
+    assert second.n_receipts == 3
+    assert second.revenue == {"gel": 20, "usd": 10}
+    assert second.products == [
+        {"id": "p1", "quantity": 2},
+        {"id": "p2", "quantity": 1},
+    ]
+    ledger = repository.closed_receipts[shift.shift_id]
+    assert list(ledger.line_quantities) == [1, 1, 1]
+    assert list(ledger.line_totals) == [10, 10, 10]
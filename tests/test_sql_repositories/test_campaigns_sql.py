@@ -6,28 +6,38 @@ import pytest
 from app.core.classes.errors import DoesntExistError
 from app.core.Interfaces.campaign_interface import BuyNGetN, Campaign, Combo, Discount
 from app.core.Interfaces.product_interface import Product
+from app.infra.migrations import migrate
 from app.infra.sql_repositories.campaign_sql_repository import CampaignSQLRepository
 from app.infra.sql_repositories.product_sql_repository import ProductSQLRepository
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 
 @pytest.fixture
 def connection() -> sqlite3.Connection:
     """Creates a fresh in-memory SQLite connection for each test."""
-    return sqlite3.connect(":memory:", check_same_thread=False)
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    return connection
 
 
 @pytest.fixture
-def products_repo(connection: sqlite3.Connection) -> ProductSQLRepository:
+def pool(connection: sqlite3.Connection) -> SqliteConnectionPool:
+    """Shares the test connection with every repository."""
+    return SqliteConnectionPool.single(connection)
+
+
+@pytest.fixture
+def products_repo(pool: SqliteConnectionPool) -> ProductSQLRepository:
     """Creates a ProductSQLRepository for testing campaigns."""
-    return ProductSQLRepository(connection)
+    return ProductSQLRepository(pool)
 
 
 @pytest.fixture
 def campaigns_repo(
-    connection: sqlite3.Connection, products_repo: ProductSQLRepository
+    pool: SqliteConnectionPool, products_repo: ProductSQLRepository
 ) -> CampaignSQLRepository:
     """Creates a CampaignSQLRepository with product repository."""
-    return CampaignSQLRepository(connection, products_repo)
+    return CampaignSQLRepository(pool, products_repo)
 
 
 @pytest.fixture
@@ -123,3 +133,59 @@ def test_delete_non_existent_campaign(campaigns_repo: CampaignSQLRepository) ->
     """Tests that deleting a non-existent campaign raises DoesntExistError."""
     with pytest.raises(DoesntExistError):
         campaigns_repo.delete(str(uuid.uuid4()))
+
+
+def test_read_campaign_by_id(
+    connection: sqlite3.Connection,
+    campaigns_repo: CampaignSQLRepository,
+    sample_product: Product,
+) -> None:
+    """Tests reading one campaign and serving repeat reads from memory."""
+    campaign = Campaign(
+        campaign_id=str(uuid.uuid4()),
+        type="discount",
+        data=Discount(product_id=sample_product.id, discount_percentage=10),
+    )
+    campaigns_repo.create(campaign)
+
+    assert campaigns_repo.read(campaign.campaign_id) == campaign
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    campaigns_repo.read(campaign.campaign_id)
+    connection.set_trace_callback(None)
+    assert statements == ["SELECT version FROM campaign_catalog WHERE id = 1"]
+
+
+def test_index_sees_campaigns_written_elsewhere(
+    connection: sqlite3.Connection,
+    campaigns_repo: CampaignSQLRepository,
+) -> None:
+    """Tests that a catalog change from another writer rebuilds the index."""
+    assert campaigns_repo.index().receipt_discount_percentage(5000) is None
+
+    with connection:
+        connection.execute(
+            "INSERT INTO campaigns (id, type, discount_percentage, min_amount) "
+            "VALUES ('c1', 'receipt discount', 10, 20)"
+        )
+
+    assert campaigns_repo.index().receipt_discount_percentage(5000) == 10
+    assert campaigns_repo.read("c1").type == "receipt discount"
+
+
+def test_read_deleted_campaign(
+    campaigns_repo: CampaignSQLRepository, sample_product: Product
+) -> None:
+    """Tests that a deleted campaign is no longer served from memory."""
+    campaign = Campaign(
+        campaign_id=str(uuid.uuid4()),
+        type="discount",
+        data=Discount(product_id=sample_product.id, discount_percentage=10),
+    )
+    campaigns_repo.create(campaign)
+    campaigns_repo.read(campaign.campaign_id)
+    campaigns_repo.delete(campaign.campaign_id)
+
+    with pytest.raises(DoesntExistError):
+        campaigns_repo.read(campaign.campaign_id)
@@ -4,14 +4,17 @@ import pytest
 
 from app.core.classes.errors import DoesntExistError, ExistsError
 from app.core.Interfaces.product_interface import Product
+from app.infra.migrations import migrate
 from app.infra.sql_repositories.product_sql_repository import ProductSQLRepository
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 
 @pytest.fixture
 def repo() -> ProductSQLRepository:
     """Creates a new SQLite in-memory database for each test."""
     connection = sqlite3.connect(":memory:", check_same_thread=False)
-    return ProductSQLRepository(connection)
+    migrate(connection)
+    return ProductSQLRepository(SqliteConnectionPool.single(connection))
 
 
 def test_add_and_get_product(repo: ProductSQLRepository) -> None:
@@ -55,6 +58,26 @@ def test_update_product(repo: ProductSQLRepository) -> None:
     assert retrieved.price == 200
 
 
+def test_update_product_keeps_row_in_place(repo: ProductSQLRepository) -> None:
+    """Tests that an update rewrites the product row instead of re-inserting it."""
+    repo.create(Product(id="1", name="Apple", barcode="12345", price=100))
+    repo.create(Product(id="2", name="Banana", barcode="67890", price=50))
+
+    repo.update(Product(id="1", name="Apple", barcode="12345", price=200))
+
+    assert [product.id for product in repo.read_all()] == ["1", "2"]
+
+
+def test_update_product_to_taken_barcode(repo: ProductSQLRepository) -> None:
+    """Tests that moving a product onto another's barcode raises ExistsError."""
+    repo.create(Product(id="1", name="Apple", barcode="12345", price=100))
+    repo.create(Product(id="2", name="Banana", barcode="67890", price=50))
+
+    with pytest.raises(ExistsError):
+        repo.update(Product(id="2", name="Banana", barcode="12345", price=50))
+    assert repo.read("2").barcode == "67890"
+
+
 def test_update_non_existent_product(repo: ProductSQLRepository) -> None:
     """Tests that updating a non-existent product raises DoesntExistError."""
     product = Product(id="999", name="Orange", barcode="67890", price=150)
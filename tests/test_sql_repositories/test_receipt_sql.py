@@ -1,4 +1,8 @@
 import sqlite3
+from contextlib import closing
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
@@ -20,39 +24,47 @@ from app.core.Interfaces.receipt_interface import (
 )
 from app.core.Interfaces.shift_interface import Shift
 from app.core.Interfaces.shift_repository_interface import ShiftRepositoryInterface
+from app.infra.sql_repositories import receipt_sql_repository
 from app.infra.sql_repositories.campaign_sql_repository import CampaignSQLRepository
 from app.infra.sql_repositories.product_sql_repository import ProductSQLRepository
 from app.infra.sql_repositories.receipt_sql_repository import ReceiptSQLRepository
 from app.infra.sql_repositories.shift_sql_repository import ShiftSQLRepository
 from app.infra.sqlite import Sqlite
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 
 @pytest.fixture(scope="function")
 def connection() -> sqlite3.Connection:
     """Creates a new SQLite in-memory database for each test."""
-    connect = sqlite3.connect(":memory:", check_same_thread=False)
-    Sqlite(connect)
-    return connect
+    return sqlite3.connect(":memory:", check_same_thread=False)
 
 
 @pytest.fixture(scope="function")
-def product_repo(connection: sqlite3.Connection) -> ProductSQLRepository:
+def pool(connection: sqlite3.Connection) -> SqliteConnectionPool:
+    """Shares the test connection with every repository."""
+    pool = SqliteConnectionPool.single(connection)
+    Sqlite(pool)
+    return pool
+
+
+@pytest.fixture(scope="function")
+def product_repo(pool: SqliteConnectionPool) -> ProductSQLRepository:
     """Creates a product repository."""
-    return ProductSQLRepository(connection)
+    return ProductSQLRepository(pool)
 
 
 @pytest.fixture(scope="function")
-def shift_repo(connection: sqlite3.Connection) -> ShiftRepositoryInterface:
+def shift_repo(pool: SqliteConnectionPool) -> ShiftRepositoryInterface:
     """Creates a shift repository."""
-    return ShiftSQLRepository(connection)
+    return ShiftSQLRepository(pool)
 
 
 @pytest.fixture(scope="function")
 def campaign_repo(
-    connection: sqlite3.Connection, product_repo: ProductSQLRepository
+    pool: SqliteConnectionPool, product_repo: ProductSQLRepository
 ) -> CampaignSQLRepository:
     """Creates a campaign repository."""
-    return CampaignSQLRepository(connection, product_repo)
+    return CampaignSQLRepository(pool, product_repo)
 
 
 @pytest.fixture(scope="function")
@@ -65,7 +77,7 @@ def exchange_rate_service() -> ExchangeRateService:
 
 @pytest.fixture(scope="function")
 def repo(
-    connection: sqlite3.Connection,
+    pool: SqliteConnectionPool,
     product_repo: ProductSQLRepository,
     shift_repo: ShiftRepositoryInterface,
     campaign_repo: CampaignSQLRepository,
@@ -73,7 +85,7 @@ def repo(
 ) -> ReceiptSQLRepository:
     """Creates a receipt repository with all dependencies."""
     return ReceiptSQLRepository(
-        connection, product_repo, shift_repo, campaign_repo, exchange_rate_service
+        pool, product_repo, shift_repo, campaign_repo, exchange_rate_service
     )
 
 
@@ -264,6 +276,27 @@ def test_create_receipt_with_products(
     assert retrieved.products[1].total == 200
 
 
+def test_create_receipt_merges_repeated_products(
+    repo: ReceiptSQLRepository, sample_receipt: Receipt, sample_products: list[Product]
+) -> None:
+    """Tests that a product listed twice is stored as one line."""
+    sample_receipt.products = [
+        ReceiptProduct(id="p1", quantity=2, price=100, total=200),
+        ReceiptProduct(id="p2", quantity=1, price=200, total=200),
+        ReceiptProduct(id="p1", quantity=3, price=100, total=300),
+    ]
+    sample_receipt.total = 700
+
+    created = repo.create(sample_receipt)
+
+    expected = [
+        ReceiptProduct(id="p1", quantity=5, price=100, total=500),
+        ReceiptProduct(id="p2", quantity=1, price=200, total=200),
+    ]
+    assert created.products == expected
+    assert repo.read(created.id).products == expected
+
+
 def test_create_receipt_closed_shift(
     repo: ReceiptSQLRepository, sample_closed_shift: Shift
 ) -> None:
@@ -324,6 +357,62 @@ def test_update_receipt(
     assert retrieved.products[0].quantity == 3
 
 
+def test_update_receipt_writes_only_what_changed(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    product_repo: ProductSQLRepository,
+    sample_receipt: Receipt,
+) -> None:
+    """Tests that closing a 100-line receipt through update skips its lines."""
+    lines = []
+    for i in range(100):
+        product_repo.create(Product(id=f"p{i}", name=f"P{i}", barcode=f"{i}", price=1))
+        lines.append(ReceiptProduct(id=f"p{i}", quantity=1, price=1, total=1))
+    created = repo.create(replace(sample_receipt, products=lines, total=100))
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    repo.update(replace(created, status="closed"))
+    connection.set_trace_callback(None)
+
+    # trigger steps are traced with the text of the statement that fired them
+    writes = {s for s in statements if s.startswith(("INSERT", "UPDATE", "DELETE"))}
+    assert writes == {"UPDATE receipts SET status = 'closed' WHERE id = 'r1'"}
+    assert repo.read(created.id) == replace(created, status="closed")
+
+
+def test_update_receipt_changes_removes_and_adds_lines(
+    repo: ReceiptSQLRepository,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that update rewrites changed lines and drops missing ones."""
+    created = repo.create(
+        replace(
+            sample_receipt,
+            products=[
+                ReceiptProduct(id="p1", quantity=1, price=100, total=100),
+                ReceiptProduct(id="p2", quantity=1, price=200, total=200),
+            ],
+        )
+    )
+
+    repo.update(
+        replace(
+            created,
+            products=[
+                ReceiptProduct(id="p1", quantity=4, price=100, total=400),
+                ReceiptProduct(id="p3", quantity=1, price=300, total=300),
+            ],
+        )
+    )
+
+    assert repo.read(created.id).products == [
+        ReceiptProduct(id="p1", quantity=4, price=100, total=400),
+        ReceiptProduct(id="p3", quantity=1, price=300, total=300),
+    ]
+
+
 def test_delete_receipt(repo: ReceiptSQLRepository, sample_receipt: Receipt) -> None:
     """Tests deleting a receipt."""
     created = repo.create(sample_receipt)
@@ -385,6 +474,219 @@ def test_add_nonexistent_product_to_receipt(
     assert "does not exist" in str(exc.value)
 
 
+def test_add_product_to_closed_receipt(
+    repo: ReceiptSQLRepository, sample_receipt: Receipt, sample_products: list[Product]
+) -> None:
+    """Tests that a closed receipt rejects new lines and keeps its total."""
+    created = repo.create(sample_receipt)
+    repo.close_receipt(created.id)
+
+    with pytest.raises(AlreadyClosedError):
+        repo.add_product_to_receipt(
+            created.id, AddProductRequest(product_id=sample_products[0].id, quantity=1)
+        )
+
+    receipt = repo.read(created.id)
+    assert receipt.products == []
+    assert receipt.total == 0
+
+
+def test_add_product_is_one_transaction_without_reading_lines(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that a warm add-item commits once and never re-reads its lines."""
+    created = repo.create(sample_receipt)
+    for _ in range(50):
+        repo.add_product_to_receipt(
+            created.id, AddProductRequest(product_id=sample_products[0].id, quantity=1)
+        )
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    updated = repo.add_product_to_receipt(
+        created.id, AddProductRequest(product_id=sample_products[1].id, quantity=2)
+    )
+    connection.set_trace_callback(None)
+
+    assert updated.products == [
+        ReceiptProduct(id="p1", quantity=50, price=100, total=5000),
+        ReceiptProduct(id="p2", quantity=2, price=200, total=400),
+    ]
+    assert updated.total == 5400
+    assert updated == repo.read(created.id)
+    assert statements.count("COMMIT") == 1
+    assert not any(s.startswith("SELECT") for s in statements)
+
+
+def test_add_product_reloads_lines_added_elsewhere(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    product_repo: ProductSQLRepository,
+    shift_repo: ShiftRepositoryInterface,
+    campaign_repo: CampaignSQLRepository,
+    exchange_rate_service: ExchangeRateService,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that a stale working copy is refreshed from the database."""
+    other = ReceiptSQLRepository(
+        SqliteConnectionPool.single(connection),
+        product_repo,
+        shift_repo,
+        campaign_repo,
+        exchange_rate_service,
+    )
+    created = repo.create(sample_receipt)
+    repo.add_product_to_receipt(created.id, AddProductRequest("p1", 1))
+    other.add_product_to_receipt(created.id, AddProductRequest("p2", 1))
+
+    updated = repo.add_product_to_receipt(created.id, AddProductRequest("p3", 1))
+
+    assert [line.id for line in updated.products] == ["p1", "p2", "p3"]
+    assert updated.total == 600
+
+
+def test_add_product_reloads_free_lines_added_elsewhere(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    product_repo: ProductSQLRepository,
+    shift_repo: ShiftRepositoryInterface,
+    campaign_repo: CampaignSQLRepository,
+    exchange_rate_service: ExchangeRateService,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that a line which leaves the total unchanged is still seen."""
+    product_repo.create(Product(id="free", name="Bag", barcode="000", price=0))
+    other = ReceiptSQLRepository(
+        SqliteConnectionPool.single(connection),
+        product_repo,
+        shift_repo,
+        campaign_repo,
+        exchange_rate_service,
+    )
+    created = repo.create(sample_receipt)
+    repo.add_product_to_receipt(created.id, AddProductRequest("p1", 1))
+    other.add_product_to_receipt(created.id, AddProductRequest("free", 1))
+
+    updated = repo.add_product_to_receipt(created.id, AddProductRequest("p1", 1))
+
+    assert [line.id for line in updated.products] == ["p1", "free"]
+    assert updated == repo.read(created.id)
+
+
+def test_add_product_reloads_lines_committed_by_other_connections(
+    tmp_path: Path,
+) -> None:
+    """Tests that a commit from another connection drops the working copies."""
+    path = str(tmp_path / "pos.db")
+    pool = SqliteConnectionPool.open(path, readers=1)
+    database = Sqlite(pool)
+    database.products().create(Product(id="free", name="Bag", barcode="0", price=0))
+    database.shifts().create(Shift(shift_id="s1", receipts=[], status="open"))
+    repo = database.receipts()
+    created = repo.create(Receipt("r1", "s1", "GEL", [], "open", 0, 0))
+    repo.add_product_to_receipt(created.id, AddProductRequest("free", 1))
+
+    with closing(sqlite3.connect(path)) as other, other:
+        other.execute("UPDATE receipt_products SET quantity = 5")
+
+    updated = repo.add_product_to_receipt(created.id, AddProductRequest("free", 1))
+    pool.close()
+
+    assert updated.products == [ReceiptProduct("free", 6, 0, 0)]
+
+
+def test_add_product_after_payment_returns_stored_receipt(
+    repo: ReceiptSQLRepository,
+    sample_receipt_gel: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that paying a receipt drops its working copy."""
+    created = repo.create(sample_receipt_gel)
+    repo.add_product_to_receipt(created.id, AddProductRequest("p1", 1))
+    repo.add_payment(created.id)
+
+    updated = repo.add_product_to_receipt(created.id, AddProductRequest("p2", 1))
+
+    assert updated.discounted_total == 1.0
+    assert updated == repo.read(created.id)
+
+
+def test_open_receipt_cache_is_bounded(
+    monkeypatch: pytest.MonkeyPatch,
+    repo: ReceiptSQLRepository,
+    sample_shift: Shift,
+    sample_products: list[Product],
+) -> None:
+    """Tests that the least recently used working copies are evicted."""
+    monkeypatch.setattr(receipt_sql_repository, "OPEN_RECEIPT_CACHE_SIZE", 2)
+    for receipt_id in ("r1", "r2", "r3"):
+        repo.create(Receipt(receipt_id, "shift1", "GEL", [], "open", 0, 0))
+
+    updated = repo.add_product_to_receipt("r1", AddProductRequest("p1", 1))
+
+    assert list(repo._open_receipts) == ["r3", "r1"]
+    assert updated.products == [ReceiptProduct("p1", 1, 100, 100)]
+
+
+def test_add_products_to_receipt_in_one_transaction(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that a batch is priced with one query and committed once."""
+    created = repo.create(sample_receipt)
+    requests = [
+        AddProductRequest(product.id, quantity)
+        for quantity in range(1, 5)
+        for product in sample_products
+    ]
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    updated = repo.add_products_to_receipt(created.id, requests)
+    connection.set_trace_callback(None)
+
+    assert [line.quantity for line in updated.products] == [10, 10, 10]
+    assert updated.total == (1 + 2 + 3 + 4) * (100 + 200 + 300)
+    assert updated == repo.read(created.id)
+    assert sum("FROM products" in statement for statement in statements) == 1
+    assert statements.count("COMMIT") == 1
+
+
+def test_add_products_rejects_whole_batch_for_unknown_product(
+    repo: ReceiptSQLRepository, sample_receipt: Receipt, sample_products: list[Product]
+) -> None:
+    """Tests that a batch with an unknown product adds nothing."""
+    created = repo.create(sample_receipt)
+
+    with pytest.raises(DoesntExistError, match="Product with ID missing"):
+        repo.add_products_to_receipt(
+            created.id,
+            [AddProductRequest("p1", 1), AddProductRequest("missing", 1)],
+        )
+
+    receipt = repo.read(created.id)
+    assert receipt.products == []
+    assert receipt.total == 0
+
+
+def test_add_products_to_closed_receipt(
+    repo: ReceiptSQLRepository, sample_receipt: Receipt, sample_products: list[Product]
+) -> None:
+    """Tests that a closed receipt rejects a batch."""
+    created = repo.create(sample_receipt)
+    repo.close_receipt(created.id)
+
+    with pytest.raises(AlreadyClosedError):
+        repo.add_products_to_receipt(created.id, [AddProductRequest("p1", 1)])
+
+
 def test_calculate_payment_basic(
     repo: ReceiptSQLRepository, sample_receipt: Receipt, sample_products: list[Product]
 ) -> None:
@@ -482,6 +784,80 @@ def test_calculate_payment_with_combo_campaign(
     assert payment.reduced_price == 1.22
 
 
+def test_calculate_payment_with_incomplete_combo(
+    repo: ReceiptSQLRepository,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+    sample_campaigns: list[Campaign],
+) -> None:
+    """Tests that a combo is not applied when one of its products is missing."""
+    created = repo.create(sample_receipt)
+
+    repo.add_product_to_receipt(
+        created.id, AddProductRequest(product_id=sample_products[1].id, quantity=1)
+    )
+
+    payment = repo.calculate_payment(created.id)
+
+    assert payment.discounted_price == 4.5
+
+
+def test_calculate_payment_uses_constant_number_of_queries(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+    sample_campaigns: list[Campaign],
+) -> None:
+    """Tests that pricing does not issue queries per receipt line or campaign."""
+    created = repo.create(sample_receipt)
+    for _ in range(10):
+        for product in sample_products:
+            repo.add_product_to_receipt(
+                created.id, AddProductRequest(product_id=product.id, quantity=1)
+            )
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    repo.calculate_payment(created.id)
+    connection.set_trace_callback(None)
+
+    assert len(statements) <= 4
+
+
+def test_calculate_payment_reuses_campaign_index(
+    connection: sqlite3.Connection,
+    repo: ReceiptSQLRepository,
+    campaign_repo: CampaignSQLRepository,
+    sample_receipt_gel: Receipt,
+    sample_products: list[Product],
+    sample_campaigns: list[Campaign],
+) -> None:
+    """Tests that warm pricing only reads the receipt and picks up new campaigns."""
+    created = repo.create(sample_receipt_gel)
+    repo.add_product_to_receipt(
+        created.id, AddProductRequest(product_id=sample_products[2].id, quantity=1)
+    )
+    assert repo.calculate_payment(created.id).discounted_price == 2.7
+
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    repo.calculate_payment(created.id)
+    connection.set_trace_callback(None)
+    assert [s for s in statements if "campaign" in s] == [
+        "SELECT version FROM campaign_catalog WHERE id = 1"
+    ]
+
+    campaign_repo.create(
+        Campaign(
+            campaign_id="c5",
+            type="discount",
+            data=Discount(product_id=sample_products[2].id, discount_percentage=50),
+        )
+    )
+    assert repo.calculate_payment(created.id).discounted_price == 1.35
+
+
 def test_add_payment(
     repo: ReceiptSQLRepository,
     sample_receipt: Receipt,
@@ -507,6 +883,25 @@ def test_add_payment(
     assert updated.discounted_total == 4.05
 
 
+def test_add_payment_prices_lines_added_while_rates_load(
+    repo: ReceiptSQLRepository,
+    exchange_rate_service: MagicMock,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that the stored payment covers every line on the paid receipt."""
+    created = repo.create(sample_receipt)
+    repo.add_product_to_receipt(created.id, AddProductRequest("p1", 1))
+    exchange_rate_service.get_rate_table.side_effect = lambda base_currency: (
+        repo.add_product_to_receipt(created.id, AddProductRequest("p2", 1))
+    )
+
+    payment = repo.add_payment(created.id)
+
+    assert payment.discounted_price == 7.5
+    assert repo.read(created.id).discounted_total == 7.5
+
+
 def test_add_payment_nonexistent_receipt(repo: ReceiptSQLRepository) -> None:
     """Tests adding payment to a non-existent receipt."""
     with pytest.raises(DoesntExistError) as exc:
@@ -564,3 +959,120 @@ def test_read_receipt(
     assert retrieved.products[0].quantity == 2
     assert retrieved.products[0].price == 100
     assert retrieved.products[0].total == 200
+
+
+def test_close_receipt_writes_only_the_receipt_row(
+    repo: ReceiptSQLRepository,
+    connection: sqlite3.Connection,
+    sample_receipt: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that closing a receipt writes its status and shift totals only."""
+    repo.create(sample_receipt)
+    for _ in range(100):
+        repo.add_product_to_receipt(
+            sample_receipt.id, AddProductRequest(sample_products[0].id, 1)
+        )
+
+    changes = connection.total_changes
+    repo.close_receipt(sample_receipt.id)
+
+    # the receipt row, its shift's revenue and product rows, its sales total
+    # row, and its hour's revenue and product rows
+    assert connection.total_changes - changes == 6
+    receipt = repo.read(sample_receipt.id)
+    assert receipt.status == "closed"
+    assert receipt.products[0].quantity == 100
+
+
+def test_close_receipt_twice_raises(
+    repo: ReceiptSQLRepository, sample_receipt: Receipt
+) -> None:
+    """Tests that a closed receipt cannot be closed again."""
+    repo.create(sample_receipt)
+    repo.close_receipt(sample_receipt.id)
+
+    with pytest.raises(AlreadyClosedError):
+        repo.close_receipt(sample_receipt.id)
+
+
+def test_close_non_existent_receipt_raises(repo: ReceiptSQLRepository) -> None:
+    """Tests that closing an unknown receipt raises DoesntExistError."""
+    with pytest.raises(DoesntExistError):
+        repo.close_receipt("missing")
+
+
+def test_paid_receipts_are_rolled_up_by_hour(
+    pool: SqliteConnectionPool,
+    product_repo: ProductSQLRepository,
+    shift_repo: ShiftSQLRepository,
+    campaign_repo: CampaignSQLRepository,
+    exchange_rate_service: ExchangeRateService,
+    sample_shift: Shift,
+    sample_products: list[Product],
+) -> None:
+    """Tests that paying a receipt adds it to the bucket of its closing hour."""
+    now = datetime(2026, 10, 17, 9, 45, tzinfo=timezone.utc)
+    repo = ReceiptSQLRepository(
+        pool,
+        product_repo,
+        shift_repo,
+        campaign_repo,
+        exchange_rate_service,
+        clock=lambda: now,
+    )
+    for receipt_id, currency in (("r1", "GEL"), ("r2", "USD")):
+        repo.create(
+            Receipt(receipt_id, sample_shift.shift_id, currency, [], "open", 0, 0)
+        )
+        repo.add_product_to_receipt(receipt_id, AddProductRequest("p1", 2))
+        repo.close_receipt(receipt_id)
+        repo.add_payment(receipt_id)
+        now = now.replace(hour=11)
+
+    hourly = shift_repo.get_sales_timeseries(
+        datetime(2026, 10, 17, 9), datetime(2026, 10, 18)
+    )
+    daily = shift_repo.get_sales_timeseries(
+        datetime(2026, 10, 17, 9), datetime(2026, 10, 18), "day"
+    )
+
+    assert repo.read("r2").closed_at == "2026-10-17T11:45:00+00:00"
+    assert [b.bucket for b in hourly] == [
+        "2026-10-17T09:00:00Z",
+        "2026-10-17T11:00:00Z",
+    ]
+    assert hourly[0].revenue == {"GEL": 2}
+    assert hourly[1].revenue == {"USD": 5}
+    assert len(daily) == 1
+    assert daily[0].bucket == "2026-10-17T00:00:00Z"
+    assert daily[0].n_receipts == 2
+    assert daily[0].revenue == {"GEL": 2, "USD": 5}
+    # line totals are GEL tetri, so a product is one row whatever the currency
+    assert daily[0].products == [{"id": "p1", "quantity": 4, "total": 400}]
+
+
+def test_sales_timeseries_includes_the_bucket_holding_end(
+    repo: ReceiptSQLRepository,
+    shift_repo: ShiftSQLRepository,
+    sample_receipt_gel: Receipt,
+    sample_products: list[Product],
+) -> None:
+    """Tests that the current hour and day are part of a series ending now."""
+    repo.create(sample_receipt_gel)
+    repo.add_product_to_receipt(sample_receipt_gel.id, AddProductRequest("p1", 1))
+    repo.close_receipt(sample_receipt_gel.id)
+    repo.add_payment(sample_receipt_gel.id)
+    now = datetime.now(timezone.utc)
+
+    hourly = shift_repo.get_sales_timeseries(now, now)
+    daily = shift_repo.get_sales_timeseries(now, now, "day")
+
+    assert [b.n_receipts for b in hourly] == [1]
+    assert [b.n_receipts for b in daily] == [1]
+    assert (
+        shift_repo.get_sales_timeseries(
+            now - timedelta(hours=3), now - timedelta(hours=1)
+        )
+        == []
+    )
@@ -4,7 +4,10 @@ import pytest
 
 from app.core.classes.errors import DoesntExistError
 from app.core.Interfaces.shift_interface import Shift
+from app.infra.migrations import migrate
+from app.infra.sql_repositories import shift_sql_repository
 from app.infra.sql_repositories.shift_sql_repository import ShiftSQLRepository
+from app.infra.sqlite_pool import SqliteConnectionPool
 
 
 @pytest.fixture
@@ -12,29 +15,9 @@ def repo() -> ShiftSQLRepository:
     """Creates a new SQLite in-memory database for each test."""
     connection = sqlite3.connect(":memory:", check_same_thread=False)
 
-    # Create additional test tables needed for reports
-    cursor = connection.cursor()
-    cursor.executescript("""
-        CREATE TABLE IF NOT EXISTS receipts (
-            id TEXT PRIMARY KEY,
-            shift_id TEXT NOT NULL,
-            currency TEXT NOT NULL,
-            status TEXT NOT NULL,
-            total INTEGER NOT NULL,
-            discounted_total INTEGER NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS receipt_products (
-            receipt_id TEXT,
-            product_id TEXT,
-            quantity INTEGER,
-            price INTEGER,
-            total INTEGER
-        );
-    """)
-    connection.commit()
-
-    return ShiftSQLRepository(connection)
+    migrate(connection)
+
+    return ShiftSQLRepository(SqliteConnectionPool.single(connection))
 
 
 def test_create_shift(repo: ShiftSQLRepository) -> None:
@@ -63,6 +46,12 @@ def test_update_shift(repo: ShiftSQLRepository) -> None:
     assert retrieved.status == "closed"
 
 
+def test_update_non_existent_shift(repo: ShiftSQLRepository) -> None:
+    """Tests that closing an unknown shift raises DoesntExistError."""
+    with pytest.raises(DoesntExistError):
+        repo.update(Shift(shift_id="missing", receipts=[], status="closed"))
+
+
 def test_read_non_existent_shift(repo: ShiftSQLRepository) -> None:
     """Tests that retrieving a non-existent shift raises DoesntExistError."""
     with pytest.raises(DoesntExistError):
@@ -93,24 +82,22 @@ def test_get_x_report(repo: ShiftSQLRepository) -> None:
     repo.create(shift)
 
     # Add test data: receipts and products
-    cursor = repo.conn.cursor()
-
-    # Add receipts
-    cursor.executescript("""
-        INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
-        VALUES
-            ('receipt1', 'shift1',  'USD', 'closed', 100, 100),
-            ('receipt2', 'shift1',  'USD', 'closed', 150, 150),
-            ('receipt3', 'shift1',  'EUR', 'closed', 200, 200);
-
-        INSERT INTO receipt_products (receipt_id, product_id, quantity)
-        VALUES
-            ('receipt1', 'product1', 2),
-            ('receipt1', 'product2', 1),
-            ('receipt2', 'product1', 3),
-            ('receipt3', 'product3', 4);
-    """)
-    repo.conn.commit()
+    with repo.pool.writer() as connection:
+        # Add receipts
+        connection.executescript("""
+            INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
+            VALUES
+                ('receipt1', 'shift1',  'USD', 'closed', 100, 100),
+                ('receipt2', 'shift1',  'USD', 'closed', 150, 150),
+                ('receipt3', 'shift1',  'EUR', 'closed', 200, 200);
+
+            INSERT INTO receipt_products (receipt_id, product_id, quantity)
+            VALUES
+                ('receipt1', 'product1', 2),
+                ('receipt1', 'product2', 1),
+                ('receipt2', 'product1', 3),
+                ('receipt3', 'product3', 4);
+        """)
 
     # Get X report
     report = repo.get_x_report("shift1")
@@ -134,6 +121,36 @@ def test_get_x_report(repo: ShiftSQLRepository) -> None:
             assert product["quantity"] == 4
 
 
+def test_x_report_totals_follow_receipt_changes(repo: ShiftSQLRepository) -> None:
+    """Tests that running totals track payments, line edits and deletions."""
+    repo.create(Shift(shift_id="shift1", receipts=[], status="open"))
+
+    with repo.pool.writer() as connection:
+        connection.executescript("""
+            INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
+            VALUES
+                ('receipt1', 'shift1',  'USD', 'open', 100, 0),
+                ('receipt2', 'shift1',  'EUR', 'closed', 200, 200);
+
+            INSERT INTO receipt_products (receipt_id, product_id, quantity)
+            VALUES
+                ('receipt1', 'product1', 2),
+                ('receipt2', 'product2', 4);
+
+            UPDATE receipts SET status = 'closed' WHERE id = 'receipt1';
+            UPDATE receipts SET discounted_total = 90 WHERE id = 'receipt1';
+            UPDATE receipt_products SET quantity = 3 WHERE receipt_id = 'receipt1';
+            DELETE FROM receipt_products WHERE receipt_id = 'receipt2';
+            DELETE FROM receipts WHERE id = 'receipt2';
+        """)
+
+    report = repo.get_x_report("shift1")
+
+    assert report.n_receipts == 1
+    assert report.revenue == {"USD": 90}
+    assert report.products == [{"id": "product1", "quantity": 3}]
+
+
 def test_get_x_report_for_nonexistent_shift(repo: ShiftSQLRepository) -> None:
     """Tests that getting X report for a non-existent shift raises DoesntExistError."""
     with pytest.raises(DoesntExistError):
@@ -158,19 +175,18 @@ def test_get_lifetime_sales_report(repo: ShiftSQLRepository) -> None:
     repo.create(shift1)
     repo.create(shift2)
 
-    cursor = repo.conn.cursor()
-    cursor.executescript("""
-        INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
-        VALUES
-            ('receipt1', 'shift1',  'USD', 'closed', 100, 100),
-            ('receipt2', 'shift1',  'USD', 'closed', 150, 150),
-            ('receipt3', 'shift2',  'EUR', 'closed', 200, 200),
-            ('receipt4', 'shift2',  'USD', 'open', 75, 75);
+    with repo.pool.writer() as connection:
+        connection.executescript("""
+            INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
+            VALUES
+                ('receipt1', 'shift1',  'USD', 'closed', 100, 100),
+                ('receipt2', 'shift1',  'USD', 'closed', 150, 150),
+                ('receipt3', 'shift2',  'EUR', 'closed', 200, 200),
+                ('receipt4', 'shift2',  'USD', 'open', 75, 75);
 
-    """)
-    repo.conn.commit()
+        """)
 
-    report = repo.get_lifetime_sales_report()
+    report = repo.get_lifetime_sales_report(limit=10)
 
     # Verify report contents - should only count closed receipts
     assert report.total_receipts == 3  # Excludes the open receipt
@@ -185,3 +201,101 @@ def test_get_lifetime_sales_report(repo: ShiftSQLRepository) -> None:
     assert payment_map["receipt1"] == 100
     assert payment_map["receipt2"] == 150
     assert payment_map["receipt3"] == 200
+
+
+def test_lifetime_sales_report_pages_closed_receipts(repo: ShiftSQLRepository) -> None:
+    """Tests that totals stay current and receipts are listed only on request."""
+    repo.create(Shift(shift_id="shift1", receipts=[], status="open"))
+    with repo.pool.writer() as connection:
+        connection.executescript("""
+            INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
+            VALUES
+                ('receipt1', 'shift1',  'USD', 'closed', 100, 100),
+                ('receipt2', 'shift1',  'USD', 'open', 150, 0),
+                ('receipt3', 'shift1',  'USD', 'closed', 200, 200),
+                ('receipt4', 'shift1',  'USD', 'closed', 300, 300);
+
+            UPDATE receipts SET status = 'closed' WHERE id = 'receipt2';
+            UPDATE receipts SET discounted_total = 140 WHERE id = 'receipt2';
+            DELETE FROM receipts WHERE id = 'receipt4';
+        """)
+
+    totals = repo.get_lifetime_sales_report()
+    page = repo.get_lifetime_sales_report(limit=2, after_receipt_id="receipt1")
+
+    assert totals.total_receipts == 3
+    assert totals.total_revenue == {"USD": 440}
+    assert totals.closed_receipts == []
+    assert [r.receipt_id for r in page.closed_receipts] == ["receipt2", "receipt3"]
+
+
+def test_iter_closed_receipts_reads_keyset_pages(
+    repo: ShiftSQLRepository, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that a stream walks every closed receipt a page at a time."""
+    monkeypatch.setattr(shift_sql_repository, "STREAM_PAGE_SIZE", 2)
+    repo.create(Shift(shift_id="shift1", receipts=[], status="open"))
+    with repo.pool.writer() as connection:
+        connection.executemany(
+            "INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)"
+            " VALUES (?, 'shift1', 'USD', ?, 100, 100)",
+            [(f"receipt{i}", "open" if i == 3 else "closed") for i in range(1, 7)],
+        )
+
+    receipts = repo.iter_closed_receipts()
+    first = next(receipts)
+    with repo.pool.writer() as connection:
+        connection.execute(
+            "UPDATE receipts SET status = 'closed' WHERE id = 'receipt3'"
+        )
+
+    assert first.receipt_id == "receipt1"
+    assert [r.receipt_id for r in receipts] == [
+        "receipt2",
+        "receipt3",
+        "receipt4",
+        "receipt5",
+        "receipt6",
+    ]
+    assert [r.receipt_id for r in repo.iter_closed_receipts("receipt5")] == ["receipt6"]
+
+
+def test_z_report_is_archived_when_the_shift_closes(repo: ShiftSQLRepository) -> None:
+    """Tests that the Z report keeps the totals the shift was closed with."""
+    repo.create(Shift(shift_id="shift1", receipts=[], status="open"))
+    with repo.pool.writer() as connection:
+        connection.executescript("""
+            INSERT INTO receipts (id,shift_id,currency,status,total,discounted_total)
+            VALUES
+                ('receipt1', 'shift1',  'USD', 'closed', 100, 90),
+                ('receipt2', 'shift1',  'GEL', 'closed', 200, 200);
+            INSERT INTO receipt_products (receipt_id, product_id, quantity, total)
+            VALUES
+                ('receipt1', 'p2', 1, 100),
+                ('receipt2', 'p1', 2, 200);
+        """)
+    repo.update(Shift(shift_id="shift1", receipts=[], status="closed"))
+
+    with repo.pool.writer() as connection:
+        connection.execute("DELETE FROM receipts WHERE id = 'receipt2'")
+    report = repo.get_z_report("shift1")
+
+    assert report.n_receipts == 2
+    assert report.revenue == {"USD": 90, "GEL": 200}
+    assert report.products == [
+        {"id": "p1", "quantity": 2},
+        {"id": "p2", "quantity": 1},
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        with repo.pool.writer() as connection:
+            connection.execute("UPDATE shift_z_reports SET n_receipts = 0")
+
+
+def test_z_report_requires_a_closed_shift(repo: ShiftSQLRepository) -> None:
+    """Tests that open and unknown shifts have no Z report."""
+    repo.create(Shift(shift_id="shift1", receipts=[], status="open"))
+
+    with pytest.raises(ValueError):
+        repo.get_z_report("shift1")
+    with pytest.raises(DoesntExistError):
+        repo.get_z_report("missing")
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.core.Interfaces.product_interface import Product
+from app.infra.sql_repositories.product_sql_repository import ProductSQLRepository
+from app.infra.sqlite import Sqlite
+from app.infra.sqlite_pool import SqliteConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> Iterator[SqliteConnectionPool]:
+    """Creates a pooled file database with the full schema."""
+    pool = SqliteConnectionPool.open(str(tmp_path / "pos.db"), readers=2)
+    Sqlite(pool)
+    yield pool
+    pool.close()
+
+
+def count_products(pool: SqliteConnectionPool) -> int:
+    with pool.reader() as connection:
+        return int(connection.execute("SELECT COUNT(*) FROM products").fetchone()[0])
+
+
+def test_readers_run_alongside_open_write(pool: SqliteConnectionPool) -> None:
+    """Tests that reads neither block on nor see an uncommitted write."""
+    written = threading.Event()
+    release = threading.Event()
+
+    def write() -> None:
+        with pool.writer() as connection:
+            connection.execute(
+                "INSERT INTO products VALUES ('p1', 'Apple', '123', 100)"
+            )
+            written.set()
+            release.wait(timeout=5)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert written.wait(timeout=5)
+
+    assert count_products(pool) == 0
+    release.set()
+    writer.join()
+    assert count_products(pool) == 1
+
+
+def test_writer_rolls_back_on_error(pool: SqliteConnectionPool) -> None:
+    """Tests that a failed write transaction leaves nothing behind."""
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.writer() as connection:
+            connection.execute(
+                "INSERT INTO products VALUES ('p1', 'Apple', '123', 100)"
+            )
+            connection.execute("INSERT INTO products VALUES ('p2', 'Pear', '123', 100)")
+
+    assert count_products(pool) == 0
+
+
+def test_nested_writes_join_the_outer_transaction(
+    pool: SqliteConnectionPool,
+) -> None:
+    """Tests that the writing thread reads its own uncommitted changes."""
+    products = ProductSQLRepository(pool)
+
+    with pytest.raises(RuntimeError):
+        with pool.writer():
+            products.create(Product("p1", "Apple", 100, "123"))
+            assert products.read("p1").name == "Apple"
+            raise RuntimeError
+
+    assert products.read_all() == []
+
+
+def test_concurrent_writers_are_serialized(pool: SqliteConnectionPool) -> None:
+    """Tests that writes from many threads never collide."""
+    products = ProductSQLRepository(pool)
+    start = threading.Barrier(8)
+
+    def create(index: int) -> None:
+        start.wait()
+        for offset in range(20):
+            product_id = f"p{index}-{offset}"
+            products.create(Product(product_id, "Apple", 100, product_id))
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert count_products(pool) == 160
+
+
+def test_readers_are_read_only(pool: SqliteConnectionPool) -> None:
+    """Tests that writes cannot slip through a reader connection."""
+    with pool.reader() as connection:
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute(
+                "INSERT INTO products VALUES ('p1', 'Apple', '123', 100)"
+            )
+
+
+def test_in_memory_pool_shares_one_database() -> None:
+    """Tests that an in-memory pool reads what it wrote."""
+    pool = SqliteConnectionPool.open(":memory:")
+    Sqlite(pool)
+    ProductSQLRepository(pool).create(Product("p1", "Apple", 100, "123"))
+
+    assert pool.readers == 0
+    assert count_products(pool) == 1
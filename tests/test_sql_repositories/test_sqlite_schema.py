@@ -0,0 +1,221 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.infra.migrations import (
+    MIGRATIONS,
+    Migration,
+    MigrationError,
+    current_version,
+    migrate,
+)
+from app.infra.sqlite import Sqlite
+from app.infra.sqlite_pool import SqliteConnectionPool
+
+
+@pytest.fixture(scope="function")
+def connection() -> sqlite3.Connection:
+    """Creates a new SQLite in-memory database with the full schema."""
+    connect = sqlite3.connect(":memory:", check_same_thread=False)
+    Sqlite(SqliteConnectionPool.single(connect))
+    return connect
+
+
+def query_plan(connection: sqlite3.Connection, query: str) -> str:
+    rows = connection.execute(f"EXPLAIN QUERY PLAN {query}", ("x",)).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+
+def schema_versions(connection: sqlite3.Connection) -> list[int]:
+    rows = connection.execute("SELECT version FROM schema_version ORDER BY version")
+    return [version for (version,) in rows]
+
+
+def test_migrations_are_recorded(connection: sqlite3.Connection) -> None:
+    """Tests that every applied migration is stored in schema_version."""
+    assert schema_versions(connection) == [m.version for m in MIGRATIONS]
+
+
+def test_migrate_is_idempotent(connection: sqlite3.Connection) -> None:
+    """Tests that migrating an up to date database changes nothing."""
+    assert migrate(connection) == MIGRATIONS[-1].version
+    Sqlite(SqliteConnectionPool.single(connection))
+
+    assert schema_versions(connection) == [m.version for m in MIGRATIONS]
+
+
+def test_migrate_applies_only_pending_migrations() -> None:
+    """Tests that an existing store only runs migrations it has not seen."""
+    connect = sqlite3.connect(":memory:")
+    assert migrate(connect, MIGRATIONS[:1]) == 1
+    assert "idx_receipts_shift_status" not in index_names(connect)
+
+    assert migrate(connect) == MIGRATIONS[-1].version
+    assert "idx_receipts_shift_status" in index_names(connect)
+
+
+def test_failed_migration_leaves_schema_untouched() -> None:
+    """Tests that pending migrations are applied in a single transaction."""
+    connect = sqlite3.connect(":memory:")
+    broken = Migration(
+        len(MIGRATIONS) + 1, "broken", ("CREATE TABLE extra (id TEXT)", "NOT SQL")
+    )
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(connect, MIGRATIONS + (broken,))
+
+    assert current_version(connect) == 0
+    tables = connect.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    assert tables.fetchall() == []
+
+
+def test_migration_merges_existing_duplicate_lines() -> None:
+    """Tests that lines stored before the unique index are folded together."""
+    connect = sqlite3.connect(":memory:")
+    migrate(connect, MIGRATIONS[:2])
+    connect.executemany(
+        "INSERT INTO receipt_products (receipt_id, product_id, quantity, total) "
+        "VALUES (?, ?, ?, ?)",
+        [("r1", "p1", 2, 200), ("r1", "p2", 1, 50), ("r1", "p1", 3, 300)],
+    )
+
+    migrate(connect)
+
+    rows = connect.execute(
+        "SELECT product_id, quantity, total FROM receipt_products ORDER BY rowid"
+    ).fetchall()
+    assert rows == [("p1", 5, 500), ("p2", 1, 50)]
+    assert "idx_receipt_products_line" in index_names(connect)
+
+
+def test_migration_backfills_shift_report_totals() -> None:
+    """Tests that receipts closed before the totals existed are counted."""
+    connect = sqlite3.connect(":memory:")
+    migrate(connect, MIGRATIONS[:3])
+    connect.execute(
+        "INSERT INTO receipts VALUES ('r1', 's1', 'GEL', 'closed', 300, 250)"
+    )
+    connect.execute(
+        "INSERT INTO receipt_products (receipt_id, product_id, quantity, total) "
+        "VALUES ('r1', 'p1', 3, 300)"
+    )
+
+    migrate(connect)
+
+    assert connect.execute("SELECT * FROM shift_revenue").fetchall() == [
+        ("s1", "GEL", 1, 250)
+    ]
+    assert connect.execute("SELECT * FROM shift_product_sales").fetchall() == [
+        ("s1", "p1", 3)
+    ]
+    assert connect.execute("SELECT * FROM sales_totals").fetchall() == [("GEL", 1, 250)]
+
+
+def test_migration_archives_z_reports_of_closed_shifts() -> None:
+    """Tests that shifts closed before Z reports existed get one."""
+    connect = sqlite3.connect(":memory:")
+    migrate(connect, MIGRATIONS[:5])
+    connect.execute("INSERT INTO shifts VALUES ('s1', 'closed'), ('s2', 'open')")
+    connect.execute(
+        "INSERT INTO receipts VALUES ('r1', 's1', 'GEL', 'closed', 300, 250)"
+    )
+    connect.execute(
+        "INSERT INTO receipt_products (receipt_id, product_id, quantity, total) "
+        "VALUES ('r1', 'p1', 3, 300)"
+    )
+
+    migrate(connect)
+
+    assert connect.execute(
+        "SELECT shift_id, n_receipts, revenue, products FROM shift_z_reports"
+    ).fetchall() == [("s1", 1, '{"GEL":250}', '[{"id":"p1","quantity":3}]')]
+
+
+def test_migration_leaves_receipts_without_closing_time_out_of_rollups() -> None:
+    """Tests that receipts closed before closed_at existed are not bucketed."""
+    connect = sqlite3.connect(":memory:")
+    migrate(connect, MIGRATIONS[:6])
+    connect.execute(
+        "INSERT INTO receipts VALUES ('r1', 's1', 'GEL', 'closed', 300, 250)"
+    )
+
+    migrate(connect)
+    connect.execute("UPDATE receipts SET discounted_total = 200")
+
+    assert connect.execute("SELECT closed_at FROM receipts").fetchall() == [(None,)]
+    assert connect.execute("SELECT * FROM sales_rollup_receipts").fetchall() == []
+
+
+def test_migrate_refuses_newer_schema(connection: sqlite3.Connection) -> None:
+    """Tests that migrations never run backwards."""
+    with pytest.raises(MigrationError):
+        migrate(connection, MIGRATIONS[:1])
+
+
+def test_migrate_refuses_gaps_in_numbering() -> None:
+    """Tests that a missing migration number is reported."""
+    connect = sqlite3.connect(":memory:")
+
+    with pytest.raises(MigrationError, match="Migration 1 is missing."):
+        migrate(connect, MIGRATIONS[1:])
+
+
+def index_names(connection: sqlite3.Connection) -> set[str]:
+    rows = connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {name for (name,) in rows}
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (
+            "SELECT product_id, quantity, price, total "
+            "FROM receipt_products WHERE receipt_id = ?",
+            "COVERING INDEX idx_receipt_products_receipt",
+        ),
+        (
+            "SELECT receipt_id FROM receipt_products WHERE product_id = ?",
+            "COVERING INDEX idx_receipt_products_product",
+        ),
+        (
+            "SELECT product_id FROM campaign_products WHERE campaign_id = ?",
+            "COVERING INDEX idx_campaign_products_campaign",
+        ),
+        (
+            "SELECT campaign_id FROM campaign_products WHERE product_id = ?",
+            "COVERING INDEX idx_campaign_products_product",
+        ),
+        (
+            "SELECT currency, discounted_total FROM receipts "
+            "WHERE shift_id = ? AND status = 'closed'",
+            "COVERING INDEX idx_receipts_shift_status",
+        ),
+        (
+            "SELECT id, discounted_total FROM receipts "
+            "WHERE status = ? ORDER BY id LIMIT 100",
+            "COVERING INDEX idx_receipts_status_id",
+        ),
+        (
+            "SELECT bucket, currency, revenue FROM sales_rollup_receipts "
+            "WHERE bucket >= ? AND bucket < '9999'",
+            "PRIMARY KEY (bucket>? AND bucket<?)",
+        ),
+    ],
+)
+def test_hot_queries_use_indexes(
+    connection: sqlite3.Connection, query: str, index: str
+) -> None:
+    """Tests that lookups on hot paths are served by covering indexes."""
+    assert index in query_plan(connection, query)
+
+
+def test_disk_database_uses_wal(tmp_path: Path) -> None:
+    """Tests that a file database is switched to WAL journaling."""
+    pool = SqliteConnectionPool.open(str(tmp_path / "pos.db"))
+    Sqlite(pool)
+
+    with pool.reader() as connect:
+        assert connect.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connect.execute("PRAGMA synchronous").fetchone()[0] == 1
+    pool.close()